@@ -1,15 +1,9 @@
+import importlib
 import logging
 import sys
 
 from .config.debug_config import global_config
 from .config.logger_classes import FaaSrFilter, JsonFormatter
-from .config.s3_log_sender import S3LogSender
-from .engine.executor import Executor
-from .engine.faasr_payload import FaaSrPayload
-from .engine.scheduler import Scheduler
-from .helpers.faasr_start_invoke_helper import (faasr_func_dependancy_install,
-                                                faasr_get_github_raw)
-from .s3_api import faasr_log
 
 logger = logging.getLogger()
 logger.setLevel(logging.NOTSET)
@@ -28,6 +22,33 @@ stdout_handler.setLevel(logging.INFO)
 stdout_handler.addFilter(FaaSrFilter())
 logger.addHandler(stdout_handler)
 
+# the engine pulls in boto3, requests and fastapi, so it is only imported
+# when one of these names is first used -- processes that only need the
+# client stubs or the config (e.g. user functions) start much faster
+_LAZY_IMPORTS = {
+    "Executor": ".engine.executor",
+    "FaaSrPayload": ".engine.faasr_payload",
+    "Scheduler": ".engine.scheduler",
+    "S3LogSender": ".config.s3_log_sender",
+    "faasr_func_dependancy_install": ".helpers.faasr_start_invoke_helper",
+    "faasr_get_github_raw": ".helpers.faasr_start_invoke_helper",
+    "faasr_log": ".s3_api",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # cache so __getattr__ is only called once per name
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
 
 __all__ = [
     "FaaSrPayload",
@@ -1,8 +1,25 @@
+import os
 import sys
 
 import requests
 
 
+def _server_url(endpoint):
+    """
+    Returns the url of an RPC server endpoint; the port is set
+    by the action (FAASR_SERVER_PORT)
+    """
+    port = os.getenv("FAASR_SERVER_PORT", "8000")
+    return f"http://127.0.0.1:{port}/{endpoint}"
+
+
+def _get_headers():
+    """
+    Returns headers identifying the action (FAASR_ACTION_TOKEN)
+    """
+    return {"X-FaaSr-Action-Token": os.getenv("FAASR_ACTION_TOKEN", "")}
+
+
 def faasr_put_file(
     local_file, remote_file, server_name="", local_folder=".", remote_folder="."
 ):
@@ -19,7 +36,9 @@ def faasr_put_file(
             "remote_folder": str(remote_folder),
         },
     }
-    r = requests.post("http://127.0.0.1:8000/faasr-action", json=request_json)
+    r = requests.post(
+        _server_url("faasr-action"), json=request_json, headers=_get_headers()
+    )
     try:
         response = r.json()
         if response.get("Success", False):
@@ -52,7 +71,9 @@ def faasr_get_file(
             "remote_folder": str(remote_folder),
         },
     }
-    r = requests.post("http://127.0.0.1:8000/faasr-action", json=request_json)
+    r = requests.post(
+        _server_url("faasr-action"), json=request_json, headers=_get_headers()
+    )
     try:
         response = r.json()
         if response.get("Success", False):
@@ -81,7 +102,9 @@ def faasr_delete_file(remote_file, server_name="", remote_folder=""):
             "remote_folder": str(remote_folder),
         },
     }
-    r = requests.post("http://127.0.0.1:8000/faasr-action", json=request_json)
+    r = requests.post(
+        _server_url("faasr-action"), json=request_json, headers=_get_headers()
+    )
     try:
         response = r.json()
         if response.get("Success", False):
@@ -98,6 +121,90 @@ def faasr_delete_file(remote_file, server_name="", remote_folder=""):
         sys.exit(1)
 
 
+def faasr_copy_file(
+    source_file,
+    target_file,
+    source_server="",
+    target_server="",
+    source_folder=".",
+    target_folder=".",
+):
+    """
+    Copies a file between folders or data stores on the FaaSr server,
+    without downloading it
+    """
+    request_json = {
+        "ProcedureID": "faasr_copy_file",
+        "Arguments": {
+            "source_file": str(source_file),
+            "target_file": str(target_file),
+            "source_server": source_server,
+            "target_server": target_server,
+            "source_folder": str(source_folder),
+            "target_folder": str(target_folder),
+        },
+    }
+    r = requests.post(
+        _server_url("faasr-action"), json=request_json, headers=_get_headers()
+    )
+    try:
+        response = r.json()
+        if response.get("Success", False):
+            return True
+        else:
+            err_msg = '{"faasr_copy_file": "Request to FaaSr RPC failed"}'
+            print(err_msg)
+            sys.exit(1)
+    except Exception as e:
+        err_msg = (
+            f'{{"faasr_copy_file": "Failed to parse response from FaaSr RPC -- {e}"}}'
+        )
+        print(err_msg)
+        sys.exit(1)
+
+
+def faasr_move_file(
+    source_file,
+    target_file,
+    source_server="",
+    target_server="",
+    source_folder=".",
+    target_folder=".",
+):
+    """
+    Moves a file between folders or data stores on the FaaSr server,
+    without downloading it
+    """
+    request_json = {
+        "ProcedureID": "faasr_move_file",
+        "Arguments": {
+            "source_file": str(source_file),
+            "target_file": str(target_file),
+            "source_server": source_server,
+            "target_server": target_server,
+            "source_folder": str(source_folder),
+            "target_folder": str(target_folder),
+        },
+    }
+    r = requests.post(
+        _server_url("faasr-action"), json=request_json, headers=_get_headers()
+    )
+    try:
+        response = r.json()
+        if response.get("Success", False):
+            return True
+        else:
+            err_msg = '{"faasr_move_file": "Request to FaaSr RPC failed"}'
+            print(err_msg)
+            sys.exit(1)
+    except Exception as e:
+        err_msg = (
+            f'{{"faasr_move_file": "Failed to parse response from FaaSr RPC -- {e}"}}'
+        )
+        print(err_msg)
+        sys.exit(1)
+
+
 def faasr_log(log_message):
     """
     Logs a message to the FaaSr server log
@@ -110,7 +217,9 @@ def faasr_log(log_message):
         "ProcedureID": "faasr_log",
         "Arguments": {"log_message": log_message},
     }
-    r = requests.post("http://127.0.0.1:8000/faasr-action", json=request_json)
+    r = requests.post(
+        _server_url("faasr-action"), json=request_json, headers=_get_headers()
+    )
     try:
         response = r.json()
         if response.get("Success", False):
@@ -133,7 +242,9 @@ def faasr_get_folder_list(server_name="", prefix=""):
         "ProcedureID": "faasr_get_folder_list",
         "Arguments": {"server_name": server_name, "prefix": str(prefix)},
     }
-    r = requests.post("http://127.0.0.1:8000/faasr-action", json=request_json)
+    r = requests.post(
+        _server_url("faasr-action"), json=request_json, headers=_get_headers()
+    )
     try:
         response = r.json()
         return response["Data"]["folder_list"]
@@ -148,7 +259,9 @@ def faasr_rank():
     Get the rank and max rank of the current function as a namedtuple (rank, max_rank)
     """
     request_json = {"ProcedureID": "faasr_rank", "Arguments": {}}
-    r = requests.post("http://127.0.0.1:8000/faasr-action", json=request_json)
+    r = requests.post(
+        _server_url("faasr-action"), json=request_json, headers=_get_headers()
+    )
     try:
         response = r.json()
         return response["Data"]
@@ -166,7 +279,9 @@ def faasr_get_s3_creds():
         dict -- S3 credentials
     """
     request_json = {"ProcedureID": "faasr_get_s3_creds", "Arguments": {}}
-    r = requests.post("http://127.0.0.1:8000/faasr-action", json=request_json)
+    r = requests.post(
+        _server_url("faasr-action"), json=request_json, headers=_get_headers()
+    )
     try:
         response = r.json()
         return response["Data"]["s3_creds"]
@@ -178,6 +293,85 @@ def faasr_get_s3_creds():
         sys.exit(1)
 
 
+def faasr_kv_put(key, value):
+    """
+    Sets a key in the invocation's key-value store; the write is batched
+    and lands by the time the action returns
+
+    Arguments:
+        key: str -- key to set ("/" separated names)
+        value: JSON serializable value
+    """
+    request_json = {
+        "ProcedureID": "faasr_kv_put",
+        "Arguments": {"key": key, "value": value},
+    }
+    r = requests.post(
+        _server_url("faasr-action"), json=request_json, headers=_get_headers()
+    )
+    try:
+        response = r.json()
+        if response.get("Success", False):
+            return True
+        else:
+            err_msg = '{"faasr_kv_put": "Request to FaaSr RPC failed"}'
+            print(err_msg)
+            sys.exit(1)
+    except Exception as e:
+        err_msg = (
+            f'{{"faasr_kv_put": "Failed to parse response from FaaSr RPC -- {e}"}}'
+        )
+        print(err_msg)
+        sys.exit(1)
+
+
+def faasr_kv_get(key, default=None):
+    """
+    Get a key from the invocation's key-value store
+
+    Returns:
+        value of key, or default if it has not been set
+    """
+    request_json = {
+        "ProcedureID": "faasr_kv_get",
+        "Arguments": {"key": key, "default": default},
+    }
+    r = requests.post(
+        _server_url("faasr-action"), json=request_json, headers=_get_headers()
+    )
+    try:
+        response = r.json()
+        return response["Data"]["value"]
+    except Exception as e:
+        err_msg = f"{{py_client_stub: failed to get {key} from server -- {e}}}"
+        print(err_msg)
+        sys.exit(1)
+
+
+def faasr_kv_incr(key, amount=1):
+    """
+    Atomically add amount to a number in the invocation's key-value store
+    (keys that have not been set start at 0)
+
+    Returns:
+        int | float -- the new value
+    """
+    request_json = {
+        "ProcedureID": "faasr_kv_incr",
+        "Arguments": {"key": key, "amount": amount},
+    }
+    r = requests.post(
+        _server_url("faasr-action"), json=request_json, headers=_get_headers()
+    )
+    try:
+        response = r.json()
+        return response["Data"]["value"]
+    except Exception as e:
+        err_msg = f"{{py_client_stub: failed to increment {key} on server -- {e}}}"
+        print(err_msg)
+        sys.exit(1)
+
+
 def faasr_return(return_value=None):
     """
     Returns the result of the user function to the FaaSr server
@@ -185,7 +379,9 @@ def faasr_return(return_value=None):
         return_value: bool -- the return value of the user function
     """
     return_json = {"FunctionResult": return_value}
-    r = requests.post("http://127.0.0.1:8000/faasr-return", json=return_json)
+    r = requests.post(
+        _server_url("faasr-return"), json=return_json, headers=_get_headers()
+    )
     try:
         response = r.json()
         if response.get("Success", False):
@@ -204,7 +400,9 @@ def faasr_return(return_value=None):
 
 def faasr_exit(message=None, error=True):
     exit_json = {"Error": error, "Message": message}
-    r = requests.post("http://127.0.0.1:8000/faasr-exit", json=exit_json)
+    r = requests.post(
+        _server_url("faasr-exit"), json=exit_json, headers=_get_headers()
+    )
     try:
         response = r.json()
         if response.get("Success", False):
@@ -1,10 +1,14 @@
 import logging
+import os
 from pathlib import Path
 
-from FaaSr_py.client.py_client_stubs import (faasr_delete_file, faasr_exit,
+from FaaSr_py.client.py_client_stubs import (faasr_copy_file,
+                                             faasr_delete_file, faasr_exit,
                                              faasr_get_file,
                                              faasr_get_folder_list,
-                                             faasr_get_s3_creds, faasr_log,
+                                             faasr_get_s3_creds, faasr_kv_get,
+                                             faasr_kv_incr, faasr_kv_put,
+                                             faasr_log, faasr_move_file,
                                              faasr_put_file, faasr_rank,
                                              faasr_return)
 from FaaSr_py.config.debug_config import global_config
@@ -15,7 +19,7 @@ from FaaSr_py.helpers.py_func_helper import (faasr_import_function,
 logger = logging.getLogger(__name__)
 
 
-def run_py_function(faasr, func_name, args, func_path=None):
+def run_py_function(faasr, func_name, args, func_path=None, rpc_env=None):
     """
     Entry for Python function process
 
@@ -23,7 +27,13 @@ def run_py_function(faasr, func_name, args, func_path=None):
         faasr: FaaSr payload instance
         func_name: name of function to run
         args: arguments for function (dict)
+        rpc_env: environment variables locating the action's RPC server
     """
+    # set here rather than inherited, since the process may be forked
+    # from a fork server that was started by an earlier action
+    if rpc_env:
+        os.environ.update(rpc_env)
+
     try:
         if global_config.USE_LOCAL_USER_FUNC:
             func_path = Path(global_config.LOCAL_FUNCTION_PATH).resolve()
@@ -47,10 +57,15 @@ def run_py_function(faasr, func_name, args, func_path=None):
     user_function.__globals__["faasr_put_file"] = faasr_put_file
     user_function.__globals__["faasr_get_file"] = faasr_get_file
     user_function.__globals__["faasr_delete_file"] = faasr_delete_file
+    user_function.__globals__["faasr_copy_file"] = faasr_copy_file
+    user_function.__globals__["faasr_move_file"] = faasr_move_file
     user_function.__globals__["faasr_get_folder_list"] = faasr_get_folder_list
     user_function.__globals__["faasr_log"] = faasr_log
     user_function.__globals__["faasr_rank"] = faasr_rank
     user_function.__globals__["faasr_get_s3_creds"] = faasr_get_s3_creds
+    user_function.__globals__["faasr_kv_put"] = faasr_kv_put
+    user_function.__globals__["faasr_kv_get"] = faasr_kv_get
+    user_function.__globals__["faasr_kv_incr"] = faasr_kv_incr
 
     try:
         if global_config.USE_LOCAL_USER_FUNC:
@@ -4,6 +4,7 @@ from pathlib import Path
 
 from FaaSr_py.config.logger_classes import FaaSrFilter
 from FaaSr_py.config.s3_log_handler import S3LogHandler
+from FaaSr_py.helpers import serialization
 
 logger = logging.getLogger(__name__)
 
@@ -21,29 +22,25 @@ class Config:
 
             # immutable state -- used to restore config
             # to what it was at the start of the function
-            self._SKIP_SCHEMA_VALIDATE = self.SKIP_SCHEMA_VALIDATE
-            self._SKIP_WF_VALIDATE = self.SKIP_WF_VALIDATE
-            self._SKIP_REAL_TRIGGERS = self.SKIP_REAL_TRIGGERS
-            self._READABLE_LOGS = self.READABLE_LOGS
-            self._SKIP_USER_FUNCTION = self.SKIP_USER_FUNCTION
-            self._USE_LOCAL_USER_FUNC = self.USE_LOCAL_USER_FUNC
-            self._LOCAL_FUNCTION_PATH = self.LOCAL_FUNCTION_PATH
-            self._LOCAL_FUNCTION_NAME = self.LOCAL_FUNCTION_NAME
-            self._LOCAL_FUNC_ARGS = self.LOCAL_FUNC_ARGS
-            self._USE_LOCAL_FILE_SYSTEM = self.USE_LOCAL_FILE_SYSTEM
-            self._LOCAL_FILE_SYSTEM_DIR = self.LOCAL_FILE_SYSTEM_DIR
+            # (read in one pass, since every property read opens the file)
+            self._initial_config = self._read_all_config()
 
             Config._config = self
         else:
             raise RuntimeError("cannot initialize Config outside of debug_config.py")
 
+    def _read_all_config(self):
+        """
+        Read all config entries from config file
+        """
+        with open(self._config_file, "rb") as f:
+            return serialization.loads(f.read())
+
     def _read_config(self, key):
         """
         Read config entry from config file
         """
-        with open(self._config_file, "r") as f:
-            config = json.load(f)
-        return config[key]
+        return self._read_all_config()[key]
 
     def _write_config(self, key, value):
         """
@@ -60,17 +57,12 @@ class Config:
         """
         Reset configs to their original settings
         """
-        self.SKIP_SCHEMA_VALIDATE = self.__dict__["_SKIP_SCHEMA_VALIDATE"]
-        self.SKIP_WF_VALIDATE = self.__dict__["_SKIP_WF_VALIDATE"]
-        self.SKIP_REAL_TRIGGERS = self.__dict__["_SKIP_REAL_TRIGGERS"]
-        self.READABLE_LOGS = self.__dict__["_READABLE_LOGS"]
-        self.SKIP_USER_FUNCTION = self.__dict__["_SKIP_USER_FUNCTION"]
-        self.USE_LOCAL_USER_FUNC = self.__dict__["_USE_LOCAL_USER_FUNC"]
-        self.LOCAL_FUNCTION_PATH = self.__dict__["_LOCAL_FUNCTION_PATH"]
-        self.LOCAL_FUNCTION_NAME = self.__dict__["_LOCAL_FUNCTION_NAME"]
-        self.LOCAL_FUNC_ARGS = self.__dict__["_LOCAL_FUNC_ARGS"]
-        self.USE_LOCAL_FILE_SYSTEM = self.__dict__["_USE_LOCAL_FILE_SYSTEM"]
-        self.LOCAL_FILE_SYSTEM_DIR = self.__dict__["_LOCAL_FILE_SYSTEM_DIR"]
+        with open(self._config_file, "r+") as f:
+            config = json.load(f)
+            config.update(self._initial_config)
+            f.seek(0)
+            json.dump(config, f, indent=4)
+            f.truncate()
 
     def add_s3_log_handler(self, faasr_payload, start_time, level=logging.DEBUG):
         """
@@ -210,6 +202,96 @@ class Config:
             raise TypeError("LOCAL_FILE_SYSTEM_DIR must be a string")
         self._write_config("LOCAL_FILE_SYSTEM_DIR", value)
 
+    @property
+    def LOCAL_FILE_SYSTEM_FSYNC(self):
+        return self._read_config("LOCAL_FILE_SYSTEM_FSYNC")
+
+    @LOCAL_FILE_SYSTEM_FSYNC.setter
+    def LOCAL_FILE_SYSTEM_FSYNC(self, value):
+        if not isinstance(value, bool):
+            raise TypeError("LOCAL_FILE_SYSTEM_FSYNC must be a boolean")
+        self._write_config("LOCAL_FILE_SYSTEM_FSYNC", value)
+
+    @property
+    def STORAGE_BACKEND(self):
+        return self._read_config("STORAGE_BACKEND")
+
+    @STORAGE_BACKEND.setter
+    def STORAGE_BACKEND(self, value):
+        if not isinstance(value, str):
+            raise TypeError("STORAGE_BACKEND must be a string")
+        self._write_config("STORAGE_BACKEND", value)
+
+    @property
+    def USE_FORK_SERVER(self):
+        return self._read_config("USE_FORK_SERVER")
+
+    @USE_FORK_SERVER.setter
+    def USE_FORK_SERVER(self, value):
+        if not isinstance(value, bool):
+            raise TypeError("USE_FORK_SERVER must be a boolean")
+        self._write_config("USE_FORK_SERVER", value)
+
+    @property
+    def USE_R_WORKER(self):
+        return self._read_config("USE_R_WORKER")
+
+    @USE_R_WORKER.setter
+    def USE_R_WORKER(self, value):
+        if not isinstance(value, bool):
+            raise TypeError("USE_R_WORKER must be a boolean")
+        self._write_config("USE_R_WORKER", value)
+
+    @property
+    def USE_DEPENDENCY_SNAPSHOT(self):
+        return self._read_config("USE_DEPENDENCY_SNAPSHOT")
+
+    @USE_DEPENDENCY_SNAPSHOT.setter
+    def USE_DEPENDENCY_SNAPSHOT(self, value):
+        if not isinstance(value, bool):
+            raise TypeError("USE_DEPENDENCY_SNAPSHOT must be a boolean")
+        self._write_config("USE_DEPENDENCY_SNAPSHOT", value)
+
+    @property
+    def DEPENDENCY_CACHE_DIR(self):
+        return self._read_config("DEPENDENCY_CACHE_DIR")
+
+    @DEPENDENCY_CACHE_DIR.setter
+    def DEPENDENCY_CACHE_DIR(self, value):
+        if not isinstance(value, str):
+            raise TypeError("DEPENDENCY_CACHE_DIR must be a string")
+        self._write_config("DEPENDENCY_CACHE_DIR", value)
+
+    @property
+    def SOURCE_BACKEND(self):
+        return self._read_config("SOURCE_BACKEND")
+
+    @SOURCE_BACKEND.setter
+    def SOURCE_BACKEND(self, value):
+        if not isinstance(value, str):
+            raise TypeError("SOURCE_BACKEND must be a string")
+        self._write_config("SOURCE_BACKEND", value)
+
+    @property
+    def LOCAL_SOURCE_DIR(self):
+        return self._read_config("LOCAL_SOURCE_DIR")
+
+    @LOCAL_SOURCE_DIR.setter
+    def LOCAL_SOURCE_DIR(self, value):
+        if not isinstance(value, str):
+            raise TypeError("LOCAL_SOURCE_DIR must be a string")
+        self._write_config("LOCAL_SOURCE_DIR", value)
+
+    @property
+    def USE_TRACING(self):
+        return self._read_config("USE_TRACING")
+
+    @USE_TRACING.setter
+    def USE_TRACING(self, value):
+        if not isinstance(value, bool):
+            raise TypeError("USE_TRACING must be a boolean")
+        self._write_config("USE_TRACING", value)
+
 
 directory = Path(__file__).parent.absolute()
 config_file = directory / "config.json"
@@ -1,6 +1,7 @@
-import json
 import logging
 
+from FaaSr_py.helpers import serialization
+
 
 class JsonFormatter(logging.Formatter):
     """
@@ -17,7 +18,7 @@ class JsonFormatter(logging.Formatter):
             "message": record.getMessage(),
             "logger": record.name,
         }
-        return json.dumps(log_record)
+        return serialization.dumps(log_record)
 
 
 class FaaSrFilter(logging.Filter):
@@ -35,9 +35,10 @@ class S3LogHandler(logging.Handler):
             msg = self.format(record)
             self._sender.log(msg)
         except Exception as e:
-            self._sender.flush_log()
+            self._sender.flush_log(blocking=False)
             raise RuntimeError("failed to upload s3 log") from e
 
-        # flush log if it is an error
+        # flush log if it is an error -- without waiting, since a flush in
+        # another thread may be waiting for this handler's lock
         if record.levelno >= logging.ERROR:
-            self._sender.flush_log()
+            self._sender.flush_log(blocking=False)
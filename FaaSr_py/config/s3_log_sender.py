@@ -1,5 +1,6 @@
 import logging
 import sys
+import threading
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -27,6 +28,11 @@ class S3LogSender:
         S3LogSender._sender = self
         self._initialized = True
         self._log_buffer = []
+        # the buffer can be written to while another thread flushes it,
+        # and flushes must not overlap since the upload appends to the log file
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.RLock()
+        self._upload_failed = False
         self._start_time = timestamp
         self._faasr_payload = faasr_payload
 
@@ -57,26 +63,57 @@ class S3LogSender:
         """
         if not message:
             raise RuntimeError("Cannot log empty message")
-        self._log_buffer.append(message)
+        with self._buffer_lock:
+            self._log_buffer.append(message)
 
-    def flush_log(self):
+    def flush_log(self, blocking=True):
         """
         Uploads all messages inside S3LogSender and clears buffer
+
+        Arguments:
+            blocking: bool -- wait for a flush running in another thread;
+            if False, return and leave the messages to the next flush
         """
         if not self._faasr_payload:
             logger.error("S3LogSender payload is not set")
             sys.exit(1)
-        if not self._log_buffer:
+        if self._upload_failed:
             return
 
-        # Combine all log messages into a single string and clear buffer
-        full_log = "\n".join(self._log_buffer)
-        self._log_buffer = []
-
-        from FaaSr_py.s3_api.log import faasr_log
+        from FaaSr_py.s3_api.log import append_log
 
-        # Upload the log to S3
-        faasr_log(self._faasr_payload, full_log)
+        # nothing is logged while _flush_lock is held: logging takes the
+        # handlers' locks, and S3LogHandler.emit flushes while holding its lock
+        if not self._flush_lock.acquire(blocking=blocking):
+            return
+        uploaded = False
+        error = None
+        try:
+            # messages added during the upload are uploaded too, since
+            # non-blocking flushes leave them to this one
+            while True:
+                # Combine all log messages into a single string and clear buffer
+                with self._buffer_lock:
+                    if not self._log_buffer:
+                        break
+                    full_log = "\n".join(self._log_buffer)
+                    self._log_buffer = []
+
+                # Upload the log to S3
+                append_log(self._faasr_payload, full_log)
+                uploaded = True
+        except Exception as e:
+            error = e
+        finally:
+            self._flush_lock.release()
+
+        if error is not None:
+            # later flushes (including the one for this message) would fail too
+            self._upload_failed = True
+            logger.error(f"Error writing log file: {error}")
+            sys.exit(1)
+        if uploaded:
+            logger.debug("Log succesfully uploaded")
 
     def get_curr_timestamp(self):
         """
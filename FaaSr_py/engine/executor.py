@@ -1,9 +1,13 @@
+import asyncio
 import json
 import logging
 import os
 import shutil
+import socket
 import subprocess
 import sys
+import time
+import uuid
 from multiprocessing import Process
 from pathlib import Path
 
@@ -11,12 +15,15 @@ import requests
 
 from FaaSr_py.config.debug_config import global_config
 from FaaSr_py.engine.faasr_payload import FaaSrPayload
+from FaaSr_py.engine.scheduler import Scheduler
 from FaaSr_py.helpers.faasr_start_invoke_helper import \
     faasr_func_dependancy_install
+from FaaSr_py.helpers.fork_server import get_fork_server_context
+from FaaSr_py.helpers.r_worker import run_r_function_in_worker
 from FaaSr_py.helpers.s3_helper_functions import (flush_s3_log,
                                                   get_invocation_folder)
+from FaaSr_py.helpers.tracing import export_trace, trace_span
 from FaaSr_py.s3_api import faasr_put_file
-from FaaSr_py.server.faasr_server import run_server, wait_for_server_start
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +40,10 @@ class Executor:
             sys.exit(1)
         self.faasr = faasr
         self.server = None
+        # RPC server port -- picked by the OS when the server starts unless
+        # FAASR_SERVER_PORT is set, so several actions can run on one host
+        self.port = int(os.getenv("FAASR_SERVER_PORT", 0))
+        self.action_token = None
         self.packages = []
 
     def _call(self, action_name):
@@ -51,19 +62,39 @@ class Executor:
                 # entry script for py function
                 from FaaSr_py.client.py_user_func_entry import run_py_function
 
-                # run user func as seperate process
+                # run user func as seperate process -- with USE_FORK_SERVER,
+                # the process is forked from a server that has already
+                # imported the function's packages
                 try:
-                    py_func = Process(
-                        target=run_py_function,
-                        args=(self.faasr, func_name, user_args),
-                    )
+                    if global_config.USE_FORK_SERVER:
+                        ctx = get_fork_server_context(
+                            self.faasr,
+                            func_name,
+                            f"/tmp/functions/{self.faasr['InvocationID']}",
+                        )
+                        py_func = ctx.Process(
+                            target=run_py_function,
+                            args=(self.faasr, func_name, user_args),
+                            kwargs={"rpc_env": self._get_rpc_env()},
+                        )
+                    else:
+                        py_func = Process(
+                            target=run_py_function,
+                            args=(self.faasr, func_name, user_args),
+                            kwargs={"rpc_env": self._get_rpc_env()},
+                        )
                 except Exception as e:
                     logger.error(f"Error running Python function: {e}")
                     sys.exit(1)
 
                 logger.info(f"Starting function: {func_name} (Python)")
+                func_start = time.perf_counter()
                 py_func.start()
                 py_func.join()
+                logger.debug(
+                    f"Python function process finished in "
+                    f"{time.perf_counter() - func_start:.3f}s"
+                )
 
                 func_res = py_func.exitcode
             elif func_type == "R":
@@ -74,6 +105,7 @@ class Executor:
                     client_dir / "r_user_func_entry.R",
                     client_dir / "r_func_helper.R",
                     client_dir / "r_client_stubs.R",
+                    client_dir / "r_worker.R",
                 ]
 
                 # Ensure /tmp exists
@@ -86,22 +118,39 @@ class Executor:
 
                 logger.info(f"Starting function: {func_name} (R)")
 
-                # run R entry as a subprocess
-                try:
-                    r_func = subprocess.run(
-                        [
-                            "Rscript",
-                            "/tmp/r_user_func_entry.R",
-                            func_name,
-                            json.dumps(user_args),
-                            self.faasr["InvocationID"],
-                        ],
-                        cwd="/tmp",
+                # with USE_R_WORKER, run the function in a persistent R worker
+                # that keeps libraries loaded; fall back to Rscript if the
+                # worker is unavailable
+                func_res = None
+                if global_config.USE_R_WORKER:
+                    func_res = run_r_function_in_worker(
+                        func_name,
+                        user_args,
+                        self.faasr["InvocationID"],
+                        self._get_cran_packages(func_name),
+                        self._get_rpc_env(),
                     )
-                except Exception as e:
-                    logger.error(f"Error running R function: {e}")
-                    sys.exit(1)
-                func_res = r_func.returncode
+                    if func_res is None:
+                        logger.warning("R worker unavailable -- using Rscript")
+
+                if func_res is None:
+                    # run R entry as a subprocess
+                    try:
+                        r_func = subprocess.run(
+                            [
+                                "Rscript",
+                                "/tmp/r_user_func_entry.R",
+                                func_name,
+                                json.dumps(user_args),
+                                self.faasr["InvocationID"],
+                            ],
+                            cwd="/tmp",
+                            env={**os.environ, **self._get_rpc_env()},
+                        )
+                    except Exception as e:
+                        logger.error(f"Error running R function: {e}")
+                        sys.exit(1)
+                    func_res = r_func.returncode
             else:
                 logger.error(f"Unkown function type: {func_type}")
                 sys.exit(1)
@@ -113,8 +162,6 @@ class Executor:
         else:
             logger.info("SKIPPING USER FUNCTION")
 
-        self._make_done(action_name)
-
     def _make_done(self, action_name):
         """
         At this point, the action has finished the invocation of the user Function
@@ -139,34 +186,76 @@ class Executor:
             f.write("True")
 
         # Put .done file in S3
-        faasr_put_file(
-            faasr_payload=self.faasr,
-            local_folder=log_folder_path,
-            local_file=file_name,
-            remote_folder=log_folder,
-            remote_file=file_name,
-        )
+        with trace_span("done_write", file=file_name):
+            faasr_put_file(
+                faasr_payload=self.faasr,
+                local_folder=log_folder_path,
+                local_file=file_name,
+                remote_folder=log_folder,
+                remote_file=file_name,
+            )
 
         logger.debug(f"Put {file_name} file in S3")
 
-    def run_func(self, action_name, start_time):
+    def run_func(self, action_name, start_time, defer_done=False):
         """
         Fetch and run the users function
 
         Arguments:
             action_name: str -- name of the action to run
+            defer_done: bool -- leave the .done file to run_epilogue
         """
+        completed = False
+        try:
+            function_result = self._run_func(action_name, start_time, defer_done)
+            completed = True
+            return function_result
+        finally:
+            # with defer_done, run_epilogue exports the trace once it's done
+            if not (defer_done and completed):
+                export_trace(self.faasr)
+
+    def _run_func(self, action_name, start_time, defer_done):
+        action = self.faasr["ActionList"][action_name]
+
+        # with Memoize, an earlier run with the same source, arguments, inputs
+        # and dependencies stands in for this one
+        memo_key = memo_store = None
+        if action.get("Memoize"):
+            with trace_span("memo_lookup"):
+                memo_key, memo_store, manifest = self._lookup_memoized_result(
+                    action_name
+                )
+            if manifest is not None:
+                logger.info(f"Skipping {action_name} -- memoized result found")
+                if not defer_done:
+                    self._make_done(action_name)
+                return manifest["FunctionResult"]
+
         # install dependencies for function
         logger.debug("Starting dependency install")
-        action = self.faasr["ActionList"][action_name]
-        faasr_func_dependancy_install(self.faasr, action)
+        with trace_span("dependency_install"):
+            faasr_func_dependancy_install(self.faasr, action)
         logger.debug("Finished installing dependencies")
 
         # Run function
         try:
-            self._host_server_api(start_time=start_time)
-            self._call(action_name)
+            with trace_span("server_start"):
+                self._host_server_api(start_time=start_time)
+            with trace_span(
+                "user_function",
+                function=action["FunctionName"],
+                type=action["Type"],
+            ):
+                self._call(action_name)
+            if not defer_done:
+                self._make_done(action_name)
             function_result = self.get_function_return()
+            if memo_key:
+                with trace_span("memo_save"):
+                    self._save_memoized_result(
+                        action_name, memo_key, memo_store, function_result
+                    )
         except Exception as e:
             if isinstance(e, SystemExit):
                 raise
@@ -177,20 +266,161 @@ class Executor:
             self.terminate_server()
         return function_result
 
-    def _host_server_api(self, start_time, port=8000):
+    def _lookup_memoized_result(self, action_name):
+        """
+        Computes the action's memo key and restores a memoized result if one exists;
+        errors are logged and treated as a miss
+
+        Returns:
+            (str | None, MemoStore | None, dict | None): memo key (None if the
+            action can't be memoized), store, manifest (None on a miss)
+        """
+        from FaaSr_py.helpers.memoization import (MemoStore, get_memo_key,
+                                                  restore_memoized_result)
+
+        try:
+            memo_store = MemoStore(self.faasr)
+            memo_key = get_memo_key(self.faasr, action_name, memo_store)
+            if memo_key is None:
+                return None, None, None
+            manifest = restore_memoized_result(
+                self.faasr, action_name, memo_key, memo_store
+            )
+        except Exception as e:
+            logger.warning(f"Memoization lookup failed -- {e}")
+            return None, None, None
+        return memo_key, memo_store, manifest
+
+    def _save_memoized_result(self, action_name, memo_key, memo_store, result):
+        """
+        Saves a memoized result; errors are logged, since the action itself succeeded
+        """
+        from FaaSr_py.helpers.memoization import save_memoized_result
+
+        try:
+            save_memoized_result(self.faasr, action_name, memo_key, memo_store, result)
+        except Exception as e:
+            logger.warning(f"Failed to save memoized result -- {e}")
+
+    def run_action(self, action_name, start_time, workflow_name=""):
+        """
+        Runs an action to completion: the user function, then the epilogue
+        (.done file, triggers for the next actions and log flush, concurrently)
+
+        Action entry points (the FaaSr containers) call this in place of
+        run_func followed by Scheduler.trigger_all
+
+        Arguments:
+            action_name: str -- name of the action to run
+            start_time: datetime -- start of the action (for log timestamps)
+            workflow_name: str -- name of the workflow (prepended to GH actions)
+        Returns:
+            any -- value returned by the user function
+        """
+        function_result = self.run_func(action_name, start_time, defer_done=True)
+        self.run_epilogue(action_name, function_result, workflow_name)
+        return function_result
+
+    def run_epilogue(self, action_name, return_val=None, workflow_name=""):
+        """
+        Finishes an action run with run_func(..., defer_done=True): uploads the
+        .done file, triggers the next actions and flushes the log concurrently
+
+        Arguments:
+            action_name: str -- name of the action that ran
+            return_val: any -- value returned by the user function
+            workflow_name: str -- name of the workflow (prepended to GH actions)
+        Returns:
+            dict -- duration of each phase in seconds
+        """
+        return asyncio.run(self._run_epilogue(action_name, return_val, workflow_name))
+
+    async def _run_epilogue(self, action_name, return_val, workflow_name):
+        timings = {}
+
+        async def timed(phase, coro):
+            phase_start = time.perf_counter()
+            with trace_span(f"epilogue_{phase}"):
+                await coro
+            timings[phase] = time.perf_counter() - phase_start
+
+        epilogue_start = time.perf_counter()
+
+        # the log flush doesn't depend on anything, so it overlaps the other phases
+        log_flush = asyncio.create_task(
+            timed("log_flush", asyncio.to_thread(flush_s3_log))
+        )
+
+        # successors with multiple predecessors check for .done files,
+        # so the .done file must be visible before they are triggered
+        await timed("done", asyncio.to_thread(self._make_done, action_name))
+        await timed(
+            "triggers",
+            Scheduler(self.faasr).trigger_all_async(workflow_name, return_val),
+        )
+        await log_flush
+
+        timings["total"] = time.perf_counter() - epilogue_start
+        logger.info(
+            "Action epilogue timings (s): "
+            + ", ".join(f"{phase}={secs:.3f}" for phase, secs in timings.items())
+        )
+
+        # upload the messages logged during the epilogue
+        flush_s3_log()
+        export_trace(self.faasr)
+        return timings
+
+    def _host_server_api(self, start_time, port=None):
         """
         Starts RPC server for serverside API
 
         Arguments:
-            port: int -- port to run the server on
+            port: int -- port to run the server on (0 lets the OS pick one)
         """
-        logger.info(f"Starting server on localhost port {port}")
+        # fastapi and uvicorn are only imported once a server is needed
+        from FaaSr_py.server.faasr_server import (run_server,
+                                                  wait_for_server_start)
+
+        if port is None:
+            port = self.port
+
+        # bind here so the port is known (and reserved) before the server starts
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind(("127.0.0.1", port))
+        except OSError as e:
+            sock.close()
+            logger.error(f"Failed to bind RPC server to port {port} -- {e}")
+            sys.exit(1)
+        self.port = sock.getsockname()[1]
+        self.action_token = uuid.uuid4().hex
+
+        logger.info(f"Starting server on localhost port {self.port}")
         # flush s3 log since server process will be logging
         flush_s3_log()
-        self.server = Process(target=run_server, args=(self.faasr, port, start_time))
+        self.server = Process(
+            target=run_server,
+            args=(self.faasr, self.port, start_time, sock, self.action_token),
+        )
         self.server.start()
+        sock.close()
         logger.debug("Polling localhost")
-        wait_for_server_start(port)
+        wait_for_server_start(self.port)
+
+    def _get_rpc_env(self):
+        """
+        Returns the environment variables the client stubs use
+        to reach this action's RPC server
+
+        Returns:
+            dict -- environment variables
+        """
+        return {
+            "FAASR_SERVER_PORT": str(self.port),
+            "FAASR_ACTION_TOKEN": self.action_token or "",
+        }
 
     def terminate_server(self):
         """
@@ -216,7 +446,21 @@ class Executor:
         else:
             return args
 
-    def get_function_return(self, port=8000):
+    def _get_cran_packages(self, func_name):
+        """
+        Returns the CRAN packages declared for a function
+
+        Returns:
+            list -- package names
+        """
+        if "FunctionCRANPackage" not in self.faasr:
+            return []
+        packages = self.faasr["FunctionCRANPackage"].get(func_name) or []
+        if isinstance(packages, str):
+            packages = [packages]
+        return packages
+
+    def get_function_return(self, port=None):
         """
         Get user function result
 
@@ -226,8 +470,13 @@ class Executor:
         Returns:
             result: bool | None
         """
+        if port is None:
+            port = self.port
         try:
-            return_response = requests.get(f"http://127.0.0.1:{port}/faasr-get-return")
+            return_response = requests.get(
+                f"http://127.0.0.1:{port}/faasr-get-return",
+                headers={"X-FaaSr-Action-Token": self.action_token or ""},
+            )
             return_val = return_response.json()
         except Exception:
             err_msg = "Error getting function result"
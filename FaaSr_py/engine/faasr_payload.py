@@ -1,24 +1,38 @@
-import json
+import copy
 import logging
 import os
 import random
 import sys
 import uuid
+from collections import ChainMap
 from datetime import datetime
 from pathlib import Path
 
-import boto3
-
 from FaaSr_py.config.debug_config import global_config
+from FaaSr_py.helpers import serialization
+from FaaSr_py.helpers.data_store_checks import (check_data_stores,
+                                                get_referenced_stores)
 from FaaSr_py.helpers.faasr_lock import faasr_acquire, faasr_release
 from FaaSr_py.helpers.faasr_start_invoke_helper import faasr_get_github_raw
 from FaaSr_py.helpers.graph_functions import check_dag, validate_json
-from FaaSr_py.helpers.s3_helper_functions import (get_default_log_boto3_client,
-                                                  get_invocation_folder,
-                                                  get_logging_server)
+from FaaSr_py.helpers.s3_helper_functions import get_invocation_folder
+from FaaSr_py.helpers.storage_backends import get_logging_storage
+from FaaSr_py.helpers.tracing import trace_span
 
 logger = logging.getLogger(__name__)
 
+# parts of the workflow that never contain secrets
+SECRET_IGNORE_KEYS = frozenset(
+    {
+        "FunctionGitRepo",
+        "ActionList",
+        "FunctionCRANPackage",
+        "FunctionGitHubPackage",
+        "PyPIPackageDownloads",
+        "PackageImports",
+    }
+)
+
 
 class FaaSrPayload:
     """
@@ -39,7 +53,7 @@ class FaaSrPayload:
             token = os.getenv("TOKEN")
 
         if overwritten is None:
-            self._overwritten = None
+            self._overwritten = {}
         else:
             self._overwritten = overwritten
 
@@ -47,16 +61,33 @@ class FaaSrPayload:
 
         logger.debug("Fetching workflow from GitHub URL: {url}")
         # fetch payload from gh
-        raw_payload = faasr_get_github_raw(token=token, path=url)
-        self._base_workflow = json.loads(raw_payload)
+        with trace_span("payload_fetch", url=url):
+            raw_payload = faasr_get_github_raw(token=token, path=url)
+            self._base_workflow = serialization.loads(raw_payload)
+
+        # lookups go through overwritten fields, then real secrets (see
+        # faasr_replace_values), then the base workflow, which is only copied
+        # (shallowly) by remove and set_nested
+        self._secrets = {}
+        self._update_layers()
+        self._placeholder_index = None
+        self._copied_paths = set()
 
         # validate payload against schema
         if global_config.SKIP_SCHEMA_VALIDATE:
             logger.info("SKIPPING SCHEMA VALIDATION")
-        elif validate_json(self._base_workflow):
-            pass
         else:
-            raise ValueError("Payload validation error")
+            with trace_span("schema_validate"):
+                valid = validate_json(self._base_workflow)
+            if not valid:
+                raise ValueError("Payload validation error")
+
+        # ranks of a SLURM job array share one payload; each task gets its
+        # rank from the array task ID
+        array_task_id = os.getenv("SLURM_ARRAY_TASK_ID")
+        if os.getenv("FAASR_JOB_ARRAY") and array_task_id:
+            if not self.get("FunctionRank"):
+                self["FunctionRank"] = int(array_task_id)
 
         if self.get("FunctionRank"):
             self.log_file = f"{self["FunctionInvoke"]}({self["FunctionRank"]}).txt"
@@ -64,95 +95,163 @@ class FaaSrPayload:
             self.log_file = f"{self["FunctionInvoke"]}.txt"
 
     def __getitem__(self, key):
-        if key in self._overwritten:
-            return self._overwritten[key]
-        elif key in self._base_workflow:
-            return self._base_workflow[key]
-        raise KeyError(key)
+        return self._layers[key]
 
     def __setitem__(self, key, value):
         self._overwritten[key] = value
 
     def __delitem__(self, key):
-        present = False
-        if key in self._overwritten:
-            del self._overwritten[key]
-            present = True
-        if key in self._base_workflow:
-            del self._base_workflow[key]
-            present = True
-            return
-        if not present:
+        if key not in self:
             raise KeyError(f"{key} not found in FaaSrPayload")
+        self.remove(key)
 
     def __contains__(self, item):
-        return item in self._base_workflow or item in self._overwritten
+        return item in self._layers
 
     def __it__(self):
         return iter(self.get_complete_workflow().items())
 
     def remove(self, key):
+        # the base workflow and secrets are replaced rather than modified,
+        # since copies of this payload share them
         if key in self._base_workflow:
+            self._base_workflow = dict(self._base_workflow)
             del self._base_workflow[key]
-        if key in self._overwritten:
-            del self._overwritten[key]
+            self._placeholder_index = None
+        if key in self._secrets:
+            self._secrets = dict(self._secrets)
+            del self._secrets[key]
+            self._copied_paths = {p for p in self._copied_paths if p[0] != key}
+        self._overwritten.pop(key, None)
+        self._update_layers()
+
+    def set_nested(self, path, value):
+        """
+        Sets a nested value, e.g. ("DataStores", server, "Region"), in the
+        layer that holds it. The layer and the containers on the path are
+        copied first, so copies of this payload are unaffected
+
+        Arguments:
+            path: tuple -- keys (or list indices) leading to the value
+            value: value to set
+        """
+        for layer_name in ("_overwritten", "_secrets", "_base_workflow"):
+            if path[0] in getattr(self, layer_name):
+                break
+        else:
+            raise KeyError(f"{path[0]} not found in FaaSrPayload")
+
+        layer = dict(getattr(self, layer_name))
+        container = layer
+        for name in path[:-1]:
+            container[name] = copy.copy(container[name])
+            container = container[name]
+        container[path[-1]] = value
+        setattr(self, layer_name, layer)
+        self._update_layers()
+
+    def _update_layers(self):
+        self._layers = ChainMap(self._overwritten, self._secrets, self._base_workflow)
 
     def get(self, key, default=None):
-        if key in self._overwritten:
-            return self._overwritten[key]
-        elif key in self._base_workflow:
-            return self._base_workflow[key]
-        return default
+        return self._layers.get(key, default)
 
     @property
     def overwritten(self):
-        return self._overwritten
+        """
+        Snapshot of the overwritten fields; changes to it don't affect the
+        payload, so triggers can't corrupt each other's state
+        """
+        return dict(self._overwritten)
 
     @property
     def base_workflow(self):
         return self._base_workflow
 
+    def copy(self):
+        """
+        Returns a copy of the payload with its own overwritten fields
+
+        The base workflow and secrets are shared; remove and set_nested
+        replace them rather than modifying them, so changes to one copy
+        don't reach the others
+        """
+        payload_copy = copy.copy(self)
+        payload_copy._overwritten = dict(self._overwritten)
+        payload_copy._copied_paths = set(self._copied_paths)
+        payload_copy._update_layers()
+        return payload_copy
+
     def get_complete_workflow(self):
-        temp_dict = self._base_workflow.copy()
-        for key, val in self._overwritten.items():
-            temp_dict[key] = val
-        return temp_dict
+        return dict(self._layers)
+
+    def _get_placeholder_index(self):
+        """
+        Returns the locations of the strings in the base workflow that could
+        be secret placeholders, built once per workflow
+
+        Returns:
+            dict: string -> list of key paths (tuples) where it appears
+        """
+        if self._placeholder_index is not None:
+            return self._placeholder_index
+
+        index = {}
+
+        def add_strings(value, path):
+            if isinstance(value, dict):
+                items = value.items()
+            elif isinstance(value, list):
+                items = enumerate(value)
+            else:
+                return
+            for name, child in items:
+                if name in SECRET_IGNORE_KEYS:
+                    continue
+                if isinstance(child, (dict, list)):
+                    add_strings(child, path + (name,))
+                elif isinstance(child, str):
+                    index.setdefault(child, []).append(path + (name,))
+
+        add_strings(self._base_workflow, ())
+        self._placeholder_index = index
+        return index
 
     def faasr_replace_values(self, secrets):
         """
         Replaces filler secrets in a payload with real credentials
-        (writes result to overwritten data)
+
+        Real values are written to a layer above the base workflow; only the
+        dicts and lists on the path to a secret are copied
 
         Arguments:
             secrets: dict -- dictionary of secrets to replace in the payload
         """
-
-        def recursive_replace(payload):
-            for name in payload:
-                if name not in ignore_keys:
-                    # If the value is a list or dict, recurse
-                    if isinstance(payload[name], list) or isinstance(
-                        payload[name], dict
-                    ):
-                        recursive_replace(payload[name])
-                    # Replace value in overwritten
-                    elif payload[name] in secrets:
-                        payload[name] = secrets[payload[name]]
-
-        ignore_keys = [
-            "FunctionGitRepo",
-            "ActionList",
-            "FunctionCRANPackage",
-            "FunctionGitHubPackage",
-            "PyPIPackageDownloads",
-            "PackageImports",
-        ]
-
-        recursive_replace(self._base_workflow)
+        index = self._get_placeholder_index()
+
+        for placeholder in index.keys() & secrets.keys():
+            for path in index[placeholder]:
+                # copy the containers on the path into the secrets layer
+                container = self._secrets
+                base_container = self._base_workflow
+                prefix = ()
+                for name in path[:-1]:
+                    prefix += (name,)
+                    base_container = base_container[name]
+                    if prefix not in self._copied_paths:
+                        container[name] = copy.copy(base_container)
+                        self._copied_paths.add(prefix)
+                    container = container[name]
+                container[path[-1]] = secrets[placeholder]
 
     def s3_check(self):
         """
-        Ensures that all of the S3 data stores are valid and reachable
+        Ensures that the data stores used by this action are valid and reachable
+
+        All endpoints are validated, but only the default, logging and
+        argument-referenced stores are checked, concurrently, through the
+        storage backend (only S3 makes a request); stores that passed a
+        check recently (DataStoreChecks) are skipped
         """
         # Iterate through all of the data stores
         for server in self["DataStores"].keys():
@@ -167,31 +266,14 @@ class FaaSrPayload:
 
             # If the region is empty, then use defualt 'us-east-1'
             if not server_region:
-                self["DataStores"][server]["Region"] = "us-east-1"
-
-            if server_endpoint:
-                s3_client = boto3.client(
-                    "s3",
-                    aws_access_key_id=self["DataStores"][server]["AccessKey"],
-                    aws_secret_access_key=self["DataStores"][server]["SecretKey"],
-                    region_name=server_region,
-                    endpoint_url=server_endpoint,
-                )
-            else:
-                s3_client = boto3.client(
-                    "s3",
-                    aws_access_key_id=self["DataStores"][server]["AccessKey"],
-                    aws_secret_access_key=self["DataStores"][server]["SecretKey"],
-                    region_name=server_region,
-                )
-            # Use boto3 head bucket to ensure that the
-            # bucket exists and that we have acces to it
-            try:
-                s3_client.head_bucket(Bucket=self["DataStores"][server]["Bucket"])
-            except Exception as e:
-                err_message = f"S3 server {server} failed with message: {e}"
-                logger.exception(err_message, stack_info=True)
-                sys.exit(1)
+                self.set_nested(("DataStores", server, "Region"), "us-east-1")
+
+        failures = check_data_stores(self, get_referenced_stores(self))
+        for server, e in failures.items():
+            err_message = f"S3 server {server} failed with message: {e}"
+            logger.error(err_message)
+        if failures:
+            sys.exit(1)
 
     def _generate_invocation_timestamp(self):
         """
@@ -268,31 +350,11 @@ class FaaSrPayload:
         # Get path to log
         log_folder = get_invocation_folder(self)
 
-        if global_config.USE_LOCAL_FILE_SYSTEM:
-            log_folder.mkdir(parents=True, exist_ok=True)
-            file_count = sum(1 for p in log_folder.iterdir() if p.is_file())
-            if file_count != 0:
-                err_msg = f"InvocationID already exists: {self["InvocationID"]}"
-                logger.error(err_msg)
-                sys.exit(1)
-        else:
-            target_s3 = get_logging_server(self)
-            s3_log_info = self["DataStores"][target_s3]
-            s3_client = get_default_log_boto3_client(self)
-
-            # Check contents of log folder
-            check_log_folder = s3_client.list_objects_v2(
-                Prefix=str(log_folder), Bucket=s3_log_info["Bucket"]
-            )
-
-            # If there already is a log, log error and abort; otherwise, create log
-            if (
-                "Contents" in check_log_folder
-                and len(check_log_folder["Contents"]) != 0
-            ):
-                err_msg = f"InvocationID already exists: {self["InvocationID"]}"
-                logger.error(err_msg)
-                sys.exit(1)
+        # If there already is a log, log error and abort; otherwise, create log
+        if get_logging_storage(self).list(f"{log_folder}/"):
+            err_msg = f"InvocationID already exists: {self["InvocationID"]}"
+            logger.error(err_msg)
+            sys.exit(1)
 
     def abort_on_multiple_invocations(self, pre: dict):
         """
@@ -301,129 +363,63 @@ class FaaSrPayload:
         the first to write to the candidate set
         """
         id_folder = get_invocation_folder(self)
+        storage = get_logging_storage(self)
 
-        if global_config.USE_LOCAL_FILE_SYSTEM:
-            log_folder = Path(global_config.LOCAL_FILE_SYSTEM_DIR) / id_folder
-            for func in pre:
-                done_file = log_folder / f"function_completions/{func}.done"
-                if not done_file.exists():
-                    logger.error(
-                        f"Missing .done file for predecessor: {func} — aborting."
-                    )
-                    sys.exit(0)
-
-            # Check candidate set
-            self.check_candidate_set(id_folder)
-        else:
-            target_s3 = get_logging_server(self)
-            s3_log_info = self["DataStores"][target_s3]
-
-            # Get boto3 client for default data store
-            s3_client = get_default_log_boto3_client(self)
-
-            # First, we check if all of the other predecessor actions are done
-            # To do this, we check a file called func.done in S3
-            # and see if all of the other actions have written that they are "done"
-            # If all predecessor's are not finished, then this action aborts
-            s3_list_object_response = s3_client.list_objects_v2(
-                Bucket=s3_log_info["Bucket"], Prefix=str(id_folder)
-            )
-            s3_contents = s3_list_object_response.get("Contents", [])
-
-            s3_object_keys = []
-            for object in s3_contents:
-                if "Key" in object:
-                    s3_object_keys.append(object["Key"])
-
-            for func in pre:
-                # check if all of the predecessor func.done objects exist
-                done_file = f"{id_folder}/function_completions/{func}.done"
-
-                # if .done does not exist for a function,
-                # then the current function is still waiting for
-                # a predecessor and must abort
-                if done_file not in s3_object_keys:
-                    logger.error(
-                        f"Missing .done file for predecessor: {func} — aborting"
-                    )
-                    sys.exit(0)
-
-            # Check candidate set
-            self.check_candidate_set(id_folder, s3_log_info, s3_client)
-
-    def check_candidate_set(self, id_folder, s3_log_info=None, s3_client=None):
+        # First, we check if all of the other predecessor actions are done
+        # To do this, we check a file called func.done in the logging data store
+        # and see if all of the other actions have written that they are "done"
+        # If all predecessor's are not finished, then this action aborts
+        object_keys = set(storage.list(f"{id_folder}/function_completions/"))
+
+        for func in pre:
+            # check if all of the predecessor func.done objects exist
+            done_file = f"{id_folder}/function_completions/{func}.done"
+
+            # if .done does not exist for a function,
+            # then the current function is still waiting for
+            # a predecessor and must abort
+            if done_file not in object_keys:
+                logger.error(f"Missing .done file for predecessor: {func} — aborting")
+                sys.exit(0)
+
+        # Check candidate set
+        self.check_candidate_set(id_folder, storage)
+
+    def check_candidate_set(self, id_folder, storage):
         """
         This code is reached only if all predecessors are done.
         Now, we need to select only one action to proceed.
-        We use a weak spinlock implementation over S3 to implement atomic
-        read/modify/write operations and avoid a race condition.
+        We use a weak spinlock implementation over the logging data store to
+        implement atomic read/modify/write operations and avoid a race condition.
 
         Between lock acquire and release, we do the following:
-        1) download the "FunctionInvoke.candidate" file from S3.
-        2) append a random number to the local file, which is generated by this Action
-        3) upload the file back to the S3 bucket
-        4) download the file from S3
-        5) if the current action was the first to write to candidate set, it "wins"
+        1) append a random number, which is generated by this Action,
+           to the "FunctionInvoke.candidate" file
+        2) read the file back
+        3) if the current action was the first to write to candidate set, it "wins"
            and other actions abort
         """
-        faasr_acquire(self)
+        with trace_span("lock_acquire"):
+            faasr_acquire(self)
 
         random_number = random.randint(1, 2**31 - 1)
         candidate_filename = f"function_completions/{self['FunctionInvoke']}.candidate"
         candidate_path = Path(id_folder) / candidate_filename
 
-        if global_config.USE_LOCAL_FILE_SYSTEM:
-            candidate_full_path = (
-                Path(global_config.LOCAL_FILE_SYSTEM_DIR) / candidate_path
-            )
-            candidate_full_path.parent.mkdir(parents=True, exist_ok=True)
-
-            with candidate_full_path.open("a") as cf:
-                cf.write(str(random_number) + "\n")
-
-            final_candidate_path = candidate_full_path
-        else:
-            candidate_download_path = Path("/tmp") / candidate_path
-            candidate_download_path.parent.mkdir(parents=True, exist_ok=True)
-
-            # If exists in S3, download
-            s3_response = s3_client.list_objects_v2(
-                Bucket=s3_log_info["Bucket"], Prefix=str(candidate_path)
-            )
-            if "Contents" in s3_response and s3_response["Contents"]:
-                s3_client.download_file(
-                    Bucket=s3_log_info["Bucket"],
-                    Key=str(candidate_path),
-                    Filename=str(candidate_download_path),
-                )
-
-            with candidate_download_path.open("a") as cf:
-                cf.write(str(random_number) + "\n")
+        storage.append(candidate_path, f"{random_number}\n".encode())
 
-            with candidate_download_path.open("rb") as cf:
-                s3_client.put_object(
-                    Bucket=s3_log_info["Bucket"], Key=str(candidate_path), Body=cf
-                )
-
-            # Re-download to verify
-            s3_client.download_file(
-                Bucket=s3_log_info["Bucket"],
-                Key=str(candidate_path),
-                Filename=str(candidate_download_path),
-            )
-
-            final_candidate_path = candidate_download_path
+        # Re-read to verify
+        try:
+            candidates = storage.read_bytes(candidate_path)
+        except FileNotFoundError:
+            logger.error(f"Candidate file missing after write: {candidate_path}")
+            sys.exit(1)
 
         # Release lock
         faasr_release(self)
 
         # Read first line and compare
-        if not final_candidate_path.exists():
-            logger.error(f"Candidate file missing after write: {final_candidate_path}")
-            sys.exit(1)
-
-        with final_candidate_path.open("r") as f:
-            first_line = int(f.readline().strip())
+        first_line = int(candidates.decode().splitlines()[0].strip())
 
         if random_number != first_line:
             logger.error("Not the last trigger invoked — random number does not match")
@@ -434,13 +430,15 @@ class FaaSrPayload:
         # If the payload is a DAG, then
         # this function returns a predecessor list for the workflow
         # If the payload is not a DAG, then the action aborts
-        pre = check_dag(self)
+        with trace_span("check_dag"):
+            pre = check_dag(self)
 
         # Verfies the validity of S3 data stores,
         # checking the server status and ensuring that the specified bucket exists
         # If any of the S3 endpoints are invalid
         # or any data store server are unreachable, the action aborts
-        self.s3_check()
+        with trace_span("s3_check"):
+            self.s3_check()
 
         # Initialize log if this is the first action in the workflow
         if len(pre) == 0:
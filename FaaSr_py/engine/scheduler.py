@@ -1,14 +1,15 @@
-import json
+import asyncio
 import logging
 import os
 import re
 import sys
 
-import boto3
 import requests
 
 from FaaSr_py.config.debug_config import global_config
 from FaaSr_py.engine.faasr_payload import FaaSrPayload
+from FaaSr_py.helpers import serialization
+from FaaSr_py.helpers.tracing import trace_span
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +33,120 @@ class Scheduler:
         Arguments:
             return_val: any -- value returned by the user function, used for conditionals
         """
+        packed_jobs, next_triggers = self._pack_triggers(
+            self._get_next_triggers(return_val)
+        )
+        # each trigger gets its own copy of the payload, since trigger_func
+        # sets FunctionInvoke and FunctionRank
+        for server_name, actions in packed_jobs:
+            Scheduler(self.faasr.copy()).trigger_packed(
+                workflow_name, server_name, actions
+            )
+        for next_trigger in next_triggers:
+            Scheduler(self.faasr.copy()).trigger_func(workflow_name, next_trigger)
+
+    async def trigger_all_async(self, workflow_name="", return_val=None):
+        """
+        Triggers all the next actions in the DAG concurrently
+
+        Each trigger runs in a worker thread with its own copy of the payload,
+        since trigger_func sets FunctionInvoke and FunctionRank
+
+        Arguments:
+            return_val: any -- value returned by the user function, used for conditionals
+        """
+        packed_jobs, next_triggers = self._pack_triggers(
+            self._get_next_triggers(return_val)
+        )
+        triggers = [
+            asyncio.to_thread(
+                Scheduler(self.faasr.copy()).trigger_packed,
+                workflow_name,
+                server_name,
+                actions,
+            )
+            for server_name, actions in packed_jobs
+        ]
+        triggers += [
+            asyncio.to_thread(
+                Scheduler(self.faasr.copy()).trigger_func, workflow_name, next_trigger
+            )
+            for next_trigger in next_triggers
+        ]
+        await asyncio.gather(*triggers)
+
+    def _pack_triggers(self, next_triggers):
+        """
+        Groups the triggers that go to SLURM servers with PackActions set,
+        so each group can run in a single allocation
+
+        Arguments:
+            next_triggers: list[str] -- action names (with rank suffix if present)
+        Returns:
+            (list[(str, list[(str, int | None)]]), list[str]):
+            packed jobs as (server name, (function, rank) of each action),
+            and the triggers that aren't packed
+        """
+        packed = {}
+        unpacked = []
+        for next_trigger in next_triggers:
+            parts = re.split(r"[()]", next_trigger)
+            function = parts[0]
+            rank_num = int(parts[1]) if len(parts) > 1 else 1
+
+            server_name = self.faasr["ActionList"][function]["FaaSServer"]
+            server = self.faasr["ComputeServers"].get(server_name, {})
+            if server.get("FaaSType") != "SLURM" or not server.get("PackActions"):
+                unpacked.append(next_trigger)
+                continue
+
+            if rank_num > 1:
+                actions = [(function, rank) for rank in range(1, rank_num + 1)]
+            else:
+                actions = [(function, None)]
+            packed.setdefault(server_name, []).extend(actions)
+
+        # split groups that are larger than MaxPackedActions
+        packed_jobs = []
+        for server_name, actions in packed.items():
+            max_actions = self.faasr["ComputeServers"][server_name].get(
+                "MaxPackedActions"
+            ) or len(actions)
+            while actions:
+                packed_jobs.append((server_name, actions[:max_actions]))
+                actions = actions[max_actions:]
+        return packed_jobs, unpacked
+
+    def trigger_packed(self, workflow_name, server_name, actions):
+        """
+        Triggers several actions on a SLURM server as a single packed job
+
+        Arguments:
+            server_name: str -- name of the SLURM compute server
+            actions: list[(str, int | None)] -- (function, rank) of each action
+        """
+        next_compute_server = self.faasr["ComputeServers"][server_name]
+        with trace_span(
+            "trigger",
+            target=",".join(function for function, _ in actions),
+            packed=len(actions),
+            faas_type=next_compute_server["FaaSType"],
+        ):
+            if global_config.SKIP_REAL_TRIGGERS:
+                names = [f"{f}.{rank}" if rank else f for f, rank in actions]
+                logger.info(f"SIMULATED PACKED TRIGGER: {', '.join(names)}")
+                return
+            self.invoke_slurm_packed(next_compute_server, actions, workflow_name)
+
+    def _get_next_triggers(self, return_val=None):
+        """
+        Returns the next actions to trigger
+
+        Arguments:
+            return_val: any -- value returned by the user function, used for conditionals
+        Returns:
+            list[str] -- action names (with rank suffix if present)
+        """
         # Get a list of the next functions to invoke
         curr_func = self.faasr["FunctionInvoke"]
         invoke_next = self.faasr["ActionList"][curr_func]["InvokeNext"]
@@ -42,7 +157,7 @@ class Scheduler:
         if not invoke_next:
             msg = f"no triggers for {curr_func}"
             logger.info(msg)
-            return
+            return []
 
         # Ensure that function returned a value if conditionals are present
         if contains_dict(invoke_next) and return_val is None:
@@ -52,16 +167,17 @@ class Scheduler:
             logger.error(err_msg)
             sys.exit(1)
 
+        next_triggers = []
         for next_trigger in invoke_next:
             if isinstance(next_trigger, dict):
                 conditional_invoke_next = next_trigger.get(str(return_val))
                 if isinstance(conditional_invoke_next, str):
-                    self.trigger_func(workflow_name, conditional_invoke_next)
+                    next_triggers.append(conditional_invoke_next)
                 else:
-                    for func in conditional_invoke_next:
-                        self.trigger_func(workflow_name, func)
+                    next_triggers.extend(conditional_invoke_next)
             else:
-                self.trigger_func(workflow_name, next_trigger)
+                next_triggers.append(next_trigger)
+        return next_triggers
 
     def trigger_func(self, workflow_name, function):
         """
@@ -84,6 +200,40 @@ class Scheduler:
         if global_config.SKIP_REAL_TRIGGERS:
             logger.info("SKIPPING REAL TRIGGERS")
 
+        if next_server not in self.faasr["ComputeServers"]:
+            err_msg = f"invalid server name: {next_server}"
+            logger.error(err_msg)
+            sys.exit(1)
+
+        next_compute_server = self.faasr["ComputeServers"][next_server]
+        next_server_type = next_compute_server["FaaSType"]
+
+        # submit all ranks as a single SLURM job array; each array task
+        # gets its FunctionRank from SLURM_ARRAY_TASK_ID
+        if (
+            rank_num > 1
+            and next_server_type == "SLURM"
+            and next_compute_server.get("UseJobArrays")
+        ):
+            if "FunctionRank" in self.faasr:
+                del self.faasr["FunctionRank"]
+            with trace_span(
+                "trigger",
+                target=function,
+                ranks=rank_num,
+                faas_type=next_server_type,
+            ):
+                if not global_config.SKIP_REAL_TRIGGERS:
+                    self.invoke_slurm(
+                        next_compute_server,
+                        function,
+                        workflow_name,
+                        array_size=rank_num,
+                    )
+                else:
+                    logger.info(f"SIMULATED TRIGGER: {function}.[1-{rank_num}]")
+            return
+
         for rank in range(1, rank_num + 1):
             if rank_num > 1:
                 self.faasr["FunctionRank"] = rank  # add functionrank to overwritten
@@ -91,40 +241,40 @@ class Scheduler:
                 if "FunctionRank" in self.faasr:
                     del self.faasr["FunctionRank"]
 
-            if next_server not in self.faasr["ComputeServers"]:
-                err_msg = f"invalid server name: {next_server}"
-                logger.error(err_msg)
-                sys.exit(1)
-
-            next_compute_server = self.faasr["ComputeServers"][next_server]
-            next_server_type = next_compute_server["FaaSType"]
-
-            if not global_config.SKIP_REAL_TRIGGERS:
-                match (next_server_type):
-                    case "OpenWhisk":
-                        self.invoke_ow(next_compute_server, function, workflow_name)
-                    case "Lambda":
-                        self.invoke_lambda(
-                            next_compute_server, function, workflow_name
-                        )
-                    case "GitHubActions":
-                        self.invoke_gh(
-                            next_compute_server, function, workflow_name
-                        )  # to-do add workflowname
-                    case "SLURM":
-                        self.invoke_slurm(
-                            next_compute_server, function, workflow_name
-                        )
-                    case "GoogleCloud":
-                        self.invoke_googlecloud(
-                            next_compute_server, function, workflow_name
-                        )
+            # the successor's first span is compared against this one to get
+            # the trigger delay
+            with trace_span(
+                "trigger",
+                target=function,
+                rank=rank if rank_num > 1 else None,
+                faas_type=next_server_type,
+            ):
+                if not global_config.SKIP_REAL_TRIGGERS:
+                    match (next_server_type):
+                        case "OpenWhisk":
+                            self.invoke_ow(next_compute_server, function, workflow_name)
+                        case "Lambda":
+                            self.invoke_lambda(
+                                next_compute_server, function, workflow_name
+                            )
+                        case "GitHubActions":
+                            self.invoke_gh(
+                                next_compute_server, function, workflow_name
+                            )  # to-do add workflowname
+                        case "SLURM":
+                            self.invoke_slurm(
+                                next_compute_server, function, workflow_name
+                            )
+                        case "GoogleCloud":
+                            self.invoke_googlecloud(
+                                next_compute_server, function, workflow_name
+                            )
 
-            else:
-                msg = f"SIMULATED TRIGGER: {function}"
-                if rank_num > 1:
-                    msg += f".{rank}"
-                logger.info(msg)
+                else:
+                    msg = f"SIMULATED TRIGGER: {function}"
+                    if rank_num > 1:
+                        msg += f".{rank}"
+                    logger.info(msg)
 
     def invoke_gh(self, next_compute_server, function, workflow_name=None):
         """
@@ -164,7 +314,7 @@ class Scheduler:
             overwritten_fields["ComputeServers"] = self.faasr["ComputeServers"]
             overwritten_fields["DataStores"] = self.faasr["DataStores"]
 
-        json_overwritten = json.dumps(overwritten_fields)
+        json_overwritten = serialization.dumps(overwritten_fields)
 
         inputs = {
             "OVERWRITTEN": json_overwritten,
@@ -247,6 +397,8 @@ class Scheduler:
             function = f"{workflow_name}-{function}"
             logger.debug(f"Prepending workflow name. Full function: {function}")
 
+        import boto3
+
         # Create client for invoking lambda function
         lambda_client = boto3.client(
             "lambda",
@@ -271,14 +423,14 @@ class Scheduler:
 
         try:
             payload = {
-                "OVERWRITTEN": json.dumps(overwritten_fields),
+                "OVERWRITTEN": serialization.dumps(overwritten_fields),
                 "PAYLOAD_URL": self.faasr.url,
             }
 
             response = lambda_client.invoke(
                 FunctionName=function,
                 InvocationType="Event",
-                Payload=json.dumps(payload),
+                Payload=serialization.dumps(payload),
             )
         except Exception as e:
             logger.exception(e, stack_info=True)
@@ -352,7 +504,7 @@ class Scheduler:
             "PAYLOAD_URL": self.faasr.url,
         }
         # Create body for POST
-        json_payload = json.dumps(payload_dict)
+        json_payload = serialization.dumps(payload_dict)
 
         # Issue POST request
         try:
@@ -384,7 +536,9 @@ class Scheduler:
             logger.error(err_msg)
             sys.exit(1)
 
-    def invoke_slurm(self, next_compute_server, function, workflow_name=None):
+    def invoke_slurm(
+        self, next_compute_server, function, workflow_name=None, array_size=None
+    ):
         """
         Trigger SLURM job for next function
         Follows the same pattern as GitHub Actions with URL + overwritten fields + secrets
@@ -392,25 +546,167 @@ class Scheduler:
         Arguments:
             next_compute_server: dict -- next compute server configuration
             function: str -- name of the function to invoke
+            array_size: int -- if set, submit a job array with tasks 1..array_size
+            (one per rank) instead of a single job
         """
 
         from FaaSr_py.helpers.slurm_helper import (create_job_script,
-                                                   get_resource_requirements,
-                                                   make_slurm_request,
-                                                   validate_jwt_token)
+                                                   get_resource_requirements)
 
         if workflow_name:
             function = f"{workflow_name}-{function}"
             logger.debug(f"Prepending workflow name. Full function: {function}")
 
-        # Get server configuration
         server_info = next_compute_server
-        api_version = server_info.get("APIVersion", "v0.0.37")
-        endpoint = server_info["Endpoint"]
+        self._validate_slurm_server(server_info, function)
 
-        # Ensure endpoint has protocol
-        if not endpoint.startswith("http"):
-            endpoint = f"http://{endpoint}"
+        # Prepare environment variables for SLURM job
+        environment_vars = {
+            "PAYLOAD_URL": self.faasr.url,  # URL to GitHub-hosted workflow JSON
+            "OVERWRITTEN": serialization.dumps(
+                self._get_slurm_overwritten(next_compute_server)
+            ),
+        }
+
+        # Create job script
+        job_script = create_job_script(
+            self.faasr,
+            function,
+            environment_vars,
+            array_size=array_size,
+            server_info=server_info,
+        )
+
+        # Get resource requirements for the function
+        resource_config = get_resource_requirements(self.faasr, function, server_info)
+
+        self._add_slurm_secrets(environment_vars)
+
+        # Prepare job payload with resource requirements
+        job_payload = {
+            "job": {
+                "name": f"faasr-{function}",
+                "partition": resource_config["partition"],
+                "nodes": str(resource_config["nodes"]),
+                "tasks": str(resource_config["tasks"]),
+                "cpus_per_task": str(resource_config["cpus_per_task"]),
+                "memory_per_cpu": str(resource_config["memory_mb"]),
+                "time_limit": str(resource_config["time_limit"]),
+                "current_working_directory": resource_config["working_dir"],
+                "environment": environment_vars,
+            },
+            "script": job_script,
+        }
+
+        # slurmrestd ignores #SBATCH lines, so the array must be in the payload
+        if array_size:
+            job_payload["job"]["array"] = f"1-{array_size}"
+
+        job_id = self._submit_slurm_job(server_info, job_payload)
+
+        succ_msg = (
+            f"SLURM: Successfully submitted job: {self.faasr['FunctionInvoke']} "
+            f"(Job ID: {job_id})"
+        )
+        if array_size:
+            succ_msg += f" as job array 1-{array_size}"
+        logger.info(succ_msg)
+
+    def invoke_slurm_packed(self, next_compute_server, actions, workflow_name=None):
+        """
+        Submits one SLURM job that runs several actions in a single allocation
+        (PackActions), so short actions share the scheduler and container
+        start latency
+
+        Arguments:
+            next_compute_server: dict -- next compute server configuration
+            actions: list[(str, int | None)] -- (function, rank) of each action
+        """
+        from FaaSr_py.helpers.slurm_helper import (create_packed_job_script,
+                                                   get_container_image,
+                                                   get_resource_requirements)
+
+        server_info = next_compute_server
+        pack_mode = server_info.get("PackMode", "parallel")
+
+        names = [
+            f"{function}.{rank}" if rank else function for function, rank in actions
+        ]
+        jobname = f"{names[0]}-packed-{len(actions)}"
+        if workflow_name:
+            jobname = f"{workflow_name}-{jobname}"
+        self._validate_slurm_server(server_info, jobname)
+
+        # each action gets its own OVERWRITTEN (FunctionInvoke and FunctionRank)
+        packed_actions = []
+        for (function, rank), name in zip(actions, names):
+            self.faasr["FunctionInvoke"] = function
+            if rank:
+                self.faasr["FunctionRank"] = rank
+            elif "FunctionRank" in self.faasr:
+                del self.faasr["FunctionRank"]
+            packed_actions.append(
+                {
+                    "name": name,
+                    "image": get_container_image(self.faasr, function),
+                    "overwritten": serialization.dumps(
+                        self._get_slurm_overwritten(server_info)
+                    ),
+                }
+            )
+
+        environment_vars = {"PAYLOAD_URL": self.faasr.url}
+        job_script = create_packed_job_script(
+            self.faasr,
+            jobname,
+            packed_actions,
+            environment_vars,
+            server_info=server_info,
+            pack_mode=pack_mode,
+        )
+
+        # the allocation must fit the largest action; in parallel mode
+        # every action gets its own task
+        resource_configs = [
+            get_resource_requirements(self.faasr, function, server_info)
+            for function, _ in actions
+        ]
+        resource_config = max(resource_configs, key=lambda r: r["cpus_per_task"])
+        tasks = len(actions) if pack_mode == "parallel" else 1
+        time_limit = max(r["time_limit"] for r in resource_configs)
+        if pack_mode == "sequential":
+            time_limit = sum(r["time_limit"] for r in resource_configs)
+
+        self._add_slurm_secrets(environment_vars)
+
+        job_payload = {
+            "job": {
+                "name": f"faasr-{jobname}",
+                "partition": resource_config["partition"],
+                "nodes": str(resource_config["nodes"]),
+                "tasks": str(tasks),
+                "cpus_per_task": str(resource_config["cpus_per_task"]),
+                "memory_per_cpu": str(
+                    max(r["memory_mb"] for r in resource_configs)
+                ),
+                "time_limit": str(time_limit),
+                "current_working_directory": resource_config["working_dir"],
+                "environment": environment_vars,
+            },
+            "script": job_script,
+        }
+
+        job_id = self._submit_slurm_job(server_info, job_payload)
+        logger.info(
+            f"SLURM: Successfully submitted packed job for {', '.join(names)} "
+            f"(Job ID: {job_id}, mode: {pack_mode})"
+        )
+
+    def _validate_slurm_server(self, server_info, function):
+        """
+        Exits if the SLURM server's token or username is invalid
+        """
+        from FaaSr_py.helpers.slurm_helper import validate_jwt_token
 
         # Validate JWT token (same validation as R package)
         token = server_info.get("Token")
@@ -436,7 +732,11 @@ class Scheduler:
             logger.error(err_msg)
             sys.exit(1)
 
-        # Create overwritten fields for the next action (following GitHub Actions pattern)
+    def _get_slurm_overwritten(self, next_compute_server):
+        """
+        Returns the overwritten fields for the next SLURM action
+        (following GitHub Actions pattern)
+        """
         overwritten_fields = self.faasr.overwritten.copy()
 
         if next_compute_server.get("UseSecretStore"):
@@ -457,20 +757,13 @@ class Scheduler:
             logger.info(
                 "Next SLURM action expects secrets in payload - including credentials"
             )
+        return overwritten_fields
 
-        # Prepare environment variables for SLURM job
-        environment_vars = {
-            "PAYLOAD_URL": self.faasr.url,  # URL to GitHub-hosted workflow JSON
-            "OVERWRITTEN": json.dumps(overwritten_fields, separators=(",", ":")),
-        }
-
-        # Create job script
-        job_script = create_job_script(self.faasr, function, environment_vars)
-
-        # Get resource requirements for the function
-        resource_config = get_resource_requirements(self.faasr, function, server_info)
-
-        # Add secrets only if UseSecretStore is False for current server
+    def _add_slurm_secrets(self, environment_vars):
+        """
+        Adds secrets to the job environment only if UseSecretStore
+        is False for current server
+        """
         current_func = self.faasr["FunctionInvoke"]
         current_server = self.faasr["ActionList"][current_func]["FaaSServer"]
         current_compute_server = self.faasr["ComputeServers"][current_server]
@@ -481,30 +774,31 @@ class Scheduler:
                 "ComputeServers": self.faasr["ComputeServers"],
                 "DataStores": self.faasr["DataStores"],
             }
-            environment_vars["SECRET_PAYLOAD"] = json.dumps(
-                secrets_payload, separators=(",", ":")
-            )
+            environment_vars["SECRET_PAYLOAD"] = serialization.dumps(secrets_payload)
 
         else:
             logger.info(
                 "Current server uses secret store - secrets will be fetched by SLURM job"
             )
 
-        # Prepare job payload with resource requirements
-        job_payload = {
-            "job": {
-                "name": f"faasr-{function}",
-                "partition": resource_config["partition"],
-                "nodes": str(resource_config["nodes"]),
-                "tasks": str(resource_config["tasks"]),
-                "cpus_per_task": str(resource_config["cpus_per_task"]),
-                "memory_per_cpu": str(resource_config["memory_mb"]),
-                "time_limit": str(resource_config["time_limit"]),
-                "current_working_directory": resource_config["working_dir"],
-                "environment": environment_vars,
-            },
-            "script": job_script,
-        }
+    def _submit_slurm_job(self, server_info, job_payload):
+        """
+        Submits a job to the SLURM REST API
+
+        Arguments:
+            server_info: dict -- SLURM compute server configuration
+            job_payload: dict -- job submission body
+        Returns:
+            str: job ID
+        """
+        from FaaSr_py.helpers.slurm_helper import make_slurm_request
+
+        api_version = server_info.get("APIVersion", "v0.0.37")
+        endpoint = server_info["Endpoint"]
+
+        # Ensure endpoint has protocol
+        if not endpoint.startswith("http"):
+            endpoint = f"http://{endpoint}"
 
         # Submit job
         submit_url = f"{endpoint}/slurm/{api_version}/job/submit"
@@ -517,8 +811,8 @@ class Scheduler:
                 method="POST",
                 headers=None,
                 body=job_payload,
-                token=token,
-                username=username,
+                token=server_info.get("Token"),
+                username=server_info.get("UserName", "ubuntu"),
             )
 
             if response.status_code in [200, 201, 202]:
@@ -536,12 +830,7 @@ class Scheduler:
                     )
                     or "unknown"
                 )
-
-                succ_msg = (
-                    f"SLURM: Successfully submitted job: {self.faasr['FunctionInvoke']} "
-                    f"(Job ID: {job_id})"
-                )
-                logger.info(succ_msg)
+                return job_id
             else:
                 error_content = response.text
                 err_msg = (
@@ -573,7 +862,8 @@ class Scheduler:
         Trigger Google Cloud Run job using GitHub Actions style with environment variables
         """
 
-        from FaaSr_py.helpers.gcp_auth import refresh_gcp_access_token
+        from FaaSr_py.helpers.gcp_auth import (get_gcp_access_token,
+                                               get_shared_gcp_tokens)
 
         if workflow_name:
             function = f"{workflow_name}-{function}"
@@ -613,6 +903,10 @@ class Scheduler:
         if self.faasr.get("FunctionRank"):
             overwritten["FunctionRank"] = self.faasr["FunctionRank"]
 
+        # Pass on recent data store checks so the next action can skip them
+        if self.faasr.get("DataStoreChecks"):
+            overwritten["DataStoreChecks"] = self.faasr["DataStoreChecks"]
+
         # Handle UseSecretStore=False case
         use_secret_store = next_compute_server.get("UseSecretStore", True)
         if not use_secret_store:
@@ -647,13 +941,18 @@ class Scheduler:
                 logger.error("Could not find server name for GCP authentication")
                 sys.exit(1)
 
-            access_token = refresh_gcp_access_token(self.faasr, server_name)
+            access_token = get_gcp_access_token(self.faasr, server_name)
         except Exception as e:
             logger.error(f"Failed to refresh GCP access token: {e}")
             sys.exit(1)
 
+        # pass cached tokens on so the next action doesn't request its own
+        shared_tokens = get_shared_gcp_tokens(self.faasr)
+        if shared_tokens:
+            overwritten["GCPAccessTokens"] = shared_tokens
+
         # Create environment variables exactly like GitHub Actions
-        json_overwritten = json.dumps(overwritten)
+        json_overwritten = serialization.dumps(overwritten)
 
         # Define environment variables
         env_vars = [
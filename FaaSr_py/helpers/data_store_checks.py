@@ -0,0 +1,116 @@
+import hashlib
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from FaaSr_py.helpers.storage_backends import get_storage_backend
+
+logger = logging.getLogger(__name__)
+
+# successful checks are passed to successor actions in DataStoreChecks
+# and reused for this many seconds (unless the workflow sets DataStoreCheckTTL)
+DEFAULT_CHECK_TTL = 300
+MAX_CHECK_WORKERS = 8
+
+
+def get_referenced_stores(faasr_payload):
+    """
+    Returns the data stores the current action can be expected to use:
+    the default and logging stores, and any store named in its Arguments
+
+    Arguments:
+        faasr_payload: FaaSrPayload instance
+    Returns:
+        list[str]: data store names
+    """
+    data_stores = faasr_payload["DataStores"]
+    stores = [
+        faasr_payload.get("DefaultDataStore"),
+        faasr_payload.get("LoggingDataStore"),
+    ]
+
+    def find_store_names(value):
+        if isinstance(value, str):
+            if value in data_stores:
+                stores.append(value)
+        elif isinstance(value, dict):
+            for item in value.values():
+                find_store_names(item)
+        elif isinstance(value, list):
+            for item in value:
+                find_store_names(item)
+
+    action = faasr_payload["ActionList"].get(faasr_payload.get("FunctionInvoke"), {})
+    find_store_names(action.get("Arguments", {}))
+
+    return [store for store in dict.fromkeys(stores) if store in data_stores]
+
+
+def get_check_key(server_config):
+    """
+    Returns the cache key of a data store check; it changes if the endpoint,
+    bucket or credentials of the store change
+    """
+    fields = ("Endpoint", "Region", "Bucket", "AccessKey")
+    key = "|".join(str(server_config.get(field) or "") for field in fields)
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def check_data_store(faasr_payload, server_name):
+    """
+    Checks that a data store is reachable through the configured storage
+    backend (for S3, that the bucket exists and we have access to it)
+
+    Raises:
+        Exception: if the data store is unreachable
+    """
+    get_storage_backend(faasr_payload, server_name).check()
+
+
+def check_data_stores(faasr_payload, server_names):
+    """
+    Checks data stores concurrently, skipping stores that passed a check
+    within the TTL. Successful checks are recorded in
+    faasr_payload["DataStoreChecks"] so successor actions can skip them
+
+    Arguments:
+        faasr_payload: FaaSrPayload instance
+        server_names: list[str] -- data stores to check
+    Returns:
+        dict: server name -> exception, for each store that failed
+    """
+    ttl = faasr_payload.get("DataStoreCheckTTL", DEFAULT_CHECK_TTL)
+    checks = dict(faasr_payload.get("DataStoreChecks") or {})
+    now = time.time()
+
+    to_check = {}
+    for server in server_names:
+        server_config = faasr_payload["DataStores"][server]
+        check_key = get_check_key(server_config)
+        if now - checks.get(check_key, 0) < ttl:
+            logger.debug(f"Skipping check of data store {server} (checked recently)")
+            continue
+        to_check[server] = (check_key, server_config)
+
+    failures = {}
+    if to_check:
+        with ThreadPoolExecutor(
+            max_workers=min(MAX_CHECK_WORKERS, len(to_check))
+        ) as executor:
+            futures = {
+                server: executor.submit(check_data_store, faasr_payload, server)
+                for server in to_check
+            }
+        for server, future in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                failures[server] = e
+            else:
+                checks[to_check[server][0]] = now
+
+    # drop expired entries so the payload doesn't grow with every action
+    checks = {key: ts for key, ts in checks.items() if now - ts < ttl}
+    if checks or faasr_payload.get("DataStoreChecks"):
+        faasr_payload["DataStoreChecks"] = checks
+    return failures
@@ -0,0 +1,234 @@
+import hashlib
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tarfile
+from pathlib import Path
+
+from FaaSr_py.helpers.faasr_start_invoke_helper import (
+    CRAN_REPO, get_pip_gh_url, link_r_library)
+from FaaSr_py.helpers.s3_helper_functions import get_logging_server
+from FaaSr_py.helpers.storage_backends import get_logging_storage
+from FaaSr_py.s3_api import faasr_get_file, faasr_put_file
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = "/tmp/faasr_snapshot"
+SNAPSHOT_FOLDER = "FaaSrSnapshots"
+
+
+def _get_packages(faasr_source, key, func_name):
+    """Returns the packages declared under key for func_name as a list"""
+    if key not in faasr_source:
+        return []
+    packages = faasr_source[key].get(func_name)
+    if not packages:
+        return []
+    if isinstance(packages, str):
+        return [packages]
+    return list(packages)
+
+
+def get_snapshot_hash(faasr_source, func_type, func_name):
+    """
+    Returns a hash identifying an action's dependency set
+
+    The hash covers the declared packages and the interpreter/platform,
+    so snapshots are only reused where they can be loaded
+
+    Arguments:
+        faasr_source: faasr payload (FaaSr)
+        func_type: Python or R
+        func_name: name of the user function
+    Returns:
+        str | None: hex digest, or None if the action has no dependencies
+    """
+    dependencies = {
+        "Type": func_type,
+        "PyPIPackageDownloads": _get_packages(
+            faasr_source, "PyPIPackageDownloads", func_name
+        ),
+        "FunctionCRANPackage": _get_packages(
+            faasr_source, "FunctionCRANPackage", func_name
+        ),
+        "FunctionGitHubPackage": _get_packages(
+            faasr_source, "FunctionGitHubPackage", func_name
+        ),
+    }
+    if func_type == "Python":
+        dependencies.pop("FunctionCRANPackage")
+    else:
+        dependencies.pop("PyPIPackageDownloads")
+
+    if not any(v for k, v in dependencies.items() if k != "Type"):
+        return None
+
+    dependencies["Platform"] = [
+        platform.machine(),
+        platform.system(),
+        f"{sys.version_info.major}.{sys.version_info.minor}",
+    ]
+    encoded = json.dumps(dependencies, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def _snapshot_exists(faasr_source, remote_path):
+    """
+    Checks if a snapshot exists in the logging data store
+    """
+    return get_logging_storage(faasr_source).exists(remote_path)
+
+
+def _activate_snapshot(func_type, local_dir):
+    """
+    Makes the packages in an extracted snapshot visible to the user function
+    """
+    if func_type == "Python":
+        python_dir = str(local_dir / "python")
+        if python_dir not in sys.path:
+            sys.path.insert(0, python_dir)
+        python_path = os.environ.get("PYTHONPATH")
+        os.environ["PYTHONPATH"] = (
+            f"{python_dir}{os.pathsep}{python_path}" if python_path else python_dir
+        )
+    else:
+        link_r_library(str(local_dir / "Rlibs"), "/tmp/Rlibs")
+
+
+def _build_r_snapshot(cran_packages, gh_packages, lib_path):
+    """
+    Installs R packages and all of their dependencies into lib_path
+
+    The R session only sees lib_path and the base library, so packages
+    already in the image's site library or the dependency cache are still
+    installed (the snapshot must load on hosts that don't have them)
+    """
+    os.makedirs(lib_path, exist_ok=True)
+    cran = ", ".join(f'"{package}"' for package in cran_packages)
+    gh = ", ".join(f'"{package}"' for package in gh_packages)
+    ncpus = os.cpu_count() or 1
+    lines = [
+        f"cran <- c({cran})",
+        f"gh <- c({gh})",
+        # loaded before the library paths are restricted below
+        'if (length(gh) > 0) loadNamespace("remotes")',
+        # .libPaths() always keeps the site library, so set the paths directly
+        f'assign(".lib.loc", c("{lib_path}", .Library), '
+        f"envir=environment(.libPaths))",
+        f'if (length(cran) > 0) install.packages(cran, lib="{lib_path}", '
+        f'repos="{CRAN_REPO}", dependencies=TRUE, Ncpus={ncpus})',
+        f'if (length(gh) > 0) remotes::install_github(gh, lib="{lib_path}", '
+        f'repos="{CRAN_REPO}", upgrade="never", Ncpus={ncpus})',
+        f'installed <- rownames(installed.packages(lib.loc="{lib_path}"))',
+        "failed <- setdiff(cran, installed)",
+        'if (length(failed) > 0) { message("Failed: ", failed); quit(status=1) }',
+    ]
+
+    command = ["Rscript", "-e", "; ".join(lines)]
+    result = subprocess.run(command, text=True, capture_output=True)
+    if result.returncode != 0:
+        logger.error(
+            f"Failed to build R snapshot:\n"
+            f"std err: {result.stderr}\n"
+            f"std out: {result.stdout}"
+        )
+        raise RuntimeError(f"Install failed for {cran_packages + gh_packages}")
+
+
+def _build_snapshot(faasr_source, func_type, func_name, local_dir):
+    """
+    Installs an action's dependencies into local_dir
+    """
+    gh_packages = _get_packages(faasr_source, "FunctionGitHubPackage", func_name)
+
+    if func_type == "Python":
+        packages = _get_packages(faasr_source, "PyPIPackageDownloads", func_name)
+        packages += [get_pip_gh_url(path) for path in gh_packages]
+        command = ["pip", "install", "--no-input", "--target"]
+        command += [str(local_dir / "python")]
+        result = subprocess.run(command + packages, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Install failed for {packages}")
+    else:
+        cran_packages = _get_packages(faasr_source, "FunctionCRANPackage", func_name)
+        _build_r_snapshot(cran_packages, gh_packages, str(local_dir / "Rlibs"))
+
+
+def faasr_install_from_snapshot(faasr_source, func_type, func_name):
+    """
+    Installs an action's dependencies from a snapshot stored in the logging
+    data store, building and uploading the snapshot if it doesn't exist yet
+
+    Arguments:
+        faasr_source: faasr payload (FaaSr)
+        func_type: Python or R
+        func_name: name of the user function
+    Returns:
+        bool: True if dependencies were installed from (or into) a snapshot,
+        False if the caller should install dependencies normally
+    """
+    snapshot_hash = get_snapshot_hash(faasr_source, func_type, func_name)
+    if not snapshot_hash:
+        return False
+
+    local_dir = Path(SNAPSHOT_DIR) / snapshot_hash
+    marker = local_dir / ".faasr_complete"
+    tar_name = f"{func_name}-{snapshot_hash}.tar.gz"
+    remote_folder = f"{SNAPSHOT_FOLDER}/{func_name}"
+    log_server = get_logging_server(faasr_source)
+
+    # already extracted on this host (warm container)
+    if marker.is_file():
+        logger.info(f"Using local dependency snapshot {snapshot_hash}")
+        _activate_snapshot(func_type, local_dir)
+        return True
+
+    if local_dir.exists():
+        shutil.rmtree(local_dir)
+    local_dir.mkdir(parents=True)
+    tar_path = Path(SNAPSHOT_DIR) / tar_name
+
+    try:
+        if _snapshot_exists(faasr_source, Path(remote_folder) / tar_name):
+            logger.info(f"Restoring dependency snapshot {snapshot_hash}")
+            faasr_get_file(
+                faasr_payload=faasr_source,
+                local_file=tar_name,
+                remote_file=tar_name,
+                server_name=log_server,
+                local_folder=SNAPSHOT_DIR,
+                remote_folder=remote_folder,
+            )
+            with tarfile.open(tar_path, "r:gz") as tar:
+                tar.extractall(path=local_dir, filter="data")
+        else:
+            logger.info(f"Building dependency snapshot {snapshot_hash}")
+            _build_snapshot(faasr_source, func_type, func_name, local_dir)
+
+            with tarfile.open(tar_path, "w:gz") as tar:
+                for entry in local_dir.iterdir():
+                    tar.add(entry, arcname=entry.name)
+            faasr_put_file(
+                faasr_payload=faasr_source,
+                local_file=tar_name,
+                remote_file=tar_name,
+                server_name=log_server,
+                local_folder=SNAPSHOT_DIR,
+                remote_folder=remote_folder,
+            )
+            logger.info(f"Uploaded dependency snapshot {remote_folder}/{tar_name}")
+    except Exception as e:
+        logger.warning(f"Dependency snapshot failed, installing normally -- {e}")
+        shutil.rmtree(local_dir, ignore_errors=True)
+        return False
+    finally:
+        if tar_path.exists():
+            tar_path.unlink()
+
+    marker.touch()
+    _activate_snapshot(func_type, local_dir)
+    return True
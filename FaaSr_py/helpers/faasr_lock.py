@@ -4,9 +4,8 @@ import sys
 import time
 from pathlib import Path
 
-from FaaSr_py.helpers.s3_helper_functions import (get_default_log_boto3_client,
-                                                  get_invocation_folder,
-                                                  get_logging_server)
+from FaaSr_py.helpers.s3_helper_functions import get_invocation_folder
+from FaaSr_py.helpers.storage_backends import get_logging_storage
 
 logger = logging.getLogger(__name__)
 
@@ -28,10 +27,8 @@ def faasr_rsm(faasr_payload):
     flag_name = flag_path / str(flag_content)
     lock_name = invocation_folder / Path(faasr_payload["FunctionInvoke"]) / "lock"
 
-    # set s3 client
-    logging_datastore = get_logging_server(faasr_payload)
-    target_s3 = faasr_payload["DataStores"][logging_datastore]
-    s3_client = get_default_log_boto3_client(faasr_payload)
+    # lock files live in the logging data store
+    storage = get_logging_storage(faasr_payload)
 
     cnt = 0
     max_cnt = 4
@@ -42,15 +39,15 @@ def faasr_rsm(faasr_payload):
         # log/functionname/flag/{random_intger}
         # into the S3 bucket
         try:
-            s3_client.put_object(Key=str(flag_name), Bucket=target_s3["Bucket"])
+            storage.write_bytes(flag_name, b"")
         except Exception as e:
             err_msg = f"failed to upload flag to S3 -- MESSAGE: {e}"
             logger.exception(err_msg, stack_info=True)
             sys.exit(1)
 
         # If someone has a flag, then delete flag and try again
-        if anyone_else_interested(s3_client, target_s3, flag_path, flag_name):
-            s3_client.delete_object(Bucket=target_s3["Bucket"], Key=str(flag_name))
+        if anyone_else_interested(storage, flag_path, flag_name):
+            storage.delete(flag_name)
             if cnt > max_cnt:
                 time.sleep(2**max_cnt)
                 cnt += 1
@@ -64,23 +61,17 @@ def faasr_rsm(faasr_payload):
                 cnt += 1
         else:
             # Check if a lock is present in s3 already
-            check_lock = s3_client.list_objects_v2(
-                Bucket=target_s3["Bucket"], Prefix=str(lock_name)
-            )
+            check_lock = storage.list(lock_name)
 
             # if lock is not present already, place a lock and return True
             # otherwise abort and return False to indicate that
             # the lock was unable to be acquired
-            if "Contents" not in check_lock or len(check_lock["Contents"]) == 0:
-                s3_client.put_object(
-                    Bucket=target_s3["Bucket"],
-                    Key=str(lock_name),
-                    Body=str(flag_content),
-                )
-                s3_client.delete_object(Bucket=target_s3["Bucket"], Key=str(flag_name))
+            if not check_lock:
+                storage.write_bytes(lock_name, str(flag_content).encode())
+                storage.delete(flag_name)
                 return True
             else:
-                s3_client.delete_object(Bucket=target_s3["Bucket"], Key=str(flag_name))
+                storage.delete(flag_name)
                 logger.info("FAILED TO ACQUIRE S3 LOCK")
                 return False
 
@@ -132,22 +123,17 @@ def faasr_release(faasr_payload):
     invocation_folder = get_invocation_folder(faasr_payload)
     lock_name = invocation_folder / Path(faasr_payload["FunctionInvoke"]) / "lock"
 
-    # Get the faasr logging server from payload
-    logging_datastore = get_logging_server(faasr_payload)
-    target_s3 = faasr_payload["DataStores"][logging_datastore]
-    s3_client = get_default_log_boto3_client(faasr_payload)
+    # Delete the lock from the logging data store
+    get_logging_storage(faasr_payload).delete(lock_name)
 
-    # Delete the lock from S3
-    s3_client.delete_object(Bucket=target_s3["Bucket"], Key=str(lock_name))
 
-
-def anyone_else_interested(boto3_client, target_s3, flag_path, flag_name):
+def anyone_else_interested(storage, flag_path, flag_name):
     """
     Check flags to see whether or not other
     functions are trying to acquire the lock
 
     Arguments:
-        boto3_client: boto3 client object
+        storage: StorageBackend of the logging data store
         flag_path: path to dir holding flags in s3
         flag_name: name of current function's flag
 
@@ -156,11 +142,7 @@ def anyone_else_interested(boto3_client, target_s3, flag_path, flag_name):
     """
 
     # Get a list of flag names
-    check_pool = boto3_client.list_objects_v2(
-        Bucket=target_s3["Bucket"], Prefix=str(flag_path)
-    )
-
-    pool = [x["Key"] for x in check_pool["Contents"]]
+    pool = storage.list(flag_path)
     # If our flag is in S3 and is the only one, return false
     if str(flag_name) in pool and len(pool) == 1:
         return False
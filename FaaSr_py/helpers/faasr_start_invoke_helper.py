@@ -1,27 +1,44 @@
 import base64
+import hashlib
+import importlib.metadata
 import logging
 import os
 import re
+import shlex
 import shutil
 import subprocess
 import sys
 import tarfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 
 from FaaSr_py.config.debug_config import global_config
+from FaaSr_py.helpers.source_backends import get_source_backend
+from FaaSr_py.helpers.source_cache import (get_cache_path, github_get,
+                                           populate_cache, resolve_git_commit,
+                                           resolve_github_commit)
 
 logger = logging.getLogger(__name__)
 
+CRAN_REPO = "https://cloud.r-project.org"
+
 
 def faasr_get_github_clone(faasr_payload, url, base_dir=None):
     """
     Downloads a github repo clone from the repo's url
 
+    Clones are cached by commit SHA, so a repo is only cloned once per host
+
     Arguments:
         url: HTTPS url to git repo
         base_dir: directory to which GitHub repo should be cloned
     """
+    backend = get_source_backend()
+    if backend:
+        return backend.get_clone(faasr_payload, url, base_dir)
+
     if not base_dir:
         base_dir = f"/tmp/functions/{faasr_payload["InvocationID"]}"
 
@@ -38,22 +55,127 @@ def faasr_get_github_clone(faasr_payload, url, base_dir=None):
     if os.path.isdir(repo_path):
         shutil.rmtree(repo_path)
 
-    result = subprocess.run(["git", "clone", "--depth=1", url, repo_path], text=True)
-    if result.returncode != 0:
-        raise RuntimeError(f"Git clone failed for {url}")
+    def clone(clone_path):
+        result = subprocess.run(
+            ["git", "clone", "--depth=1", url, clone_path], text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Git clone failed for {url}")
+
+    commit = resolve_git_commit(url)
+    if commit:
+        cache_path = populate_cache(get_cache_path("git", url, commit), clone)
+        shutil.copytree(cache_path, repo_path, symlinks=True)
+    else:
+        logger.warning(f"Could not resolve commit for {url}; cloning uncached")
+        clone(repo_path)
 
     return repo_path
 
 
+class _CountingReader:
+    """
+    File-like wrapper that counts the bytes read from a stream
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self._stream.read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def _download_github_tarball(url, headers, root_path, extract_base):
+    """
+    Streams a GitHub tarball from the HTTP response and extracts it
+    (or only root_path inside it) in a single pass, without a temp file
+
+    Arguments:
+        url: str -- GitHub API tarball url
+        headers: dict -- request headers
+        root_path: str | None -- path within the repo to extract
+        extract_base: str -- directory to extract to
+    """
+    start_time = time.perf_counter()
+
+    # send get request
+    response = requests.get(
+        url,
+        headers=headers,
+        stream=True,
+    )
+
+    # if the response code is 200 (successful), then extract the stream
+    if response.status_code == 200:
+        os.makedirs(extract_base, exist_ok=True)
+
+        # undo any HTTP content-encoding; the tar's own gzip is handled by tarfile
+        response.raw.decode_content = True
+        reader = _CountingReader(response.raw)
+        extracted_bytes = 0
+
+        try:
+            with tarfile.open(fileobj=reader, mode="r|gz") as tar:
+                root_dir = None
+                for member in tar:
+                    # GitHub tarballs have a single root folder (owner-repo-sha)
+                    if root_dir is None:
+                        root_dir = member.name.split("/")[0]
+
+                    if root_path:
+                        extract_path = f"{root_dir}/{root_path.strip('/')}"
+                        if member.name != extract_path and not member.name.startswith(
+                            f"{extract_path}/"
+                        ):
+                            continue
+
+                    # the data filter rejects absolute paths, ".." and links
+                    # that would escape extract_base
+                    tar.extract(member, path=extract_base, filter="data")
+                    extracted_bytes += member.size
+        except tarfile.FilterError as e:
+            logger.error(f"Unsafe path in GitHub tarball {url} -- {e}")
+            sys.exit(1)
+        except tarfile.TarError as e:
+            logger.error(f"Failed to extract GitHub tarball {url} -- {e}")
+            sys.exit(1)
+
+        elapsed = max(time.perf_counter() - start_time, 1e-6)
+        download_mb = reader.bytes_read / (1024 * 1024)
+        extract_mb = extracted_bytes / (1024 * 1024)
+        logger.info(
+            f"Downloaded {download_mb:.2f} MB ({download_mb / elapsed:.2f} MB/s) "
+            f"and extracted {extract_mb:.2f} MB ({extract_mb / elapsed:.2f} MB/s) "
+            f"in {elapsed:.2f}s"
+        )
+    else:
+        try:
+            err_response = response.json()
+            message = err_response.get("message")
+        except Exception:
+            message = "invalid or no response from GH"
+        logger.error(message)
+        sys.exit(1)
+
+
 def faasr_get_github(faasr_source, path, token=None):
     """
     Downloads a repo specified by a github path [username/repo] to a tarball file
 
+    Extracted content is cached by (repo, commit SHA, path)
+
     Arguments:
         faasr_source: payload dict (FaaSr)
         path: username/repo/path to file
         token: GitHub PAT
     """
+    backend = get_source_backend()
+    if backend:
+        return backend.get_repo(faasr_source, path, token)
+
     # ensure path has two parts [username/repo]
     parts = path.split("/")
     if len(parts) < 2:
@@ -71,12 +193,8 @@ def faasr_get_github(faasr_source, path, token=None):
     else:
         path = None
 
-    url = f"https://api.github.com/repos/{repo}/tarball"
-    tar_name = f"/tmp/{reponame}.tar.gz"
-    parent_dir = os.path.dirname(tar_name)
-
-    if not os.path.isdir(parent_dir):
-        os.makedirs(parent_dir, exist_ok=True)
+    extract_base = f"/tmp/functions/{faasr_source['InvocationID']}"
+    os.makedirs(extract_base, exist_ok=True)
 
     headers = {
         "Accept": "application/vnd.github.v3+json",
@@ -84,52 +202,31 @@ def faasr_get_github(faasr_source, path, token=None):
         "Authorization": f"Bearer {token}" if token else None,
     }
 
-    # send get request
-    response = requests.get(
-        url,
-        headers=headers,
-        stream=True,
-    )
-
-    # if the response code is 200 (successful), then write repo to tarball file
-    if response.status_code == 200:
-        with open(tar_name, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-
-        with tarfile.open(tar_name) as tar:
-            root_dir = tar.getnames()[0]
-            extract_base = f"/tmp/functions/{faasr_source['InvocationID']}"
-            os.makedirs(extract_base, exist_ok=True)
-
-            if path:
-                extract_path = os.path.join(root_dir, path)
-                members = [
-                    mem for mem in tar.getmembers() if mem.name.startswith(extract_path)
-                ]
-                tar.extractall(path=extract_base, members=members)
-            else:
-                tar.extractall(path=extract_base)
-        os.remove(tar_name)
+    commit = resolve_github_commit(repo, token=token)
+    if commit:
+        url = f"https://api.github.com/repos/{repo}/tarball/{commit}"
+        cache_path = populate_cache(
+            get_cache_path("github", username, reponame, commit, path or ""),
+            lambda tmp_path: _download_github_tarball(url, headers, path, tmp_path),
+        )
+        shutil.copytree(cache_path, extract_base, symlinks=True, dirs_exist_ok=True)
+    else:
+        logger.warning(f"Could not resolve commit for {repo}; downloading uncached")
+        url = f"https://api.github.com/repos/{repo}/tarball"
+        _download_github_tarball(url, headers, path, extract_base)
 
-        if path:
-            logger.info(f"Successfully downloaded GitHub repo sub folder: {path}")
-        else:
-            logger.info(f"Successfully downloaded GitHub repo: {repo}")
+    if path:
+        logger.info(f"Successfully downloaded GitHub repo sub folder: {path}")
     else:
-        try:
-            err_response = response.json()
-            message = err_response.get("message")
-        except Exception:
-            message = "invalid or no response from GH"
-        logger.error(message)
-        sys.exit(1)
+        logger.info(f"Successfully downloaded GitHub repo: {repo}")
 
 
 def faasr_get_github_raw(token, path):
     """
     Gets the contents of a single file on GitHub
 
+    The response is cached and revalidated with its ETag
+
     Arguments:
         token: GitHub PAT
         path: username/repo/path to file
@@ -137,6 +234,10 @@ def faasr_get_github_raw(token, path):
     Returns:
         Raw GitHub file (UTF-8 string)
     """
+    backend = get_source_backend()
+    if backend:
+        return backend.get_raw(token, path)
+
     parts = path.split("/")
     if len(parts) < 3:
         err_msg = "github path should contain at least three parts"
@@ -158,14 +259,15 @@ def faasr_get_github_raw(token, path):
         "Authorization": f"Bearer {token}" if token else None,
     }
 
-    response1 = requests.get(url, headers=headers)
+    def decode(response):
+        content = response.json().get("content", "")
+        decoded_bytes = base64.b64decode(content)
+        return decoded_bytes.decode("utf-8")
+
+    decoded_string, response1 = github_get(url, headers, decode)
 
-    if response1.status_code == 200:
+    if decoded_string is not None:
         logger.debug(f"Successfully fetched raw file from GitHub: {path}")
-        data = response1.json()
-        content = data.get("content", "")
-        decoded_bytes = base64.b64decode(content)
-        decoded_string = decoded_bytes.decode("utf-8")
         return decoded_string
     else:
         try:
@@ -179,7 +281,7 @@ def faasr_get_github_raw(token, path):
 
 def faasr_install_git_repos(faasr_source, func_type, gits, token):
     """
-    Downloads content from git repo(s)
+    Downloads content from git repo(s); paths are fetched concurrently
 
     Arguments:
         faasr_source: faasr payload (FaaSr)
@@ -191,31 +293,37 @@ def faasr_install_git_repos(faasr_source, func_type, gits, token):
         gits = [gits]
     if not gits:
         logger.info("No git repo dependency")
-    else:
-        # download content from each path
-        for path in gits:
-            # if path is a repo, clone the repo
-            if path.endswith("git") or path.startswith("https://"):
-                logger.info(f"Cloning GitHub repo: {path}")
-                faasr_get_github_clone(faasr_source, path)
+        return
+
+    target_dir = f"/tmp/functions/{faasr_source['InvocationID']}"
+
+    def fetch(path):
+        # if path is a repo, clone the repo
+        if path.endswith("git") or path.startswith("https://"):
+            logger.info(f"Cloning GitHub repo: {path}")
+            faasr_get_github_clone(faasr_source, path)
+        else:
+            # if path is a python file, download
+            file_name = os.path.basename(path)
+            if (file_name.endswith(".py") and func_type == "Python") or (
+                file_name.endswith(".R") and func_type == "R"
+            ):
+                logger.info(f"Get file: {file_name}")
+                content = faasr_get_github_raw(token, path)
+                os.makedirs(target_dir, exist_ok=True)
+                # write fetched file to disk
+                with open(os.path.join(target_dir, file_name), "w") as f:
+                    f.write(content)
             else:
-                # if path is a python file, download
-                file_name = os.path.basename(path)
-                if (file_name.endswith(".py") and func_type == "Python") or (
-                    file_name.endswith(".R") and func_type == "R"
-                ):
-                    logger.info(f"Get file: {file_name}")
-                    content = faasr_get_github_raw(token, path)
-                    target_dir = "/tmp/functions"
-                    if not os.path.exists(target_dir):
-                        os.makedirs(target_dir, exist_ok=True)
-                    # write fetched file to disk
-                    with open(os.path.join(target_dir, file_name), "w") as f:
-                        f.write(content)
-                else:
-                    # if the path is a non-python file, download the repo
-                    logger.info(f"Get git repo files: {path}")
-                    faasr_get_github(faasr_source, path, token)
+                # if the path is a non-python file, download the repo
+                logger.info(f"Get git repo files: {path}")
+                faasr_get_github(faasr_source, path, token)
+
+    # download content from each path
+    with ThreadPoolExecutor(max_workers=min(len(gits), 8)) as pool:
+        # result() re-raises errors (including SystemExit) from each fetch
+        for future in [pool.submit(fetch, path) for path in gits]:
+            future.result()
 
 
 def faasr_pip_install(package):
@@ -263,9 +371,9 @@ def faasr_install_cran(package, lib_path=None):
         logger.info(f"Successfully installed {package}")
 
 
-def faasr_pip_gh_install(path):
+def get_pip_gh_url(path):
     """
-    Installs a single package specified via a github path (name/path) using pip
+    Returns the pip URL for a package specified via a github path (name/path)
     """
     parts = path.split("/")
     if len(parts) < 2:
@@ -276,7 +384,14 @@ def faasr_pip_gh_install(path):
     username = parts[0]
     reponame = parts[1]
     repo = f"{username}/{reponame}"
-    gh_url = f"git+https://github.com/{repo}.git"
+    return f"git+https://github.com/{repo}.git"
+
+
+def faasr_pip_gh_install(path):
+    """
+    Installs a single package specified via a github path (name/path) using pip
+    """
+    gh_url = get_pip_gh_url(path)
 
     command = ["pip", "install", "--no-input", gh_url]
     subprocess.run(command, text=True)
@@ -289,30 +404,32 @@ def faasr_install_git_packages(gh_packages, type, lib_path=None):
     if not gh_packages:
         logger.info("No git package dependency")
     else:
-        # install each package
-        for package in gh_packages:
-            logger.info(f"Install GitHub package {package}")
-            if type == "Python":
-                faasr_pip_gh_install(package)
-            elif type == "R":
-                if lib_path:
-                    lib_path = f'"{lib_path}"'
-                else:
-                    lib_path = ".libPaths()[1]"
-                command = [
-                    "Rscript",
-                    "-e",
-                    (
-                        f"withr::with_libpaths("
-                        f'new="{lib_path}", '
-                        f'code=quote(devtools::install_github("{package}", force=TRUE)))'
-                    ),
-                ]
-                res = subprocess.run(command, text=True)
-                if res.returncode != 0:
-                    logger.info("STDOUT:", res.stdout)
-                    logger.info("STDERR:", res.stderr)
-                    raise RuntimeError(f"Installation failed for {package}")
+        gh_packages = _as_list(gh_packages)
+        logger.info(f"Install GitHub packages {gh_packages}")
+        if type == "Python":
+            faasr_pip_install_packages([], gh_packages)
+        elif type == "R":
+            if lib_path:
+                lib_path = f'"{lib_path}"'
+            else:
+                lib_path = ".libPaths()[1]"
+            pkgs = ", ".join(f'"{package}"' for package in gh_packages)
+            # force=FALSE skips packages whose installed SHA matches GitHub
+            command = [
+                "Rscript",
+                "-e",
+                (
+                    f"withr::with_libpaths("
+                    f"new={lib_path}, "
+                    f"code=devtools::install_github(c({pkgs}), force=FALSE, "
+                    f"upgrade=\"never\", Ncpus={os.cpu_count() or 1}))"
+                ),
+            ]
+            res = subprocess.run(command, text=True, capture_output=True)
+            if res.returncode != 0:
+                logger.info(f"STDOUT: {res.stdout}")
+                logger.info(f"STDERR: {res.stderr}")
+                raise RuntimeError(f"Installation failed for {gh_packages}")
 
 
 def copy_local_files(faasr_source, gits):
@@ -335,6 +452,235 @@ def copy_local_files(faasr_source, gits):
             sys.exit(1)
 
 
+def _as_list(packages):
+    """Returns packages as a list (payload entries may be a string or a list)"""
+    if not packages:
+        return []
+    if isinstance(packages, str):
+        return [packages]
+    return list(packages)
+
+
+def dependency_hash(packages):
+    """
+    Returns a content hash for a set of dependencies
+
+    Arguments:
+        packages: list of package specifiers
+    Returns:
+        str: hex digest
+    """
+    digest = hashlib.sha256()
+    for package in sorted(set(packages)):
+        digest.update(f"{package}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+def pip_requirement_satisfied(requirement):
+    """
+    Checks if a PyPI requirement is already satisfied by an installed package
+
+    Arguments:
+        requirement: str -- pip requirement (e.g. numpy, pandas>=2.0)
+    Returns:
+        bool: True if the requirement is installed
+    """
+    try:
+        from packaging.requirements import InvalidRequirement, Requirement
+    except ImportError:
+        Requirement = None
+
+    if Requirement:
+        try:
+            req = Requirement(requirement)
+        except InvalidRequirement:
+            return False
+        name, specifier = req.name, req.specifier
+    else:
+        name = re.split(r"[<>=!~;\[ ]", requirement.strip(), maxsplit=1)[0]
+        # without packaging, only unversioned requirements can be checked
+        if name != requirement.strip():
+            return False
+        specifier = None
+
+    try:
+        version = importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return False
+
+    if specifier is None:
+        return True
+    return specifier.contains(version, prereleases=True)
+
+
+def faasr_pip_install_packages(packages, gh_packages=None, cache_dir=None):
+    """
+    Installs PyPI (and GitHub) packages with a single pip invocation,
+    skipping packages that are already installed
+
+    PyPI packages are installed from a wheel cache keyed by the hash of
+    the dependency set; on a cold container they are installed directly
+    and the cache is built in the background
+
+    Arguments:
+        packages: list of PyPI requirements
+        gh_packages: list of GitHub paths (username/repo)
+        cache_dir: str -- dependency cache directory
+    """
+    packages = _as_list(packages)
+    gh_urls = [get_pip_gh_url(path) for path in _as_list(gh_packages)]
+    cache_dir = cache_dir or global_config.DEPENDENCY_CACHE_DIR
+
+    missing = [pkg for pkg in packages if not pip_requirement_satisfied(pkg)]
+    satisfied = len(packages) - len(missing)
+    if satisfied:
+        logger.info(f"{satisfied} PyPI package(s) already installed")
+
+    if missing:
+        wheel_dir = os.path.join(cache_dir, "wheels", dependency_hash(packages))
+        marker = os.path.join(wheel_dir, ".faasr_complete")
+
+        installed = False
+        if os.path.isfile(marker):
+            command = ["pip", "install", "--no-input", "--no-index"]
+            command += ["--find-links", wheel_dir]
+            result = subprocess.run(command + missing, text=True)
+            installed = result.returncode == 0
+            if installed:
+                logger.info(f"Installed {missing} from wheel cache")
+
+        if not installed:
+            command = ["pip", "install", "--no-input"]
+            result = subprocess.run(command + missing, text=True)
+            if result.returncode != 0:
+                # install individually so one bad package doesn't block the rest
+                logger.error(f"Batch install failed for {missing}")
+                for package in missing:
+                    faasr_pip_install(package)
+
+        if not os.path.isfile(marker):
+            # cold container: fill the cache for later actions without
+            # delaying this one
+            build_wheel_cache(packages, wheel_dir)
+
+    if gh_urls:
+        logger.info(f"Install GitHub packages {gh_urls}")
+        command = ["pip", "install", "--no-input"]
+        subprocess.run(command + gh_urls, text=True)
+
+
+def build_wheel_cache(packages, wheel_dir):
+    """
+    Builds wheels for packages into wheel_dir in a background process
+
+    The cache is only used once the build has written its completion marker;
+    a failed build removes wheel_dir so a later action can retry
+
+    Arguments:
+        packages: list of PyPI requirements
+        wheel_dir: str -- directory to build wheels into
+    """
+    try:
+        # creating the directory claims the build, so concurrent actions
+        # don't build the same cache
+        os.makedirs(wheel_dir)
+    except FileExistsError:
+        return
+    except OSError as e:
+        logger.warning(f"Failed to create wheel cache {wheel_dir} -- {e}")
+        return
+
+    command = ["pip", "wheel", "--no-input", "--wheel-dir", wheel_dir] + packages
+    marker = os.path.join(wheel_dir, ".faasr_complete")
+    script = (
+        f"{shlex.join(command)} > /dev/null 2>&1 "
+        f"&& touch {shlex.quote(marker)} "
+        f"|| rm -rf {shlex.quote(wheel_dir)}"
+    )
+    try:
+        subprocess.Popen(["sh", "-c", script], start_new_session=True)
+    except OSError as e:
+        logger.warning(f"Failed to start wheel cache build -- {e}")
+        shutil.rmtree(wheel_dir, ignore_errors=True)
+        return
+    logger.info(f"Building wheel cache for {packages} in the background")
+
+
+def faasr_install_cran_packages(packages, lib_path=None, cache_dir=None):
+    """
+    Installs CRAN packages in a single R session using Ncpus parallel
+    installs, skipping packages that are already installed
+
+    Packages are installed into a library cache keyed by the hash of the
+    dependency set and linked into lib_path
+
+    Arguments:
+        packages: list of CRAN package names
+        lib_path: str -- R library used by R actions
+        cache_dir: str -- dependency cache directory
+    """
+    packages = _as_list(packages)
+    if not packages:
+        logger.info("No CRAN package dependency")
+        return
+
+    lib_path = lib_path or "/tmp/Rlibs"
+    cache_dir = cache_dir or global_config.DEPENDENCY_CACHE_DIR
+    cache_lib = os.path.join(cache_dir, "Rlibs", dependency_hash(packages))
+    marker = os.path.join(cache_lib, ".faasr_complete")
+    os.makedirs(lib_path, exist_ok=True)
+    os.makedirs(cache_lib, exist_ok=True)
+
+    if os.path.isfile(marker):
+        logger.info(f"Using cached CRAN packages: {packages}")
+    else:
+        logger.info(f"Installing CRAN packages: {packages}")
+        pkgs = ", ".join(f'"{package}"' for package in packages)
+        command = [
+            "Rscript",
+            "-e",
+            f'.libPaths(c("{cache_lib}", "{lib_path}", .libPaths())); '
+            f"pkgs <- c({pkgs}); "
+            f"missing <- setdiff(pkgs, rownames(installed.packages())); "
+            f"if (length(missing) > 0) install.packages(missing, "
+            f'lib="{cache_lib}", repos="{CRAN_REPO}", Ncpus={os.cpu_count() or 1}); '
+            f"failed <- setdiff(pkgs, rownames(installed.packages())); "
+            f'if (length(failed) > 0) {{ message("Failed: ", failed); quit(status=1) }}',
+        ]
+
+        result = subprocess.run(command, text=True, capture_output=True)
+
+        if result.returncode != 0:
+            logger.error(
+                f"Failed to install {packages}:\n"
+                f"std err: {result.stderr}\n"
+                f"std out: {result.stdout}"
+            )
+            raise RuntimeError(f"Install failed for {packages}")
+
+        open(marker, "w").close()
+        logger.info(f"Successfully installed {packages}")
+
+    # link cached packages into the library used by R actions
+    link_r_library(cache_lib, lib_path)
+
+
+def link_r_library(src_lib, lib_path):
+    """
+    Symlinks each package in src_lib into lib_path (existing entries are kept)
+
+    Arguments:
+        src_lib: str -- R library containing installed packages
+        lib_path: str -- R library used by R actions
+    """
+    os.makedirs(lib_path, exist_ok=True)
+    for entry in os.listdir(src_lib):
+        dst = os.path.join(lib_path, entry)
+        if entry.startswith(".") or os.path.lexists(dst):
+            continue
+        os.symlink(os.path.join(src_lib, entry), dst)
+
+
 def faasr_func_dependancy_install(faasr_source, action):
     """
     Installs the dependencies for an action's function
@@ -377,36 +723,42 @@ def faasr_func_dependancy_install(faasr_source, action):
             # copy local files to /tmp/functions/{InvocationID}
             copy_local_files(faasr_source, local_gits)
 
-    if "PyPIPackageDownloads" in faasr_source and func_type == "Python":
-        if "PyPIPackageDownloads" in faasr_source and func_type == "Python":
-            pypi_packages = faasr_source["PyPIPackageDownloads"].get(func_name)
-            if pypi_packages:
-                for package in pypi_packages:
-                    faasr_pip_install(package)
+    # restore (or build) a prebuilt dependency snapshot instead of installing
+    if global_config.USE_DEPENDENCY_SNAPSHOT:
+        from FaaSr_py.helpers.dependency_snapshot import \
+            faasr_install_from_snapshot
 
-    elif "FunctionCRANPackage" in faasr_source and func_type == "R":
-        if "FunctionCRANPackage" in faasr_source:
-            cran_packages = faasr_source["FunctionCRANPackage"].get(func_name)
+        if faasr_install_from_snapshot(faasr_source, func_type, func_name):
+            return
 
+    if "FunctionGitHubPackage" in faasr_source:
+        gh_packages = faasr_source["FunctionGitHubPackage"].get(func_name)
+    else:
+        gh_packages = None
+
+    if func_type == "Python":
+        if "PyPIPackageDownloads" in faasr_source:
+            pypi_packages = faasr_source["PyPIPackageDownloads"].get(func_name)
+        else:
+            pypi_packages = None
+
+        # PyPI and GitHub packages are installed in batches, not one pip call each
+        if pypi_packages or gh_packages:
+            faasr_pip_install_packages(pypi_packages, gh_packages)
+    elif func_type == "R":
         lib_path = "/tmp/Rlibs"
         os.makedirs(lib_path, exist_ok=True)
 
-        if cran_packages:
-            for package in cran_packages:
-                faasr_install_cran(package, lib_path)
+        if "FunctionCRANPackage" in faasr_source:
+            cran_packages = faasr_source["FunctionCRANPackage"].get(func_name)
+            faasr_install_cran_packages(cran_packages, lib_path)
 
-        logger.debug(f"Packages in /tmp/Rlibs: {os.listdir('/tmp/Rlibs')}")
+        # install gh packages
+        if gh_packages:
+            faasr_install_git_packages(gh_packages, func_type, lib_path)
 
-    # install gh packages
-    if "FunctionGitHubPackage" in faasr_source:
-        if func_name in faasr_source["FunctionGitHubPackage"]:
-            gh_packages = faasr_source["FunctionGitHubPackage"].get(func_name)
-            if gh_packages:
-                if func_type == "Python":
-                    faasr_install_git_packages(gh_packages, func_type)
-                elif func_type == "R":
-                    faasr_install_git_packages(gh_packages, func_type, "/tmp/Rlibs")
-                else:
-                    err_msg = "Invalid function type: {func_type}"
-                    logger.critical(err_msg)
-                    raise RuntimeError(err_msg)
+        logger.debug(f"Packages in /tmp/Rlibs: {os.listdir(lib_path)}")
+    else:
+        err_msg = f"Invalid function type: {func_type}"
+        logger.critical(err_msg)
+        raise RuntimeError(err_msg)
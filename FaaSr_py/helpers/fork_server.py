@@ -0,0 +1,158 @@
+import importlib
+import logging
+import multiprocessing
+import multiprocessing.forkserver
+import os
+
+from FaaSr_py.helpers.py_func_helper import lookup_function_module
+
+logger = logging.getLogger(__name__)
+
+# (directory, module) pairs imported by the running fork server; directory
+# is None for installed packages. The fork server only reads its preload list
+# when it starts, so it is restarted when a later action (on a warm
+# container) needs modules it hasn't imported, or its user module comes
+# from another directory (another invocation's functions)
+_preloaded_modules = set()
+_server_directory = None
+_server_started = False
+
+
+def get_preload_modules(faasr_payload, func_name, directory=None):
+    """
+    Returns the modules that should be imported once by the fork server
+
+    Arguments:
+        faasr_payload: FaaSr payload dict
+        func_name: str -- name of the user function
+        directory: str -- directory containing the user function's source
+    Returns:
+        set: (directory, module name) pairs, with directory None
+        for modules that aren't in the function directory
+    """
+    modules = {(None, "FaaSr_py.client.py_user_func_entry")}
+
+    if "PackageImports" in faasr_payload:
+        packages = faasr_payload["PackageImports"].get(func_name)
+        if isinstance(packages, str):
+            packages = [packages]
+        if packages:
+            modules.update((None, package) for package in packages)
+
+    # the user module is found via the function index, so nothing
+    # else in the function directory is imported
+    if directory:
+        user_module = lookup_function_module(func_name, directory)
+        if user_module:
+            modules.add((directory, user_module))
+
+    return modules
+
+
+def get_fork_server_context(faasr_payload, func_name, directory=None):
+    """
+    Returns a multiprocessing context that forks action processes from a
+    warm fork server which has already imported the action's packages
+
+    If the fork server can't be restarted for a new function directory,
+    the default context is returned, so stale user modules are never used
+
+    Arguments:
+        faasr_payload: FaaSr payload dict
+        func_name: str -- name of the user function
+        directory: str -- directory containing the user function's source
+    Returns:
+        multiprocessing context using the forkserver start method
+    """
+    global _preloaded_modules, _server_directory, _server_started
+
+    ctx = multiprocessing.get_context("forkserver")
+    if directory:
+        directory = os.path.abspath(directory)
+
+    modules = get_preload_modules(faasr_payload, func_name, directory)
+    missing = modules - _preloaded_modules
+    moved = bool(directory) and directory != _server_directory
+
+    if _server_started and (missing or moved):
+        if _stop_fork_server():
+            logger.debug(f"Restarting fork server to preload: {sorted(missing)}")
+            _server_started = False
+        elif moved:
+            logger.debug("Fork server can't be restarted for a new directory")
+            return multiprocessing.get_context()
+        else:
+            logger.debug(f"Fork server busy; not preloaded: {sorted(missing)}")
+
+    if not _server_started:
+        if moved:
+            # user modules of other directories must not be preloaded
+            _preloaded_modules = {
+                (module_dir, module)
+                for module_dir, module in _preloaded_modules
+                if module_dir is None
+            }
+            _server_directory = directory
+        _preloaded_modules |= modules
+        preload = sorted({module for _, module in _preloaded_modules})
+        ctx.set_forkserver_preload(preload)
+        logger.debug(f"Starting fork server with preload: {preload}")
+        _start_fork_server(_server_directory)
+        _server_started = True
+
+    return ctx
+
+
+def _start_fork_server(directory):
+    """
+    Starts the fork server with directory importable
+
+    The fork server is a new interpreter that ignores this process's
+    sys.path (and skips preload modules it can't import), so the
+    directory is passed on through PYTHONPATH
+    """
+    python_path = os.environ.get("PYTHONPATH")
+    if directory:
+        os.environ["PYTHONPATH"] = (
+            f"{directory}{os.pathsep}{python_path}" if python_path else directory
+        )
+    try:
+        multiprocessing.forkserver.ensure_running()
+    finally:
+        if python_path is None:
+            os.environ.pop("PYTHONPATH", None)
+        else:
+            os.environ["PYTHONPATH"] = python_path
+
+
+def _stop_fork_server():
+    """
+    Stops the running fork server, so the next action process starts
+    a new one with the current preload list
+
+    Returns:
+        bool: False if processes forked from the server are still running
+        (they report their exit status through it, so it is left running),
+        or the fork server can't be stopped
+    """
+    for proc in multiprocessing.active_children():
+        if isinstance(proc, multiprocessing.context.ForkServerProcess):
+            return False
+    # multiprocessing has no public API to stop its fork server; _stop is
+    # there in CPython 3.8 to 3.13, and without it the server is kept
+    fork_server = multiprocessing.forkserver._forkserver
+    if not hasattr(fork_server, "_stop"):
+        return False
+    fork_server._stop()
+    return True
+
+
+def import_modules(modules):
+    """
+    Imports a list of modules (used as a process target when benchmarking)
+
+    Arguments:
+        modules: list of module names
+    """
+    for module in modules:
+        importlib.import_module(module)
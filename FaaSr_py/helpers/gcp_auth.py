@@ -1,5 +1,7 @@
 import base64
+import hashlib
 import json
+import threading
 import time
 
 import requests
@@ -7,13 +9,49 @@ from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import padding
 
+# tokens are refreshed this many seconds before they expire, so a request
+# never goes out with a token that expires in flight
+TOKEN_REFRESH_SKEW = 60
+# lifetime assumed when the token response doesn't include expires_in
+DEFAULT_TOKEN_LIFETIME = 600
 
-def refresh_gcp_access_token(faasr_payload, server_name):
+_cache_lock = threading.Lock()
+# (server name, client email) -> {"access_token": str, "expires_at": float}
+_token_cache = {}
+# (server name, client email) -> lock held while a token is requested
+_refresh_locks = {}
+# sha256 of PEM -> private key object
+_key_cache = {}
+
+
+def _base64url_encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("utf-8")
+
+
+def _load_private_key(private_key):
     """
-    Generate a new access token using JWT for GCP authentication.
+    Returns the parsed private key, parsing each PEM only once
     """
-    server_config = faasr_payload["ComputeServers"][server_name]
+    key_hash = hashlib.sha256(private_key.encode()).hexdigest()
+    with _cache_lock:
+        private_key_obj = _key_cache.get(key_hash)
+    if private_key_obj is None:
+        private_key_obj = serialization.load_pem_private_key(
+            private_key.encode(), password=None, backend=default_backend()
+        )
+        with _cache_lock:
+            _key_cache[key_hash] = private_key_obj
+    return private_key_obj
+
+
+def _request_gcp_access_token(server_config):
+    """
+    Signs a JWT with the server's service account key and exchanges it
+    for an access token
 
+    Returns:
+        (str, float): access token, time it expires (seconds since epoch)
+    """
     client_email = server_config["ClientEmail"]
     private_key = server_config["SecretKey"]
     token_uri = server_config["TokenUri"]
@@ -32,27 +70,19 @@ def refresh_gcp_access_token(faasr_payload, server_name):
         "iat": issued_at,
     }
 
-    # Base64 URL-safe encoding
-    def base64url_encode(data):
-        return base64.urlsafe_b64encode(data).rstrip(b"=").decode("utf-8")
-
     # Encode header and claims
-    jwt_header = base64url_encode(json.dumps(header).encode())
-    jwt_claims = base64url_encode(json.dumps(claims).encode())
+    jwt_header = _base64url_encode(json.dumps(header).encode())
+    jwt_claims = _base64url_encode(json.dumps(claims).encode())
 
     # Create unsigned JWT
     jwt_unsigned = f"{jwt_header}.{jwt_claims}"
 
     # Sign the JWT
-    private_key_obj = serialization.load_pem_private_key(
-        private_key.encode(), password=None, backend=default_backend()
-    )
-
-    signature = private_key_obj.sign(
+    signature = _load_private_key(private_key).sign(
         jwt_unsigned.encode(), padding.PKCS1v15(), hashes.SHA256()
     )
 
-    jwt_signature = base64url_encode(signature)
+    jwt_signature = _base64url_encode(signature)
     jwt = f"{jwt_unsigned}.{jwt_signature}"
 
     # Exchange JWT for access token
@@ -66,6 +96,103 @@ def refresh_gcp_access_token(faasr_payload, server_name):
 
     if response.status_code == 200:
         token_data = response.json()
-        return token_data.get("access_token")
+        lifetime = token_data.get("expires_in", DEFAULT_TOKEN_LIFETIME)
+        return token_data.get("access_token"), issued_at + int(lifetime)
     else:
         raise Exception(f"Failed to get GCP access token: {response.text}")
+
+
+def refresh_gcp_access_token(faasr_payload, server_name):
+    """
+    Generate a new access token using JWT for GCP authentication.
+    """
+    server_config = faasr_payload["ComputeServers"][server_name]
+    access_token, _ = _request_gcp_access_token(server_config)
+    return access_token
+
+
+def _is_fresh(entry):
+    return entry is not None and entry["expires_at"] - TOKEN_REFRESH_SKEW > time.time()
+
+
+def _load_shared_token(faasr_payload, server_name, client_email):
+    """
+    Returns a token passed on by a predecessor action (ShareAccessToken)
+    """
+    shared = (faasr_payload.get("GCPAccessTokens") or {}).get(server_name)
+    if not shared or shared.get("ClientEmail") != client_email:
+        return None
+    entry = {"access_token": shared["Token"], "expires_at": shared["ExpiresAt"]}
+    return entry if _is_fresh(entry) else None
+
+
+def get_gcp_access_token(faasr_payload, server_name):
+    """
+    Returns an access token for a GCP server, reusing the cached token until
+    it is about to expire
+
+    Tokens are cached per (server name, client email) for the life of the
+    process. Concurrent callers share a single token request
+
+    Arguments:
+        faasr_payload: FaaSrPayload instance
+        server_name: str -- name of the GCP compute server
+    Returns:
+        str: access token
+    """
+    server_config = faasr_payload["ComputeServers"][server_name]
+    cache_key = (server_name, server_config["ClientEmail"])
+
+    with _cache_lock:
+        entry = _token_cache.get(cache_key)
+        if _is_fresh(entry):
+            return entry["access_token"]
+        refresh_lock = _refresh_locks.setdefault(cache_key, threading.Lock())
+
+    with refresh_lock:
+        # another thread may have refreshed the token while we waited
+        with _cache_lock:
+            entry = _token_cache.get(cache_key)
+        if not _is_fresh(entry):
+            entry = _load_shared_token(faasr_payload, *cache_key)
+        if not _is_fresh(entry):
+            access_token, expires_at = _request_gcp_access_token(server_config)
+            entry = {"access_token": access_token, "expires_at": expires_at}
+        with _cache_lock:
+            _token_cache[cache_key] = entry
+        return entry["access_token"]
+
+
+def get_shared_gcp_tokens(faasr_payload):
+    """
+    Returns the cached tokens of GCP servers with ShareAccessToken set, to
+    be passed to successor actions in GCPAccessTokens
+
+    Returns:
+        dict: server name -> {"ClientEmail": str, "Token": str, "ExpiresAt": float}
+    """
+    shared = {}
+    for server_name, server_config in faasr_payload["ComputeServers"].items():
+        if server_config.get("FaaSType") != "GoogleCloud":
+            continue
+        if not server_config.get("ShareAccessToken"):
+            continue
+        client_email = server_config.get("ClientEmail")
+        with _cache_lock:
+            entry = _token_cache.get((server_name, client_email))
+        if _is_fresh(entry):
+            shared[server_name] = {
+                "ClientEmail": client_email,
+                "Token": entry["access_token"],
+                "ExpiresAt": entry["expires_at"],
+            }
+    return shared
+
+
+def clear_gcp_token_cache():
+    """
+    Discards all cached tokens and keys
+    """
+    with _cache_lock:
+        _token_cache.clear()
+        _key_cache.clear()
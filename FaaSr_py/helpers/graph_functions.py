@@ -4,9 +4,6 @@ import sys
 from collections import defaultdict
 from pathlib import Path
 
-from jsonschema import validate
-from jsonschema.exceptions import ValidationError
-
 logger = logging.getLogger(__name__)
 
 
@@ -29,6 +26,10 @@ def validate_json(payload):
     with open(schema_path, "r") as f:
         schema = json.load(f)
 
+    # jsonschema is slow to import and only needed here
+    from jsonschema import validate
+    from jsonschema.exceptions import ValidationError
+
     # Compare payload against FaaSr schema and except if they do not match
     try:
         validate(instance=payload, schema=schema)
@@ -0,0 +1,126 @@
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from FaaSr_py.helpers import serialization
+from FaaSr_py.helpers.s3_helper_functions import get_invocation_folder
+from FaaSr_py.helpers.storage_backends import get_logging_storage
+
+logger = logging.getLogger(__name__)
+
+# buffered puts are written once this many keys are pending
+MAX_PENDING_WRITES = 64
+MAX_FLUSH_WORKERS = 8
+# keys are "/" separated names; segments can't start with "." (no ".." or hidden files)
+KEY_SEGMENT = r"[A-Za-z0-9_][A-Za-z0-9._\-]*"
+KEY_PATTERN = re.compile(rf"{KEY_SEGMENT}(/{KEY_SEGMENT})*")
+
+
+class KVStore:
+    """
+    Invocation-scoped key-value store, backed by one object per key under
+    <invocation folder>/kv in the logging data store
+
+    Puts are buffered and written as a batch when the action returns (or
+    MAX_PENDING_WRITES keys are pending); gets see buffered puts. Increments
+    are written immediately with an atomic update (conditional writes on S3),
+    so concurrent actions never lose an update
+    """
+
+    def __init__(self, faasr_payload):
+        self.faasr_payload = faasr_payload
+        self.prefix = get_invocation_folder(faasr_payload) / "kv"
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._storage = None
+
+    @property
+    def storage(self):
+        if self._storage is None:
+            self._storage = get_logging_storage(self.faasr_payload)
+        return self._storage
+
+    def _check_key(self, key):
+        if not isinstance(key, str) or not KEY_PATTERN.fullmatch(key):
+            raise ValueError(f"Invalid key-value store key: {key!r}")
+        return key
+
+    def _remote_key(self, key):
+        return str(self.prefix / key)
+
+    def put(self, key, value):
+        """
+        Buffers a put; it is written by the next flush
+
+        Arguments:
+            key: str -- key to set
+            value: JSON serializable value
+        """
+        self._check_key(key)
+        data = serialization.dumps_bytes(value)
+        with self._lock:
+            self._pending[key] = data
+            full = len(self._pending) >= MAX_PENDING_WRITES
+        if full:
+            self.flush()
+
+    def get(self, key, default=None):
+        """
+        Returns the value of key, or default if it has not been set
+        """
+        self._check_key(key)
+        with self._lock:
+            data = self._pending.get(key)
+        if data is None:
+            try:
+                data = self.storage.read_bytes(self._remote_key(key))
+            except FileNotFoundError:
+                return default
+        return serialization.loads(data)
+
+    def incr(self, key, amount=1):
+        """
+        Atomically adds amount to the number stored at key (missing keys are 0)
+
+        Returns:
+            int | float: the new value
+        """
+        self._check_key(key)
+        if isinstance(amount, bool) or not isinstance(amount, (int, float)):
+            raise TypeError(f"Increment amount must be a number, not {amount!r}")
+
+        # a buffered put to this key has to land first
+        with self._lock:
+            pending = key in self._pending
+        if pending:
+            self.flush()
+
+        def add(data):
+            value = 0 if data is None else serialization.loads(data)
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise TypeError(f"Cannot increment non-numeric value at key {key}")
+            return serialization.dumps_bytes(value + amount)
+
+        data = self.storage.update(self._remote_key(key), add)
+        return serialization.loads(data)
+
+    def flush(self):
+        """
+        Writes all buffered puts concurrently
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        with ThreadPoolExecutor(
+            max_workers=min(MAX_FLUSH_WORKERS, len(pending))
+        ) as executor:
+            futures = [
+                executor.submit(self.storage.write_bytes, self._remote_key(key), data)
+                for key, data in pending.items()
+            ]
+        for future in futures:
+            future.result()
+        logger.debug(f"Wrote {len(pending)} key-value store entries")
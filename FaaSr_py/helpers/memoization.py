@@ -0,0 +1,217 @@
+import hashlib
+import json
+import logging
+import os
+import time
+
+from FaaSr_py.config.debug_config import global_config
+from FaaSr_py.helpers import serialization
+from FaaSr_py.helpers.dependency_snapshot import get_snapshot_hash
+from FaaSr_py.helpers.source_backends import get_source_backend
+from FaaSr_py.helpers.source_cache import (resolve_git_commit,
+                                           resolve_github_commit)
+from FaaSr_py.helpers.storage_backends import get_storage_backend
+
+logger = logging.getLogger(__name__)
+
+MEMO_FOLDER = "FaaSrMemo"
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _get_source_fingerprint(faasr_payload, func_name):
+    """
+    Identifies the source of a user function: the commit of each declared
+    git path, or the content of local files
+
+    Returns:
+        list | None: fingerprint entries, or None if a commit can't be resolved
+    """
+    if global_config.USE_LOCAL_USER_FUNC:
+        return [_hash_file(global_config.LOCAL_FUNCTION_PATH)]
+
+    local_files = (faasr_payload.get("FunctionLocalFile") or {}).get(func_name)
+    if local_files:
+        if isinstance(local_files, str):
+            local_files = [local_files]
+        return [[path, _hash_file(path)] for path in local_files]
+
+    git_paths = (faasr_payload.get("FunctionGitRepo") or {}).get(func_name)
+    if not git_paths:
+        return []
+    if isinstance(git_paths, str):
+        git_paths = [git_paths]
+
+    # other backends don't expose commits, so their source can't be fingerprinted
+    if get_source_backend():
+        logger.warning("Memoization requires the github source backend")
+        return None
+
+    token = os.getenv("TOKEN")
+    fingerprint = []
+    for path in git_paths:
+        if path.endswith("git") or path.startswith("https://"):
+            commit = resolve_git_commit(path)
+        else:
+            parts = path.split("/")
+            # single files are paths of the form username/repo/branch/file
+            is_file = path.endswith((".py", ".R"))
+            ref = parts[2] if is_file and len(parts) > 3 else "HEAD"
+            commit = resolve_github_commit("/".join(parts[:2]), ref, token)
+        if not commit:
+            logger.warning(f"Could not resolve commit for {path}")
+            return None
+        fingerprint.append([path, commit])
+    return fingerprint
+
+
+class MemoStore:
+    """
+    Reads and writes objects for memoization in the default data store
+
+    Object versions are S3 ETags, or content hashes for other backends
+    """
+
+    def __init__(self, faasr_payload):
+        self.storage = get_storage_backend(faasr_payload)
+
+    def get_version(self, key):
+        """
+        Returns:
+            str | None: version of the object, or None if it doesn't exist
+        """
+        return self.storage.get_version(key)
+
+    def copy(self, source_key, dest_key):
+        """
+        Copies an object within the data store (server-side on S3)
+
+        Returns:
+            str: version of the copy
+        """
+        self.storage.copy(source_key, dest_key)
+        return self.get_version(dest_key)
+
+    def read(self, key):
+        """
+        Returns:
+            bytes | None: object content, or None if it doesn't exist
+        """
+        try:
+            return self.storage.read_bytes(key)
+        except FileNotFoundError:
+            return None
+
+    def write(self, key, data):
+        self.storage.write_bytes(key, data)
+
+
+def get_memo_key(faasr_payload, action_name, memo_store):
+    """
+    Returns the content hash that identifies a run of an action: its function
+    source, Arguments, input object versions, dependencies and rank
+
+    Arguments:
+        faasr_payload: FaaSrPayload instance
+        action_name: str -- name of the action
+        memo_store: MemoStore instance
+    Returns:
+        str | None: hex digest, or None if the action can't be memoized
+        (unresolvable source commit or missing input)
+    """
+    action = faasr_payload["ActionList"][action_name]
+    func_name, func_type = action["FunctionName"], action["Type"]
+
+    source = _get_source_fingerprint(faasr_payload, func_name)
+    if source is None:
+        return None
+
+    inputs = {}
+    for key in action.get("MemoInputs", []):
+        version = memo_store.get_version(key)
+        if version is None:
+            logger.warning(f"Memoization input {key} not found")
+            return None
+        inputs[key] = version
+
+    memo_fields = {
+        "FunctionName": func_name,
+        "Type": func_type,
+        "Source": source,
+        "Arguments": action.get("Arguments") or {},
+        "Inputs": inputs,
+        "Outputs": sorted(action.get("MemoOutputs", [])),
+        "Dependencies": get_snapshot_hash(faasr_payload, func_type, func_name),
+        "FunctionRank": faasr_payload.get("FunctionRank"),
+    }
+    encoded = json.dumps(memo_fields, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _get_memo_folder(memo_key):
+    return f"{MEMO_FOLDER}/{memo_key}"
+
+
+def restore_memoized_result(faasr_payload, action_name, memo_key, memo_store):
+    """
+    Looks up the result manifest for memo_key and restores its outputs
+
+    Returns:
+        dict | None: manifest ({"FunctionResult": ..., "Outputs": ...}),
+        or None on a miss
+    """
+    data = memo_store.read(f"{_get_memo_folder(memo_key)}/manifest.json")
+    if data is None:
+        return None
+    manifest = serialization.loads(data)
+
+    for output_key, cached_version in manifest["Outputs"].items():
+        # outputs that still hold the memoized content are left alone
+        if memo_store.get_version(output_key) == cached_version:
+            continue
+        cached_key = f"{_get_memo_folder(memo_key)}/outputs/{output_key}"
+        if memo_store.get_version(cached_key) is None:
+            logger.warning(f"Memoized output {output_key} is missing; rerunning")
+            return None
+        memo_store.copy(cached_key, output_key)
+        logger.debug(f"Restored memoized output {output_key}")
+    return manifest
+
+
+def save_memoized_result(
+    faasr_payload, action_name, memo_key, memo_store, function_result
+):
+    """
+    Copies the action's outputs into the memo folder and writes its manifest;
+    the manifest is written last, so a partial save is never used
+    """
+    action = faasr_payload["ActionList"][action_name]
+    outputs = {}
+    for output_key in action.get("MemoOutputs", []):
+        if memo_store.get_version(output_key) is None:
+            logger.warning(
+                f"Memoization output {output_key} was not written; "
+                "not memoizing this run"
+            )
+            return
+        cached_key = f"{_get_memo_folder(memo_key)}/outputs/{output_key}"
+        outputs[output_key] = memo_store.copy(output_key, cached_key)
+
+    manifest = {
+        "ActionName": action_name,
+        "FunctionResult": function_result,
+        "Outputs": outputs,
+        "InvocationID": faasr_payload["InvocationID"],
+        "CreatedAt": time.time(),
+    }
+    memo_store.write(
+        f"{_get_memo_folder(memo_key)}/manifest.json",
+        serialization.dumps_bytes(manifest),
+    )
+    logger.info(f"Memoized result of {action_name} ({memo_key[:16]})")
@@ -1,6 +1,11 @@
+import ast
+import hashlib
 import importlib
+import json
 import logging
 import os
+import re
+import subprocess
 import sys
 import uuid
 
@@ -50,9 +55,180 @@ def faasr_import_function(path, func_name):
     return None
 
 
+IGNORE_FILES = [
+    "test_gh_invoke.py",
+    "test.py",
+    "func_test.py",
+    "faasr_start_invoke_helper.py",
+    "faasr_start_invoke_openwhisk.py",
+    "faasr_start_invoke_aws-lambda.py",
+    "faasr_start_invoke_github_actions.py",
+]
+
+FUNCTION_INDEX_DIR = "/tmp/faasr_function_index"
+
+
+def _walk_py_files(directory):
+    """
+    Yields (module_name, file_path) for each python file under directory
+    in walk order
+    """
+    for root, _, files in os.walk(directory):
+        py_files = [file for file in files if file.endswith(".py")]
+        for f in py_files:
+            if f in IGNORE_FILES:
+                continue
+            rel_path = os.path.relpath(root, directory)
+            if rel_path == ".":
+                # file is in the base directory
+                module_name = os.path.splitext(f)[0]
+            else:
+                # file is in a subdirectory
+                module_path = os.path.join(rel_path, os.path.splitext(f)[0])
+                module_name = module_path.replace(os.path.sep, ".")
+            yield module_name, os.path.join(root, f)
+
+
+def _get_source_fingerprint(directory):
+    """
+    Returns a key identifying the source tree under directory
+
+    Git clones and GitHub tarballs are identified by their commit hash; any
+    other python files are identified by a hash of their contents
+
+    Arguments:
+        directory: str -- directory containing function source
+    Returns:
+        str: hex digest
+    """
+    digest = hashlib.sha256()
+    commit_roots = []
+
+    for root, dirs, _ in os.walk(directory):
+        commit = None
+        if ".git" in dirs:
+            result = subprocess.run(
+                ["git", "-C", root, "rev-parse", "HEAD"],
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode == 0:
+                commit = result.stdout.strip()
+        elif root != directory:
+            # GitHub tarballs extract to a folder named owner-repo-<sha>
+            match = re.search(r"-([0-9a-f]{7,40})$", os.path.basename(root))
+            if match:
+                commit = match.group(1)
+
+        if commit:
+            rel_root = os.path.relpath(root, directory)
+            digest.update(f"{rel_root}@{commit}\n".encode())
+            commit_roots.append(root + os.path.sep)
+            dirs.clear()
+
+    for _, path in _walk_py_files(directory):
+        if any(path.startswith(root) for root in commit_roots):
+            continue
+        digest.update(os.path.relpath(path, directory).encode())
+        with open(path, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+
+    return digest.hexdigest()
+
+
+def build_function_index(directory):
+    """
+    Builds a map of top-level function names to the modules that define them
+    by parsing (not importing) each python file under directory
+
+    Arguments:
+        directory: str -- directory to index
+    Returns:
+        dict: function name -> list of module names (in walk order)
+    """
+    index = {}
+    for module_name, path in _walk_py_files(directory):
+        try:
+            with open(path, "rb") as f:
+                tree = ast.parse(f.read(), filename=path)
+        except (SyntaxError, ValueError) as e:
+            logger.warning(f"Skipping python file {path} in function index -- {e}")
+            continue
+
+        for node in tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                modules = index.setdefault(node.name, [])
+                if module_name not in modules:
+                    modules.append(module_name)
+    return index
+
+
+def get_function_index(directory, cache_dir=FUNCTION_INDEX_DIR):
+    """
+    Returns the function index for directory, using the cached index
+    if the source tree (commit) has already been indexed
+
+    Arguments:
+        directory: str -- directory containing function source
+        cache_dir: str -- directory to store indexes in
+    Returns:
+        dict: function name -> list of module names
+    """
+    fingerprint = _get_source_fingerprint(directory)
+    index_path = os.path.join(cache_dir, f"{fingerprint}.json")
+
+    if os.path.isfile(index_path):
+        try:
+            with open(index_path, "r") as f:
+                logger.debug(f"Using cached function index {index_path}")
+                return json.load(f)
+        except (OSError, ValueError):
+            logger.warning(f"Ignoring unreadable function index {index_path}")
+
+    index = build_function_index(directory)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{index_path}.{uuid.uuid4()}"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path)
+    except OSError as e:
+        logger.warning(f"Failed to cache function index -- {e}")
+
+    return index
+
+
+def lookup_function_module(func_name, directory="."):
+    """
+    Returns the name of the module that defines func_name
+
+    Arguments:
+        func_name: str -- name of function to find
+        directory: str -- directory containing function source
+    Returns:
+        str | None: module name (importable with directory on sys.path)
+    """
+    directory = os.path.abspath(directory)
+    if not os.path.isdir(directory):
+        return None
+
+    modules = get_function_index(directory).get(func_name)
+    if not modules:
+        return None
+    if len(modules) > 1:
+        logger.warning(
+            f"Function {func_name} is defined in multiple modules: {modules}; "
+            f"using {modules[0]}"
+        )
+    return modules[0]
+
+
 def faasr_import_function_walk(func_name, directory="."):
     """
-    Walks directory until it finds function
+    Imports the module that defines a function, using the function index to
+    avoid importing unrelated modules. Falls back to walking the directory
+    and importing each file until the function is found
 
     Arguments:
         func_name: str -- name of function to import
@@ -60,47 +236,41 @@ def faasr_import_function_walk(func_name, directory="."):
     Returns:
         function: function object | None
     """
-    ignore_files = [
-        "test_gh_invoke.py",
-        "test.py",
-        "func_test.py",
-        "faasr_start_invoke_helper.py",
-        "faasr_start_invoke_openwhisk.py",
-        "faasr_start_invoke_aws-lambda.py",
-        "faasr_start_invoke_github_actions.py",
-    ]
     directory = os.path.abspath(directory)
 
     if directory not in sys.path:
         sys.path.insert(0, directory)
 
-    for root, _, files in os.walk(directory):
-        py_files = [file for file in files if file.endswith(".py")]
-        for f in py_files:
-            if f not in ignore_files:
-                logger.info(f"Source python file {f}")
-                try:
-                    rel_path = os.path.relpath(root, directory)
-                    if rel_path == ".":
-                        # file is in the base directory
-                        module_name = os.path.splitext(f)[0]
-                    else:
-                        # file is in a subdirectory
-                        module_path = os.path.join(rel_path, os.path.splitext(f)[0])
-                        module_name = module_path.replace(os.path.sep, ".")
-
-                    module = importlib.import_module(module_name)
-
-                    # return func
-                    for name, obj in module.__dict__.items():
-                        if name == func_name and callable(obj):
-                            return obj
-
-                except Exception as e:
-                    logger.error(
-                        f"Python file {f} has following source error: {str(e)}"
-                    )
-                    sys.exit(1)
+    module_name = lookup_function_module(func_name, directory)
+    if module_name:
+        logger.info(f"Source python module {module_name}")
+        try:
+            module = importlib.import_module(module_name)
+        except Exception as e:
+            logger.error(
+                f"Python module {module_name} has following source error: {str(e)}"
+            )
+            sys.exit(1)
+
+        obj = module.__dict__.get(func_name)
+        if callable(obj):
+            return obj
+        logger.warning(f"Function index is stale for {func_name}; walking {directory}")
+
+    for module_name, path in _walk_py_files(directory):
+        f = os.path.basename(path)
+        logger.info(f"Source python file {f}")
+        try:
+            module = importlib.import_module(module_name)
+
+            # return func
+            for name, obj in module.__dict__.items():
+                if name == func_name and callable(obj):
+                    return obj
+
+        except Exception as e:
+            logger.error(f"Python file {f} has following source error: {str(e)}")
+            sys.exit(1)
     return None
 
 
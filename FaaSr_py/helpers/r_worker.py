@@ -0,0 +1,191 @@
+import fcntl
+import logging
+import os
+import socket
+import subprocess
+import time
+from contextlib import contextmanager
+
+from FaaSr_py.helpers import serialization
+
+logger = logging.getLogger(__name__)
+
+R_WORKER_SCRIPT = "/tmp/r_worker.R"
+# each worker serves one action at a time, so concurrent R actions on a host
+# use separate workers (slots); a slot is held with a lock on its lock file,
+# and its worker's port is kept in its port file
+R_WORKER_DIR = "/tmp/faasr_r_workers"
+MAX_R_WORKERS = os.cpu_count() or 1
+
+
+def send_r_worker_request(request, port, timeout=None):
+    """
+    Sends a single JSON request to the R worker and returns its response
+
+    Arguments:
+        request: dict -- request with a Command field
+        port: int -- port the R worker listens on
+        timeout: float | None -- socket timeout in seconds (None blocks)
+    Returns:
+        dict: R worker response
+    """
+    with socket.create_connection(("127.0.0.1", port), timeout=timeout) as conn:
+        conn.sendall(serialization.dumps_bytes(request) + b"\n")
+        with conn.makefile("r", encoding="utf-8") as f:
+            line = f.readline()
+    if not line:
+        raise RuntimeError("empty response from R worker")
+    return serialization.loads(line)
+
+
+def ping_r_worker(port, slot, timeout=1.0):
+    """
+    Health check for the R worker of a slot
+
+    Returns:
+        bool: True if the slot's worker answered the ping on port
+    """
+    try:
+        response = send_r_worker_request({"Command": "ping"}, port, timeout)
+    except (OSError, ValueError, RuntimeError):
+        return False
+    # the port may have been reused since the slot's worker exited
+    return bool(response.get("Success")) and response.get("Slot") == slot
+
+
+def _get_free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_r_worker(slot, startup_timeout=30):
+    """
+    Starts a detached R worker for a slot (it outlives the current action)
+    and waits until it passes the health check
+
+    Returns:
+        int | None: port of the worker, or None if it didn't start
+    """
+    port = _get_free_port()
+    logger.info(f"Starting R worker {slot} on localhost port {port}")
+    try:
+        subprocess.Popen(
+            ["Rscript", R_WORKER_SCRIPT, str(port), str(slot)],
+            cwd="/tmp",
+            start_new_session=True,
+        )
+    except OSError as e:
+        logger.warning(f"Failed to start R worker -- {e}")
+        return None
+
+    deadline = time.time() + startup_timeout
+    while time.time() < deadline:
+        if ping_r_worker(port, slot):
+            return port
+        time.sleep(0.2)
+
+    logger.warning("R worker did not pass health check before timeout")
+    return None
+
+
+@contextmanager
+def claim_r_worker_slot():
+    """
+    Claims a free worker slot for the duration of the block
+
+    Yields:
+        int | None: slot number, or None if every slot is in use
+    """
+    os.makedirs(R_WORKER_DIR, exist_ok=True)
+    for slot in range(MAX_R_WORKERS):
+        lock_file = open(os.path.join(R_WORKER_DIR, f"{slot}.lock"), "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            continue
+        # the lock is released when the file is closed (or the process exits)
+        with lock_file:
+            yield slot
+        return
+    yield None
+
+
+def get_r_worker_port(slot):
+    """
+    Returns the port of a slot's R worker, starting the worker if it isn't
+    running. The caller must hold the slot
+
+    Returns:
+        int | None: port, or None if the worker couldn't be started
+    """
+    port_file = os.path.join(R_WORKER_DIR, f"{slot}.port")
+    try:
+        with open(port_file) as f:
+            port = int(f.read())
+    except (OSError, ValueError):
+        port = None
+    if port and ping_r_worker(port, slot):
+        return port
+
+    port = start_r_worker(slot)
+    if port:
+        with open(port_file, "w") as f:
+            f.write(str(port))
+    return port
+
+
+def run_r_function_in_worker(
+    func_name,
+    user_args,
+    invocation_id,
+    packages=None,
+    rpc_env=None,
+):
+    """
+    Runs an R user function in a persistent R worker, starting one if no
+    worker on this host is free
+
+    Arguments:
+        func_name: str -- name of the R function
+        user_args: dict -- arguments for the function
+        invocation_id: str -- InvocationID (used to locate function source)
+        packages: list -- CRAN packages to keep loaded in the worker
+        rpc_env: dict -- environment variables locating the action's RPC server
+    Returns:
+        int | None: exit code of the function, or None if no worker is
+        available and the caller should fall back to Rscript
+    """
+    with claim_r_worker_slot() as slot:
+        if slot is None:
+            logger.info(f"All {MAX_R_WORKERS} R workers are busy")
+            return None
+        port = get_r_worker_port(slot)
+        if port is None:
+            return None
+
+        request = {
+            "Command": "run",
+            "FunctionName": func_name,
+            "Arguments": user_args,
+            "InvocationID": invocation_id,
+            "Packages": packages or [],
+            "Env": rpc_env or {},
+        }
+
+        try:
+            response = send_r_worker_request(request, port)
+        except ConnectionRefusedError as e:
+            logger.warning(f"R worker refused connection -- {e}")
+            return None
+        except (OSError, ValueError, RuntimeError) as e:
+            # the function may already have run, so don't fall back to Rscript
+            logger.error(f"R worker failed while running {func_name} -- {e}")
+            return 1
+
+    if not response.get("Success"):
+        logger.warning(f"R worker could not run function: {response.get('Message')}")
+        return None
+
+    return int(response.get("ExitCode", 1))
@@ -1,10 +1,9 @@
 import logging
+import re
 import sys
 import uuid
 from pathlib import Path
 
-import boto3
-
 from FaaSr_py.config.s3_log_sender import S3LogSender
 
 logger = logging.getLogger(__name__)
@@ -55,6 +54,8 @@ def get_default_log_boto3_client(faasr_payload):
         logger.error(err_msg)
         sys.exit(1)
 
+    import boto3
+
     if s3_log_info.get("Endpoint"):
         return boto3.client(
             "s3",
@@ -84,3 +85,12 @@ def get_invocation_folder(faasr_payload):
         / Path(faasr_payload["InvocationTimestamp"])
         / faasr_payload["InvocationID"]
     )
+
+
+def clean_remote_path(remote_folder, remote_file):
+    """
+    Returns the path of a remote file, with duplicate and trailing "/" removed
+    """
+    remote_folder = re.sub(r"/+", "/", str(remote_folder).rstrip("/"))
+    remote_file = re.sub(r"/+", "/", str(remote_file).rstrip("/"))
+    return Path(remote_folder) / remote_file
@@ -0,0 +1,146 @@
+import json
+import os
+
+# JSON backends in order of preference; the first one installed is used,
+# unless FAASR_JSON_BACKEND names another (orjson is the "fast-json" extra)
+BACKENDS = ("orjson", "msgspec", "json")
+
+
+class _StdlibBackend:
+    name = "json"
+
+    def dumps(self, obj):
+        return json.dumps(obj, separators=(",", ":"))
+
+    def dumps_bytes(self, obj):
+        return self.dumps(obj).encode()
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class _OrjsonBackend:
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj):
+        return self.dumps_bytes(obj).decode()
+
+    def dumps_bytes(self, obj):
+        return self._orjson.dumps(obj, option=self._options)
+
+    def loads(self, data):
+        return self._orjson.loads(data)
+
+
+class _MsgspecBackend:
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj):
+        return self.dumps_bytes(obj).decode()
+
+    def dumps_bytes(self, obj):
+        return self._encoder.encode(obj)
+
+    def loads(self, data):
+        return self._decoder.decode(data)
+
+
+_BACKEND_CLASSES = {
+    "orjson": _OrjsonBackend,
+    "msgspec": _MsgspecBackend,
+    "json": _StdlibBackend,
+}
+
+_backend = None
+
+
+def set_backend(name=None):
+    """
+    Selects the JSON backend
+
+    Arguments:
+        name: str -- "orjson", "msgspec" or "json"; None picks the first
+        installed backend (or FAASR_JSON_BACKEND if it is set)
+    Returns:
+        str: name of the selected backend
+    """
+    global _backend
+
+    if name:
+        if name not in _BACKEND_CLASSES:
+            raise ValueError(f"Unknown JSON backend: {name}")
+        _backend = _BACKEND_CLASSES[name]()
+        return _backend.name
+
+    preferred = os.getenv("FAASR_JSON_BACKEND")
+    for candidate in ((preferred,) if preferred else ()) + BACKENDS:
+        try:
+            _backend = _BACKEND_CLASSES[candidate]()
+            return _backend.name
+        except (ImportError, KeyError):
+            continue
+
+
+def get_backend():
+    """
+    Returns:
+        str: name of the JSON backend in use
+    """
+    return _backend.name
+
+
+def available_backends():
+    """
+    Returns:
+        list[str]: names of the installed JSON backends
+    """
+    available = []
+    for name in BACKENDS:
+        try:
+            _BACKEND_CLASSES[name]()
+        except ImportError:
+            continue
+        available.append(name)
+    return available
+
+
+def dumps_bytes(obj):
+    """
+    Serializes obj to compact JSON
+
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    return _backend.dumps_bytes(obj)
+
+
+def dumps(obj):
+    """
+    Serializes obj to compact JSON
+
+    Returns:
+        str: JSON
+    """
+    return _backend.dumps(obj)
+
+
+def loads(data):
+    """
+    Parses JSON from a str or bytes
+    """
+    return _backend.loads(data)
+
+
+set_backend()
@@ -1,6 +1,7 @@
 import base64
 import json
 import logging
+import shlex
 import time
 from datetime import datetime
 
@@ -52,27 +53,28 @@ def validate_jwt_token(token):
         return {"valid": False, "error": f"Token validation error: {str(e)}"}
 
 
-def create_job_script(faasr, actionname, environment_vars):
+DEFAULT_CONTAINER_IMAGE = "faasr/openwhisk-tidyverse:latest"
+ENTRY_COMMAND = "python3 /action/faasr_start_invoke_github_actions.py"
+
+
+def get_container_image(faasr, actionname):
     """
-    Create SLURM job script for FaaSr execution
+    Returns the container image of an action, with fallback to default
 
     Arguments:
         faasr: FaaSrPayload -- workflow payload
         actionname: str -- name of the action
     Returns:
-        str: job script content
+        str: container image
     """
-    # Get container image with fallback to default
-    container_image = "faasr/openwhisk-tidyverse:latest"
     action_containers = faasr.get("ActionContainers", {})
     if actionname in action_containers and action_containers[actionname]:
-        container_image = action_containers[actionname]
+        return action_containers[actionname]
+    return DEFAULT_CONTAINER_IMAGE
 
-    entry_command = "python3 /action/faasr_start_invoke_github_actions.py"
 
+def _get_env_exports(environment_vars):
     env_exports = ""
-    docker_env_flags = ""
-
     if environment_vars:
         env_exports += "\n# Set environment variables (GitHub Actions pattern)\n"
         for key, value in environment_vars.items():
@@ -80,17 +82,186 @@ def create_job_script(faasr, actionname, environment_vars):
             escaped_value = str(value).replace("'", "'\"'\"'").replace("$", "\\$")
 
             env_exports += f"export {key}='{escaped_value}'\n"
+    return env_exports
+
+
+def get_container_setup(server_info, env_keys, images):
+    """
+    Returns the job script lines that select a container runtime, cache the
+    action images and define run_action, which runs an image's FaaSr entrypoint
 
-            docker_env_flags += f"  -e {key} \\\n"
+    With ImageCacheDir set, images are converted once to SIF files in that
+    directory (keyed by image digest) and run with Apptainer/Singularity.
+    Otherwise images are run with docker/podman; with ImagePullPolicy set,
+    each image is pulled according to the policy once per job before any
+    action starts, and actions run with --pull=never
+
+    Arguments:
+        server_info: dict -- server configuration information
+        env_keys: list[str] -- environment variables passed to the container
+        images: list[str] -- container images used by the job
+    Returns:
+        list[str]: job script lines
+    """
+    server_info = server_info or {}
+    cache_dir = server_info.get("ImageCacheDir")
+    pull_policy = server_info.get("ImagePullPolicy")
+
+    if cache_dir:
+        lines = [
+            "if command -v apptainer &> /dev/null; then",
+            '    CONTAINER_CMD="apptainer"',
+            "elif command -v singularity &> /dev/null; then",
+            '    CONTAINER_CMD="singularity"',
+            "else",
+            '    echo "Error: No SIF container runtime found"',
+            "    exit 1",
+            "fi",
+            "",
+            'echo "Using container runtime: $CONTAINER_CMD"',
+            f"export FAASR_IMAGE_CACHE_DIR={shlex.quote(cache_dir)}",
+            "",
+            "# SIF files are keyed by image digest, so a moved tag is re-fetched",
+            "image_key() {",
+            '    case "$1" in',
+            '        *@sha256:*) echo "${1##*@sha256:}" ;;',
+            "        *)",
+            '            DIGEST=""',
+            "            if command -v skopeo &> /dev/null; then",
+            "                DIGEST=$(skopeo inspect --format '{{.Digest}}' \"docker://$1\" 2> /dev/null)",  # noqa: E501
+            "            fi",
+            '            if [ -n "$DIGEST" ]; then',
+            '                echo "${DIGEST#sha256:}"',
+            "            else",
+            "                echo \"$1\" | tr '/:' '__'",
+            "            fi",
+            "            ;;",
+            "    esac",
+            "}",
+            "",
+            "cache_image() {",
+            '    SIF="$FAASR_IMAGE_CACHE_DIR/$(image_key "$1").sif"',
+            '    if [ ! -f "$SIF" ]; then',
+            '        mkdir -p "$FAASR_IMAGE_CACHE_DIR"',
+            "        (",
+            "            flock 9",
+            '            if [ ! -f "$SIF" ]; then',
+            '                $CONTAINER_CMD build --force \\',
+            '                    "$SIF.tmp" "docker://$1" >&2 \\',
+            '                    && mv "$SIF.tmp" "$SIF"',
+            "            fi",
+            '        ) 9> "$SIF.lock"',
+            "    fi",
+            '    echo "$SIF"',
+            "}",
+            "",
+        ]
+        for image in dict.fromkeys(images):
+            lines += [
+                f"if ! cache_image {shlex.quote(image)} > /dev/null; then",
+                f'    echo "Error: Failed to cache image {image}"',
+                "    exit 1",
+                "fi",
+            ]
+        # SIF containers inherit the job environment
+        lines += [
+            "",
+            "run_action() {",
+            '    $CONTAINER_CMD exec "$(cache_image "$1")" \\',
+            f"        /bin/bash -c 'cd /action && {ENTRY_COMMAND}'",
+            "}",
+        ]
+    else:
+        lines = [
+            "if command -v docker &> /dev/null; then",
+            '    CONTAINER_CMD="docker"',
+            "elif command -v podman &> /dev/null; then",
+            '    CONTAINER_CMD="podman"',
+            "else",
+            '    echo "Error: No container runtime found"',
+            "    exit 1",
+            "fi",
+            "",
+            'echo "Using container runtime: $CONTAINER_CMD"',
+            "",
+        ]
+        run_flags = "--rm --network=host"
+        if pull_policy:
+            # serialize pulls on the node so parallel actions share one pull
+            for image in dict.fromkeys(images):
+                image = shlex.quote(image)
+                pull = f"flock /tmp/faasr-image-pull.lock $CONTAINER_CMD pull {image}"
+                if pull_policy == "missing":
+                    inspect = f"$CONTAINER_CMD image inspect {image} &> /dev/null"
+                    pull = f"{inspect} || {pull}"
+                if pull_policy != "never":
+                    lines += [
+                        f"if ! ({pull}); then",
+                        f'    echo "Error: Failed to pull image {image}"',
+                        "    exit 1",
+                        "fi",
+                    ]
+            run_flags += " --pull=never"
+        lines += [
+            "",
+            "run_action() {",
+            f"    $CONTAINER_CMD run {run_flags} \\",
+            *[f"      -e {key} \\" for key in env_keys],
+            '      "$1" \\',
+            f"      /bin/bash -c 'cd /action && {ENTRY_COMMAND}'",
+            "}",
+        ]
+
+    # packed actions call run_action from srun steps
+    lines += ["export -f run_action", "export CONTAINER_CMD"]
+    if cache_dir:
+        lines += ["export -f image_key cache_image"]
+    return lines
+
+
+def create_job_script(
+    faasr, actionname, environment_vars, array_size=None, server_info=None
+):
+    """
+    Create SLURM job script for FaaSr execution
+
+    Arguments:
+        faasr: FaaSrPayload -- workflow payload
+        actionname: str -- name of the action
+        environment_vars: dict -- environment variables passed to the container
+        array_size: int -- if set, the script runs as a job array with
+        tasks 1..array_size, and each task gets its rank from SLURM_ARRAY_TASK_ID
+        server_info: dict -- server configuration (image caching options)
+    Returns:
+        str: job script content
+    """
+    container_image = get_container_image(faasr, actionname)
+
+    env_exports = _get_env_exports(environment_vars)
+    env_keys = list(environment_vars or {})
+
+    sbatch_lines = [f"#SBATCH --job-name=faasr-{actionname}"]
+    if array_size:
+        env_exports += "export FAASR_JOB_ARRAY='1'\n"
+        env_keys += ["FAASR_JOB_ARRAY", "SLURM_ARRAY_TASK_ID"]
+        sbatch_lines += [
+            f"#SBATCH --array=1-{array_size}",
+            f"#SBATCH --output=faasr-{actionname}-%A_%a.out",
+            f"#SBATCH --error=faasr-{actionname}-%A_%a.err",
+        ]
+    else:
+        sbatch_lines += [
+            f"#SBATCH --output=faasr-{actionname}-%j.out",
+            f"#SBATCH --error=faasr-{actionname}-%j.err",
+        ]
 
     script_lines = [
         "#!/bin/bash",
-        f"#SBATCH --job-name=faasr-{actionname}",
-        f"#SBATCH --output=faasr-{actionname}-%j.out",
-        f"#SBATCH --error=faasr-{actionname}-%j.err",
+        *sbatch_lines,
         "",
         f'echo "Starting FaaSr job: {actionname}"',
         'echo "Job ID: $SLURM_JOB_ID"',
+        'echo "Array task ID: ${SLURM_ARRAY_TASK_ID:-none}"',
         'echo "Node: $SLURMD_NODENAME"',
         'echo "Time: $(date)"',
         "",
@@ -101,22 +272,9 @@ def create_job_script(faasr, actionname, environment_vars):
         'echo "OVERWRITTEN length: ${#OVERWRITTEN}"',
         "echo \"SECRET_PAYLOAD present: $([ -n \\\"$SECRET_PAYLOAD\\\" ] && echo 'yes' || echo 'no')\"",  # noqa: E501
         "",
-        "if command -v docker &> /dev/null; then",
-        '    CONTAINER_CMD="docker"',
-        "elif command -v podman &> /dev/null; then",
-        '    CONTAINER_CMD="podman"',
-        "else",
-        '    echo "Error: No container runtime found"',
-        "    exit 1",
-        "fi",
-        "",
-        'echo "Using container runtime: $CONTAINER_CMD"',
+        *get_container_setup(server_info, env_keys, [container_image]),
         "",
-        "$CONTAINER_CMD run --rm --network=host \\",
-        docker_env_flags.rstrip(" \\\n")
-        + " \\",  # Remove trailing backslash and newline
-        f"  {container_image} \\",
-        f"  /bin/bash -c 'cd /action && {entry_command}'",
+        f"run_action {shlex.quote(container_image)}",
         "",
         f'echo "FaaSr job completed: {actionname}"',
         'echo "End time: $(date)"',
@@ -125,6 +283,79 @@ def create_job_script(faasr, actionname, environment_vars):
     return "\n".join(script_lines)
 
 
+def create_packed_job_script(
+    faasr, jobname, actions, environment_vars, server_info=None, pack_mode="parallel"
+):
+    """
+    Create a SLURM job script that runs several FaaSr actions in one allocation,
+    so they share the scheduling latency and container image setup
+
+    In parallel mode each action runs as its own srun step (one task each);
+    in sequential mode the actions run back to back
+
+    Arguments:
+        faasr: FaaSrPayload -- workflow payload
+        jobname: str -- name of the job
+        actions: list[dict] -- {"name": str, "image": str, "overwritten": str}
+        for each action; overwritten is the action's OVERWRITTEN JSON
+        environment_vars: dict -- environment variables shared by all actions
+        server_info: dict -- server configuration (image caching options)
+        pack_mode: str -- "parallel" or "sequential"
+    Returns:
+        str: job script content
+    """
+    env_keys = list(environment_vars or {}) + ["OVERWRITTEN"]
+
+    script_lines = [
+        "#!/bin/bash",
+        f"#SBATCH --job-name=faasr-{jobname}",
+        f"#SBATCH --output=faasr-{jobname}-%j.out",
+        f"#SBATCH --error=faasr-{jobname}-%j.err",
+        "",
+        f'echo "Starting packed FaaSr job: {jobname} ({len(actions)} actions)"',
+        'echo "Job ID: $SLURM_JOB_ID"',
+        'echo "Node: $SLURMD_NODENAME"',
+        'echo "Time: $(date)"',
+        "",
+        _get_env_exports(environment_vars),
+        "",
+        *get_container_setup(
+            server_info, env_keys, [action["image"] for action in actions]
+        ),
+        "",
+        "FAILED=0",
+    ]
+
+    for action in actions:
+        overwritten = f"OVERWRITTEN={shlex.quote(action['overwritten'])}"
+        image = shlex.quote(action["image"])
+        script_lines.append(f'echo "Running packed action: {action["name"]}"')
+        if pack_mode == "sequential":
+            script_lines.append(f"{overwritten} run_action {image} || FAILED=1")
+        else:
+            script_lines.append(
+                f"{overwritten} srun --ntasks=1 --nodes=1 --exclusive "
+                f"bash -c 'run_action {image}' &"
+            )
+
+    if pack_mode != "sequential":
+        script_lines += [
+            "",
+            "for pid in $(jobs -p); do",
+            '    wait "$pid" || FAILED=1',
+            "done",
+        ]
+
+    script_lines += [
+        "",
+        f'echo "Packed FaaSr job completed: {jobname}"',
+        'echo "End time: $(date)"',
+        'exit "$FAILED"',
+    ]
+
+    return "\n".join(script_lines)
+
+
 def get_resource_requirements(faasr, actionname, server_info):
     """
     Extract resource requirements for a function with fallback hierarchy:
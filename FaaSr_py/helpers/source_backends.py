@@ -0,0 +1,227 @@
+import abc
+import inspect
+import logging
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+from FaaSr_py.config.debug_config import global_config
+
+logger = logging.getLogger(__name__)
+
+
+class SourceBackend(abc.ABC):
+    """
+    Interface for fetching workflow JSON and function source
+
+    The default backend (SOURCE_BACKEND == "github") is implemented directly
+    by faasr_get_github_raw, faasr_get_github and faasr_get_github_clone;
+    other backends are selected with global_config.SOURCE_BACKEND
+    """
+
+    @abc.abstractmethod
+    def get_raw(self, token, path):
+        """
+        Returns the contents of a single file
+
+        Arguments:
+            token: GitHub PAT
+            path: username/repo/branch/path to file
+        Returns:
+            str: file contents
+        """
+
+    @abc.abstractmethod
+    def get_repo(self, faasr_source, path, token=None):
+        """
+        Places a repo (or a folder inside it) in /tmp/functions/{InvocationID}
+
+        Arguments:
+            faasr_source: payload dict (FaaSr)
+            path: username/repo[/path to folder]
+            token: GitHub PAT
+        """
+
+    @abc.abstractmethod
+    def get_clone(self, faasr_payload, url, base_dir=None):
+        """
+        Places a clone of a repo in base_dir/username/repo
+
+        Arguments:
+            faasr_payload: payload dict (FaaSr)
+            url: url to git repo (ending in username/repo.git)
+            base_dir: directory to clone into
+        Returns:
+            str: path to the clone
+        """
+
+
+class LocalSourceBackend(SourceBackend):
+    """
+    Serves repos from LOCAL_SOURCE_DIR/username/repo, which can be a plain
+    directory or a git repo. Used to run actions without network access
+    (e.g. air-gapped clusters) and to benchmark startup deterministically
+    """
+
+    def __init__(self, source_dir=None):
+        self.source_dir = Path(source_dir or global_config.LOCAL_SOURCE_DIR)
+
+    def _get_repo_dir(self, username, reponame):
+        repo_dir = self.source_dir / username / reponame
+        if not repo_dir.is_dir():
+            logger.error(f"Local source repo not found: {repo_dir}")
+            sys.exit(1)
+        return repo_dir
+
+    def _get_commit(self, repo_dir):
+        if not (repo_dir / ".git").exists():
+            return None
+        result = subprocess.run(
+            ["git", "-C", str(repo_dir), "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            return None
+        return result.stdout.strip()
+
+    def _is_dirty(self, repo_dir):
+        result = subprocess.run(
+            ["git", "-C", str(repo_dir), "status", "--porcelain"],
+            capture_output=True,
+            text=True,
+        )
+        return result.returncode != 0 or bool(result.stdout.strip())
+
+    def get_raw(self, token, path):
+        parts = path.split("/")
+        if len(parts) < 3:
+            err_msg = "github path should contain at least three parts"
+            logger.error(err_msg)
+            sys.exit(1)
+
+        repo_dir = self._get_repo_dir(parts[0], parts[1])
+        branch = parts[2]
+        filepath = "/".join(parts[3:])
+
+        # read from the branch if this is a git repo, else the working tree
+        if self._get_commit(repo_dir):
+            result = subprocess.run(
+                ["git", "-C", str(repo_dir), "show", f"{branch}:{filepath}"],
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode == 0:
+                logger.debug(f"Successfully read {filepath} from local repo {branch}")
+                return result.stdout
+
+        local_file = repo_dir / filepath
+        if not local_file.is_file():
+            logger.error(f"Failed to fetch raw file from local source: {path}")
+            sys.exit(1)
+        logger.debug(f"Successfully read local file: {local_file}")
+        return local_file.read_text(encoding="utf-8")
+
+    def get_repo(self, faasr_source, path, token=None):
+        parts = path.split("/")
+        if len(parts) < 2:
+            err_msg = "github path should contain at least two parts"
+            logger.error(err_msg)
+            sys.exit(1)
+
+        username, reponame = parts[0], parts[1]
+        sub_path = "/".join(parts[2:])
+        repo_dir = self._get_repo_dir(username, reponame)
+
+        # mirror the layout of GitHub tarballs (username-repo-sha/...); the
+        # working tree is copied, so uncommitted edits mustn't be labelled
+        # with HEAD's sha (the function index would treat them as that commit)
+        commit = self._get_commit(repo_dir)
+        if not commit:
+            label = "local"
+        elif self._is_dirty(repo_dir):
+            label = f"{commit[:7]}-dirty"
+        else:
+            label = commit[:7]
+        root_dir = f"{username}-{reponame}-{label}"
+        extract_base = Path(f"/tmp/functions/{faasr_source['InvocationID']}")
+
+        src = repo_dir / sub_path if sub_path else repo_dir
+        dst = extract_base / root_dir / sub_path if sub_path else extract_base / root_dir
+
+        if src.is_file():
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(src, dst)
+        elif src.is_dir():
+            shutil.copytree(
+                src, dst, ignore=shutil.ignore_patterns(".git"), dirs_exist_ok=True
+            )
+        else:
+            logger.error(f"Local source path not found: {src}")
+            sys.exit(1)
+
+        logger.info(f"Successfully copied local source: {path}")
+
+    def get_clone(self, faasr_payload, url, base_dir=None):
+        if not base_dir:
+            base_dir = f"/tmp/functions/{faasr_payload['InvocationID']}"
+
+        parts = url.rstrip("/").removesuffix(".git").split("/")
+        if len(parts) < 2:
+            raise ValueError(
+                f"Invalid GitHub URL: {url} — expected to end in owner/repo.git"
+            )
+        username, reponame = parts[-2], parts[-1]
+        repo_dir = self._get_repo_dir(username, reponame)
+        repo_path = os.path.join(base_dir, username, reponame)
+
+        if os.path.isdir(repo_path):
+            shutil.rmtree(repo_path)
+
+        if self._get_commit(repo_dir):
+            result = subprocess.run(
+                ["git", "clone", "--depth=1", f"file://{repo_dir.resolve()}", repo_path],
+                text=True,
+            )
+            if result.returncode != 0:
+                raise RuntimeError(f"Git clone failed for {repo_dir}")
+        else:
+            shutil.copytree(repo_dir, repo_path)
+
+        logger.info(f"Successfully cloned local source: {repo_dir}")
+        return repo_path
+
+
+SOURCE_BACKENDS = {
+    "local": LocalSourceBackend,
+}
+
+
+def register_source_backend(name, backend_cls):
+    """
+    Registers a SourceBackend subclass so it can be selected
+    with global_config.SOURCE_BACKEND
+    """
+    if not issubclass(backend_cls, SourceBackend):
+        raise TypeError("source backend must be a subclass of SourceBackend")
+    if inspect.isabstract(backend_cls):
+        raise TypeError(f"source backend {backend_cls.__name__} is abstract")
+    SOURCE_BACKENDS[name] = backend_cls
+
+
+def get_source_backend():
+    """
+    Returns the configured source backend
+
+    Returns:
+        SourceBackend | None: None if the default GitHub API backend is used
+    """
+    name = global_config.SOURCE_BACKEND
+    if not name or name == "github":
+        return None
+    if name not in SOURCE_BACKENDS:
+        logger.error(f"Unknown source backend: {name}")
+        sys.exit(1)
+    return SOURCE_BACKENDS[name]()
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import uuid
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# function source is cached here by (repo, commit SHA), so actions that
+# share a repo only download it once per host
+SOURCE_CACHE_DIR = "/tmp/faasr_cache/sources"
+
+_etag_lock = threading.Lock()
+
+
+def _etag_file():
+    return os.path.join(SOURCE_CACHE_DIR, "etags.json")
+
+
+def get_cached_response(url):
+    """
+    Returns the cached ETag entry for a URL
+
+    Returns:
+        dict | None: {"etag": str, "value": str}
+    """
+    with _etag_lock:
+        try:
+            with open(_etag_file(), "r") as f:
+                return json.load(f).get(url)
+        except (OSError, ValueError):
+            return None
+
+
+def set_cached_response(url, etag, value):
+    """
+    Stores the ETag and value of a response so it can be revalidated later
+    """
+    if not etag:
+        return
+    with _etag_lock:
+        try:
+            with open(_etag_file(), "r") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        cache[url] = {"etag": etag, "value": value}
+
+        os.makedirs(SOURCE_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{_etag_file()}.{uuid.uuid4()}"
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, _etag_file())
+
+
+def github_get(url, headers, decode):
+    """
+    Sends a GET request to the GitHub API, revalidating the cached
+    response with If-None-Match. 304 responses don't count against the
+    GitHub rate limit
+
+    Arguments:
+        url: str -- GitHub API url
+        headers: dict -- request headers
+        decode: callable -- converts a 200 response to the cached value
+    Returns:
+        (value, response): value is None if the request failed
+    """
+    headers = dict(headers)
+    cached = get_cached_response(url)
+    if cached:
+        headers["If-None-Match"] = cached["etag"]
+
+    response = requests.get(url, headers=headers)
+
+    if response.status_code == 304 and cached:
+        logger.debug(f"GitHub response not modified: {url}")
+        return cached["value"], response
+    if response.status_code == 200:
+        value = decode(response)
+        set_cached_response(url, response.headers.get("ETag"), value)
+        return value, response
+    return None, response
+
+
+def resolve_github_commit(repo, ref="HEAD", token=None):
+    """
+    Returns the commit SHA that ref points to
+
+    Arguments:
+        repo: str -- username/repo
+        ref: str -- branch, tag or commit
+        token: GitHub PAT
+    Returns:
+        str | None: commit SHA, or None if it couldn't be resolved
+    """
+    url = f"https://api.github.com/repos/{repo}/commits/{ref}"
+    headers = {
+        "Accept": "application/vnd.github.sha",
+        "X-GitHub-Api-Version": "2022-11-28",
+        "Authorization": f"Bearer {token}" if token else None,
+    }
+    sha, _ = github_get(url, headers, lambda r: r.text.strip())
+    return sha
+
+
+def resolve_git_commit(url):
+    """
+    Returns the commit SHA of HEAD for a git remote
+
+    Returns:
+        str | None: commit SHA, or None if it couldn't be resolved
+    """
+    result = subprocess.run(
+        ["git", "ls-remote", url, "HEAD"], capture_output=True, text=True
+    )
+    if result.returncode != 0 or not result.stdout.strip():
+        return None
+    return result.stdout.split()[0]
+
+
+def get_cache_path(*parts):
+    """
+    Returns a path in the source cache; parts are hashed if they could
+    contain path separators
+
+    Arguments:
+        parts: str -- components of the cache key
+    Returns:
+        str: cache directory for the key
+    """
+    safe_parts = []
+    for part in parts:
+        part = str(part)
+        if not part or "/" in part or part.startswith("."):
+            part = hashlib.sha256(part.encode()).hexdigest()[:16]
+        safe_parts.append(part)
+    return os.path.join(SOURCE_CACHE_DIR, *safe_parts)
+
+
+def populate_cache(cache_path, populate):
+    """
+    Fills a cache directory once; the directory is built in a temporary
+    location and renamed so concurrent actions never see partial content
+
+    Arguments:
+        cache_path: str -- cache directory
+        populate: callable -- called with a temporary directory to fill
+    Returns:
+        str: cache_path
+    """
+    if os.path.isdir(cache_path):
+        logger.debug(f"Using cached function source {cache_path}")
+        return cache_path
+
+    tmp_path = f"{cache_path}.{uuid.uuid4()}.tmp"
+    os.makedirs(tmp_path)
+    try:
+        populate(tmp_path)
+        try:
+            os.rename(tmp_path, cache_path)
+        except OSError:
+            # another action populated the cache first
+            if not os.path.isdir(cache_path):
+                raise
+    finally:
+        if os.path.isdir(tmp_path):
+            shutil.rmtree(tmp_path)
+    return cache_path
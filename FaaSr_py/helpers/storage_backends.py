@@ -0,0 +1,758 @@
+import abc
+import errno
+import fcntl
+import hashlib
+import inspect
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from FaaSr_py.config.debug_config import global_config
+from FaaSr_py.helpers.s3_helper_functions import get_logging_server
+
+logger = logging.getLogger(__name__)
+
+COPY_BUFFER_SIZE = 1024 * 1024
+# ioctl that clones a file's extents on copy-on-write file systems (btrfs, xfs)
+FICLONE = 0x40049409
+# errors from os.link that mean a copy is needed instead
+# (other file system, too many links, or links unsupported)
+LINK_FALLBACK_ERRORS = {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP}
+
+# objects larger than this are copied in parts (UploadPartCopy / multipart upload)
+MULTIPART_THRESHOLD = 64 * 1024 * 1024
+MULTIPART_CHUNKSIZE = 64 * 1024 * 1024
+MAX_COPY_CONCURRENCY = 10
+# error codes S3 returns for missing objects
+NOT_FOUND_ERRORS = {"404", "NoSuchKey", "NotFound"}
+# error codes S3 returns when a conditional write loses a race
+CONDITIONAL_WRITE_ERRORS = {"PreconditionFailed", "ConditionalRequestConflict"}
+MAX_UPDATE_ATTEMPTS = 10
+
+
+class StorageBackend(abc.ABC):
+    """
+    Interface for the object store behind a data store
+
+    Keys are "/" separated object names, as in S3. The backend is selected
+    with global_config.STORAGE_BACKEND (USE_LOCAL_FILE_SYSTEM selects "local")
+    """
+
+    @classmethod
+    def from_payload(cls, faasr_payload, server_name):
+        """
+        Returns the backend for a data store in the payload
+        """
+        return cls()
+
+    @abc.abstractmethod
+    def put_file(self, local_path, key):
+        """
+        Uploads a local file to key
+        """
+
+    @abc.abstractmethod
+    def get_file(self, key, local_path):
+        """
+        Downloads key to a local file
+
+        Raises:
+            FileNotFoundError: if key doesn't exist
+        """
+
+    @abc.abstractmethod
+    def delete(self, key):
+        """
+        Deletes key
+
+        Returns:
+            bool: False if key is known not to have existed
+        """
+
+    @abc.abstractmethod
+    def exists(self, key):
+        """
+        Returns True if key exists
+        """
+
+    @abc.abstractmethod
+    def list(self, prefix=""):
+        """
+        Returns:
+            list[str]: keys that start with prefix
+        """
+
+    def copy(self, source_key, target_key):
+        return self.copy_from(self, source_key, target_key)
+
+    def copy_from(self, source, source_key, key):
+        """
+        Copies source_key from another backend (or this one) to key
+
+        The default stages the object in a local temp file
+        """
+        if source is self and str(source_key) == str(key):
+            return
+        fd, tmp_path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            source.get_file(source_key, tmp_path)
+            self.put_file(tmp_path, key)
+        finally:
+            os.unlink(tmp_path)
+
+    def move(self, source_key, target_key):
+        self.copy(source_key, target_key)
+        self.delete(source_key)
+
+    @abc.abstractmethod
+    def read_bytes(self, key):
+        """
+        Raises:
+            FileNotFoundError: if key doesn't exist
+        """
+
+    @abc.abstractmethod
+    def write_bytes(self, key, data):
+        """
+        Writes data (bytes) to key
+        """
+
+    @abc.abstractmethod
+    def append(self, key, data):
+        """
+        Appends data (bytes) to key, creating it if it doesn't exist
+        """
+
+    @abc.abstractmethod
+    def update(self, key, func):
+        """
+        Atomically replaces the value of key with func(value)
+        (value is None if key doesn't exist)
+
+        Returns:
+            bytes: the value written
+        """
+
+    def get_version(self, key):
+        """
+        Returns:
+            str | None: identifier that changes when the object does,
+            or None if key doesn't exist
+        """
+        try:
+            return hashlib.sha256(self.read_bytes(key)).hexdigest()
+        except FileNotFoundError:
+            return None
+
+    def check(self):
+        """
+        Checks that the store is reachable; the default does nothing
+        (for stores that don't need a network call)
+
+        Raises:
+            Exception: if the store is unreachable
+        """
+
+
+def clone_file(src, dst):
+    """
+    Copies the contents of the open file src to dst, sharing extents where
+    the file system supports reflinks and streaming in chunks otherwise
+    """
+    try:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return
+    except OSError:
+        pass
+    shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Stores objects as files under root (LOCAL_FILE_SYSTEM_DIR)
+
+    Writes go to a temp file in the target's folder that is renamed into
+    place, so readers (and crashes) never see a partial object. With fsync,
+    the file and its folder are flushed to disk before a write returns.
+    Copies hardlink where possible, which is safe since objects are only
+    ever replaced, never modified in place (appends break the link first)
+    """
+
+    _backends = {}
+
+    def __init__(self, root=None, fsync=None, use_links=True):
+        self.root = Path(root or global_config.LOCAL_FILE_SYSTEM_DIR)
+        if fsync is None:
+            fsync = global_config.LOCAL_FILE_SYSTEM_FSYNC
+        self.fsync = fsync
+        self.use_links = use_links
+
+    @classmethod
+    def from_payload(cls, faasr_payload, server_name):
+        # data stores share LOCAL_FILE_SYSTEM_DIR
+        cache_key = (
+            global_config.LOCAL_FILE_SYSTEM_DIR,
+            global_config.LOCAL_FILE_SYSTEM_FSYNC,
+        )
+        if cache_key not in cls._backends:
+            cls._backends[cache_key] = cls(*cache_key)
+        return cls._backends[cache_key]
+
+    def path(self, key):
+        """
+        Returns the path of the file that stores key
+        """
+        return self.root / str(key)
+
+    def _tmp_path(self, target):
+        """
+        Returns a unique hidden temp path next to target (skipped by list)
+        """
+        return target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+
+    def _is_internal(self, filename):
+        """
+        Checks if a file is a temp or lock file rather than an object
+        """
+        return filename.startswith(".") and filename.endswith((".tmp", ".lock"))
+
+    def _fsync_dir(self, directory):
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _atomic_write(self, target, write):
+        """
+        Calls write(f) on a temp file next to target, then renames it to target
+        """
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._tmp_path(target)
+        # not mkstemp, which creates files only the owner can read
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, target)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        if self.fsync:
+            self._fsync_dir(target.parent)
+
+    def _copy_file(self, source, target):
+        with open(source, "rb") as src:
+            self._atomic_write(target, lambda dst: clone_file(src, dst))
+
+    def put_file(self, local_path, key):
+        self._copy_file(local_path, self.path(key))
+
+    def get_file(self, key, local_path):
+        source = self.path(key)
+        if not source.is_file():
+            raise FileNotFoundError(f"File not found in local bucket: {source}")
+        self._copy_file(source, Path(local_path))
+
+    def delete(self, key):
+        try:
+            self.path(key).unlink()
+        except FileNotFoundError:
+            return False
+        return True
+
+    def exists(self, key):
+        return self.path(key).is_file()
+
+    def list(self, prefix=""):
+        prefix = str(prefix)
+        # walk only the deepest folder the prefix names
+        start = self.root / prefix.rpartition("/")[0]
+        if not start.is_dir():
+            return []
+        keys = []
+        for dirpath, _, filenames in os.walk(start):
+            for filename in filenames:
+                if self._is_internal(filename):
+                    continue
+                key = (Path(dirpath) / filename).relative_to(self.root).as_posix()
+                if key.startswith(prefix):
+                    keys.append(key)
+        return sorted(keys)
+
+    def copy(self, source_key, target_key):
+        source, target = self.path(source_key), self.path(target_key)
+        if not source.is_file():
+            raise FileNotFoundError(f"File not found in local bucket: {source}")
+        if source.resolve() == target.resolve():
+            return
+        if self.use_links:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._tmp_path(target)
+            try:
+                os.link(source, tmp_path)
+                os.replace(tmp_path, target)
+                return
+            except OSError as e:
+                tmp_path.unlink(missing_ok=True)
+                if e.errno not in LINK_FALLBACK_ERRORS:
+                    raise
+        self._copy_file(source, target)
+
+    def copy_from(self, source, source_key, key):
+        if source is self:
+            return self.copy(source_key, key)
+        if not isinstance(source, LocalStorageBackend):
+            return super().copy_from(source, source_key, key)
+        self._copy_file(source.path(source_key), self.path(key))
+
+    def move(self, source_key, target_key):
+        source, target = self.path(source_key), self.path(target_key)
+        if not source.is_file():
+            raise FileNotFoundError(f"File not found in local bucket: {source}")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(source, target)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            self._copy_file(source, target)
+            source.unlink()
+        if self.fsync:
+            self._fsync_dir(target.parent)
+
+    def read_bytes(self, key):
+        return self.path(key).read_bytes()
+
+    def write_bytes(self, key, data):
+        self._atomic_write(self.path(key), lambda f: f.write(data))
+
+    def append(self, key, data):
+        target = self.path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # a hardlinked copy must not see the append
+        if target.is_file() and target.stat().st_nlink > 1:
+            self._copy_file(target, target)
+        with open(target, "ab") as f:
+            f.write(data)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def update(self, key, func):
+        target = self.path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # writers of a key serialize on a lock file next to it
+        lock_path = target.with_name(f".{target.name}.lock")
+        with open(lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                data = target.read_bytes()
+            except FileNotFoundError:
+                data = None
+            data = func(data)
+            self.write_bytes(key, data)
+        return data
+
+    def get_version(self, key):
+        path = self.path(key)
+        if not path.is_file():
+            return None
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(COPY_BUFFER_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+
+def same_s3_endpoint(source_s3, target_s3):
+    """
+    Returns True if objects can be copied between the stores server-side
+    (same endpoint and credentials; buckets may differ)
+    """
+    fields = ("Endpoint", "Region", "AccessKey")
+    return all(source_s3.get(field) == target_s3.get(field) for field in fields)
+
+
+class S3StorageBackend(StorageBackend):
+    """
+    Stores objects in the bucket of an S3 data store
+
+    Backends (and their boto3 clients) are shared per data store, since
+    creating a client costs more than most requests
+    """
+
+    _backends = {}
+
+    def __init__(self, data_store):
+        self.data_store = data_store
+        self.bucket = data_store["Bucket"]
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @classmethod
+    def from_payload(cls, faasr_payload, server_name):
+        if server_name not in faasr_payload["DataStores"]:
+            logger.error(f"Invalid data server name: {server_name}")
+            sys.exit(1)
+        data_store = faasr_payload["DataStores"][server_name]
+        cache_key = tuple(sorted((k, str(v)) for k, v in data_store.items()))
+        if cache_key not in cls._backends:
+            cls._backends[cache_key] = cls(data_store)
+        return cls._backends[cache_key]
+
+    @property
+    def client(self):
+        with self._client_lock:
+            if self._client is None:
+                import boto3
+
+                client_args = {
+                    "aws_access_key_id": self.data_store["AccessKey"],
+                    "aws_secret_access_key": self.data_store["SecretKey"],
+                    "region_name": self.data_store["Region"],
+                }
+                if self.data_store.get("Endpoint"):
+                    client_args["endpoint_url"] = self.data_store["Endpoint"]
+                # boto3's default session isn't thread-safe, and clients
+                # may be created concurrently (data store checks)
+                session = boto3.session.Session()
+                self._client = session.client("s3", **client_args)
+        return self._client
+
+    def _transfer_config(self):
+        from boto3.s3.transfer import TransferConfig
+
+        return TransferConfig(
+            multipart_threshold=MULTIPART_THRESHOLD,
+            multipart_chunksize=MULTIPART_CHUNKSIZE,
+            max_concurrency=MAX_COPY_CONCURRENCY,
+        )
+
+    def _error_code(self, e):
+        return e.response.get("Error", {}).get("Code")
+
+    def _not_found(self, key):
+        return FileNotFoundError(f"S3 object not found: s3://{self.bucket}/{key}")
+
+    def check(self):
+        self.client.head_bucket(Bucket=self.bucket)
+
+    def put_file(self, local_path, key):
+        with open(local_path, "rb") as put_data:
+            self.client.put_object(Bucket=self.bucket, Body=put_data, Key=str(key))
+
+    def get_file(self, key, local_path):
+        try:
+            self.client.download_file(
+                Bucket=self.bucket, Key=str(key), Filename=str(local_path)
+            )
+        except self.client.exceptions.ClientError as e:
+            if self._error_code(e) in NOT_FOUND_ERRORS:
+                raise self._not_found(key) from e
+            raise
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=str(key))
+        return True
+
+    def exists(self, key):
+        return self.get_version(key) is not None
+
+    def list(self, prefix=""):
+        paginator = self.client.get_paginator("list_objects_v2")
+        keys = []
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=str(prefix)):
+            for content in page.get("Contents", []):
+                if not content["Key"].endswith("/"):
+                    keys.append(content["Key"])
+        return keys
+
+    def copy_from(self, source, source_key, key):
+        if not isinstance(source, S3StorageBackend):
+            return super().copy_from(source, source_key, key)
+        copy_source = {"Bucket": source.bucket, "Key": str(source_key)}
+        try:
+            if same_s3_endpoint(source.data_store, self.data_store):
+                # server-side CopyObject, or UploadPartCopy for large objects
+                self.client.copy(
+                    copy_source, self.bucket, str(key), Config=self._transfer_config()
+                )
+            else:
+                # different endpoints can't copy server-side, so the object is
+                # streamed from the source into a multipart upload to the target
+                response = source.client.get_object(**copy_source)
+                self.client.upload_fileobj(
+                    response["Body"],
+                    self.bucket,
+                    str(key),
+                    Config=self._transfer_config(),
+                )
+        except self.client.exceptions.ClientError as e:
+            if self._error_code(e) in NOT_FOUND_ERRORS:
+                raise source._not_found(source_key) from e
+            raise
+
+    def _read(self, key):
+        """
+        Returns:
+            (bytes, str): object content and its ETag
+        """
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=str(key))
+        except self.client.exceptions.NoSuchKey as e:
+            raise self._not_found(key) from e
+        return response["Body"].read(), response["ETag"]
+
+    def read_bytes(self, key):
+        return self._read(key)[0]
+
+    def write_bytes(self, key, data):
+        self.client.put_object(Bucket=self.bucket, Key=str(key), Body=data)
+
+    def append(self, key, data):
+        # S3 objects can't be appended to, so the object is rewritten
+        try:
+            existing = self.read_bytes(key)
+        except FileNotFoundError:
+            existing = b""
+        self.write_bytes(key, existing + data)
+
+    def update(self, key, func):
+        for attempt in range(MAX_UPDATE_ATTEMPTS):
+            try:
+                data, etag = self._read(key)
+            except FileNotFoundError:
+                data, etag = None, None
+            data = func(data)
+            # only write if nobody else has since the read
+            condition = {"IfMatch": etag} if etag else {"IfNoneMatch": "*"}
+            try:
+                self.client.put_object(
+                    Bucket=self.bucket, Key=str(key), Body=data, **condition
+                )
+                return data
+            except self.client.exceptions.ClientError as e:
+                if self._error_code(e) not in CONDITIONAL_WRITE_ERRORS:
+                    raise
+            logger.debug(f"Conflicting update of {key}, retrying")
+            time.sleep(random.uniform(0, 0.05 * 2**attempt))
+        raise RuntimeError(
+            f"Failed to update {key} after {MAX_UPDATE_ATTEMPTS} attempts"
+        )
+
+    def get_version(self, key):
+        try:
+            response = self.client.head_object(Bucket=self.bucket, Key=str(key))
+        except self.client.exceptions.ClientError as e:
+            if self._error_code(e) in NOT_FOUND_ERRORS:
+                return None
+            raise
+        return response["ETag"]
+
+
+class InMemoryStorageBackend(StorageBackend):
+    """
+    Keeps objects in a dict, to measure FaaSr's own overhead apart from
+    object store latency or to simulate slow stores
+
+    Every request waits latency seconds, plus the size of the data sent or
+    received over bandwidth (bytes/s, None for unlimited). latency may also
+    be a function of (operation, size) returning seconds, e.g. to add jitter.
+    stats counts operations, bytes transferred and simulated wait time
+
+    Objects live in the process that created the backend; the RPC server
+    process starts with a copy of them
+    """
+
+    _shared = None
+
+    def __init__(self, latency=0.0, bandwidth=None):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.objects = {}
+        self._lock = threading.RLock()
+        self.reset_stats()
+
+    @classmethod
+    def from_payload(cls, faasr_payload, server_name):
+        # data stores share one namespace, as with the local backend
+        return cls.get_shared()
+
+    @classmethod
+    def get_shared(cls):
+        """
+        Returns the backend used for STORAGE_BACKEND "memory"
+        """
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    def set_shared(cls, backend):
+        """
+        Sets the backend used for STORAGE_BACKEND "memory"
+        (e.g. one with a latency model)
+        """
+        cls._shared = backend
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {"operations": Counter(), "bytes": 0, "simulated_time": 0.0}
+
+    def _simulate(self, operation, size=0):
+        """
+        Waits as long as the modeled store would take for a request
+        """
+        if callable(self.latency):
+            delay = self.latency(operation, size)
+        else:
+            delay = self.latency
+        if self.bandwidth:
+            delay += size / self.bandwidth
+        with self._lock:
+            self.stats["operations"][operation] += 1
+            self.stats["bytes"] += size
+            self.stats["simulated_time"] += delay
+        if delay > 0:
+            time.sleep(delay)
+
+    def _get(self, key):
+        with self._lock:
+            data = self.objects.get(str(key))
+        if data is None:
+            raise FileNotFoundError(f"Object not found in memory store: {key}")
+        return data
+
+    def put_file(self, local_path, key):
+        self.write_bytes(key, Path(local_path).read_bytes())
+
+    def get_file(self, key, local_path):
+        data = self.read_bytes(key)
+        local_path = Path(local_path)
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        local_path.write_bytes(data)
+
+    def delete(self, key):
+        self._simulate("delete")
+        with self._lock:
+            return self.objects.pop(str(key), None) is not None
+
+    def exists(self, key):
+        self._simulate("head")
+        with self._lock:
+            return str(key) in self.objects
+
+    def list(self, prefix=""):
+        self._simulate("list")
+        prefix = str(prefix)
+        with self._lock:
+            return sorted(key for key in self.objects if key.startswith(prefix))
+
+    def copy_from(self, source, source_key, key):
+        if source is not self:
+            return super().copy_from(source, source_key, key)
+        # server-side, so no data is transferred
+        self._simulate("copy")
+        data = self._get(source_key)
+        with self._lock:
+            self.objects[str(key)] = data
+
+    def move(self, source_key, target_key):
+        self.copy(source_key, target_key)
+        if str(source_key) != str(target_key):
+            self.delete(source_key)
+
+    def read_bytes(self, key):
+        data = self._get(key)
+        self._simulate("get", len(data))
+        return data
+
+    def write_bytes(self, key, data):
+        data = bytes(data)
+        self._simulate("put", len(data))
+        with self._lock:
+            self.objects[str(key)] = data
+
+    def append(self, key, data):
+        # a read and a rewrite, as on S3
+        try:
+            existing = self.read_bytes(key)
+        except FileNotFoundError:
+            existing = b""
+        self.write_bytes(key, existing + data)
+
+    def update(self, key, func):
+        with self._lock:
+            try:
+                data = self.read_bytes(key)
+            except FileNotFoundError:
+                data = None
+            data = func(data)
+            self.write_bytes(key, data)
+        return data
+
+
+# forked processes (the RPC server, fork server children) create their own
+# backends, since boto3 clients' connection pools can't be shared with the parent
+os.register_at_fork(after_in_child=S3StorageBackend._backends.clear)
+os.register_at_fork(after_in_child=LocalStorageBackend._backends.clear)
+
+STORAGE_BACKENDS = {
+    "s3": S3StorageBackend,
+    "local": LocalStorageBackend,
+    "memory": InMemoryStorageBackend,
+}
+
+
+def register_storage_backend(name, backend_cls):
+    """
+    Registers a StorageBackend subclass so it can be selected
+    with global_config.STORAGE_BACKEND
+    """
+    if not issubclass(backend_cls, StorageBackend):
+        raise TypeError("storage backend must be a subclass of StorageBackend")
+    if inspect.isabstract(backend_cls):
+        raise TypeError(f"storage backend {backend_cls.__name__} is abstract")
+    STORAGE_BACKENDS[name] = backend_cls
+
+
+def get_storage_backend(faasr_payload, server_name=""):
+    """
+    Returns the configured storage backend for a data store
+
+    Arguments:
+        faasr_payload: FaaSr payload dict
+        server_name: str -- name of data store (DefaultDataStore if empty)
+    Returns:
+        StorageBackend
+    """
+    if global_config.USE_LOCAL_FILE_SYSTEM:
+        name = "local"
+    else:
+        name = global_config.STORAGE_BACKEND or "s3"
+    if name not in STORAGE_BACKENDS:
+        logger.error(f"Unknown storage backend: {name}")
+        sys.exit(1)
+    if not server_name:
+        server_name = faasr_payload["DefaultDataStore"]
+    return STORAGE_BACKENDS[name].from_payload(faasr_payload, server_name)
+
+
+def get_logging_storage(faasr_payload):
+    """
+    Returns the storage backend for the logging data store
+    """
+    return get_storage_backend(faasr_payload, get_logging_server(faasr_payload))
@@ -0,0 +1,243 @@
+import contextvars
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from FaaSr_py.config.debug_config import global_config
+from FaaSr_py.helpers import serialization
+
+logger = logging.getLogger(__name__)
+
+# spans recorded in other processes (e.g. the RPC server, which is
+# terminated rather than shut down) are appended here as they end
+TRACE_SPOOL_DIR = "/tmp/faasr_traces"
+TRACE_FOLDER = "traces"
+
+_spans = []
+_spans_lock = threading.Lock()
+_current_span = contextvars.ContextVar("faasr_current_span", default=None)
+_spool_path = None
+# USE_TRACING, read once per process (spans are opened on every RPC request)
+_enabled = None
+
+
+def tracing_enabled():
+    """
+    Returns whether spans are recorded (USE_TRACING)
+    """
+    global _enabled
+    if _enabled is None:
+        _enabled = global_config.USE_TRACING
+    return _enabled
+
+
+def _record_span(span):
+    if _spool_path:
+        with _spans_lock, open(_spool_path, "a") as f:
+            f.write(serialization.dumps(span) + "\n")
+    else:
+        with _spans_lock:
+            _spans.append(span)
+
+
+@contextmanager
+def trace_span(name, **attributes):
+    """
+    Records the duration of the enclosed block as a span
+    (does nothing unless USE_TRACING is set)
+
+    Spans opened inside the block (including in threads started with
+    asyncio.to_thread) become its children
+
+    Arguments:
+        name: str -- span name
+        attributes: extra attributes to attach to the span
+    """
+    if not tracing_enabled():
+        yield None
+        return
+
+    span = {
+        "spanId": os.urandom(8).hex(),
+        "parentSpanId": _current_span.get() or "",
+        "name": name,
+        "startTimeUnixNano": time.time_ns(),
+        "attributes": attributes,
+        "status": {"code": 1},
+    }
+    token = _current_span.set(span["spanId"])
+    try:
+        yield span
+    except BaseException as e:
+        # sys.exit(0) is used to abort actions that shouldn't run (not an error)
+        if not (isinstance(e, SystemExit) and e.code in (0, None)):
+            span["status"] = {"code": 2, "message": str(e) or type(e).__name__}
+        raise
+    finally:
+        _current_span.reset(token)
+        span["endTimeUnixNano"] = time.time_ns()
+        _record_span(span)
+
+
+def start_trace_spool(faasr_payload):
+    """
+    Makes spans in the current process go to a spool file, so they can be
+    exported by the action's main process. Called in child processes
+    """
+    global _spool_path
+    os.makedirs(TRACE_SPOOL_DIR, exist_ok=True)
+    _spool_path = os.path.join(
+        TRACE_SPOOL_DIR, f"{_get_trace_name(faasr_payload)}-{os.getpid()}.jsonl"
+    )
+
+
+def _get_trace_name(faasr_payload):
+    name = f"{faasr_payload['InvocationID']}-{faasr_payload['FunctionInvoke']}"
+    if faasr_payload.get("FunctionRank"):
+        name += f".{faasr_payload['FunctionRank']}"
+    return name
+
+
+def get_trace_id(invocation_id):
+    """
+    Returns the OpenTelemetry trace ID for an invocation; every action in an
+    invocation shares it, so a DAG run forms a single trace
+
+    Returns:
+        str: 32 hex characters
+    """
+    try:
+        return uuid.UUID(str(invocation_id)).hex
+    except ValueError:
+        return hashlib.sha256(str(invocation_id).encode()).hexdigest()[:32]
+
+
+def _to_otel_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _to_otel_attributes(attributes):
+    return [
+        {"key": key, "value": _to_otel_value(value)}
+        for key, value in attributes.items()
+        if value is not None
+    ]
+
+
+def build_trace(faasr_payload, spans):
+    """
+    Converts spans to an OpenTelemetry (OTLP/JSON) trace document
+
+    Arguments:
+        faasr_payload: FaaSr payload instance
+        spans: list[dict] -- spans recorded with trace_span
+    Returns:
+        dict: OTLP/JSON ExportTraceServiceRequest
+    """
+    trace_id = get_trace_id(faasr_payload["InvocationID"])
+    resource = {
+        "service.name": "faasr",
+        "faasr.workflow_name": faasr_payload.get("WorkflowName"),
+        "faasr.invocation_id": faasr_payload["InvocationID"],
+        "faasr.invocation_timestamp": faasr_payload.get("InvocationTimestamp"),
+        "faasr.action": faasr_payload["FunctionInvoke"],
+        "faasr.rank": faasr_payload.get("FunctionRank"),
+    }
+
+    otel_spans = []
+    for span in sorted(spans, key=lambda s: s["startTimeUnixNano"]):
+        otel_span = {
+            "traceId": trace_id,
+            "spanId": span["spanId"],
+            "name": span["name"],
+            "kind": 1,
+            "startTimeUnixNano": str(span["startTimeUnixNano"]),
+            "endTimeUnixNano": str(span["endTimeUnixNano"]),
+            "attributes": _to_otel_attributes(span["attributes"]),
+            "status": span["status"],
+        }
+        if span["parentSpanId"]:
+            otel_span["parentSpanId"] = span["parentSpanId"]
+        otel_spans.append(otel_span)
+
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": _to_otel_attributes(resource)},
+                "scopeSpans": [
+                    {"scope": {"name": "FaaSr_py"}, "spans": otel_spans}
+                ],
+            }
+        ]
+    }
+
+
+def export_trace(faasr_payload):
+    """
+    Uploads the spans recorded for the current action to
+    {invocation folder}/traces/{FunctionInvoke}[.{FunctionRank}].json
+    on the logging data store, then clears them
+
+    Arguments:
+        faasr_payload: FaaSr payload instance
+    """
+    if not tracing_enabled():
+        return
+
+    with _spans_lock:
+        spans = list(_spans)
+        _spans.clear()
+
+    if not faasr_payload.get("InvocationID"):
+        logger.warning("No InvocationID -- not exporting trace")
+        return
+
+    from FaaSr_py.helpers.s3_helper_functions import get_invocation_folder
+    from FaaSr_py.helpers.storage_backends import get_logging_storage
+
+    # collect spans from child processes of this action
+    trace_name = _get_trace_name(faasr_payload)
+    spool_files = glob.glob(os.path.join(TRACE_SPOOL_DIR, f"{trace_name}-*.jsonl"))
+    for spool_file in spool_files:
+        with open(spool_file, "r") as f:
+            for line in f:
+                # the last line may be cut off (the RPC server is terminated)
+                try:
+                    spans.append(serialization.loads(line))
+                except Exception:
+                    continue
+
+    if not spans:
+        return
+
+    trace_file = f"{faasr_payload['FunctionInvoke']}.json"
+    if faasr_payload.get("FunctionRank"):
+        trace_file = (
+            f"{faasr_payload['FunctionInvoke']}.{faasr_payload['FunctionRank']}.json"
+        )
+
+    trace_key = f"{get_invocation_folder(faasr_payload)}/{TRACE_FOLDER}/{trace_file}"
+    # written to the storage backend directly, since faasr_put_file exits on
+    # errors and a trace must never fail the action
+    try:
+        trace = json.dumps(build_trace(faasr_payload, spans)).encode()
+        get_logging_storage(faasr_payload).write_bytes(trace_key, trace)
+    except (Exception, SystemExit) as e:
+        logger.warning(f"Failed to upload trace -- {e!r}")
+        return
+
+    for spool_file in spool_files:
+        os.remove(spool_file)
+    logger.debug(f"Uploaded trace {TRACE_FOLDER}/{trace_file}")
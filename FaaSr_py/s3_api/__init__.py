@@ -1,8 +1,10 @@
+from .copy_file import faasr_copy_file
 from .delete_file import faasr_delete_file
 from .get_file import faasr_get_file
 from .get_folder_list import faasr_get_folder_list
 from .get_s3_creds import faasr_get_s3_creds
 from .log import faasr_log
+from .move_file import faasr_move_file
 from .put_file import faasr_put_file
 
 __all__ = [
@@ -10,6 +12,8 @@ __all__ = [
     "faasr_put_file",
     "faasr_get_file",
     "faasr_delete_file",
+    "faasr_copy_file",
+    "faasr_move_file",
     "faasr_get_folder_list",
     "faasr_get_s3_creds",
 ]
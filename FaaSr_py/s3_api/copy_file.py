@@ -0,0 +1,52 @@
+import logging
+import sys
+
+from FaaSr_py.helpers.s3_helper_functions import clean_remote_path
+from FaaSr_py.helpers.storage_backends import get_storage_backend
+
+logger = logging.getLogger(__name__)
+
+
+def faasr_copy_file(
+    faasr_payload,
+    source_file,
+    target_file,
+    source_server="",
+    target_server="",
+    source_folder="",
+    target_folder="",
+):
+    """
+    Copies a file between folders or data stores without staging it locally
+
+    Within a store (or between stores on the same endpoint), the copy is done
+    server-side with CopyObject, or UploadPartCopy for large objects. Across
+    endpoints, the object is streamed through memory and uploaded in parallel parts
+
+    Arguments:
+        faasr_payload: FaaSr payload dict
+        source_file: str -- name of file to copy
+        target_file: str -- name of the copy
+        source_server: str -- name of S3 data store to copy from
+        target_server: str -- name of S3 data store to copy to
+        source_folder: str -- folder in S3 to copy from
+        target_folder: str -- folder in S3 to copy to
+    """
+    source_path = clean_remote_path(source_folder, source_file)
+    target_path = clean_remote_path(target_folder, target_file)
+
+    source = get_storage_backend(faasr_payload, source_server)
+    target = get_storage_backend(faasr_payload, target_server)
+    if source is target and source_path == target_path:
+        return
+
+    try:
+        target.copy_from(source, source_path, target_path)
+    except FileNotFoundError as e:
+        logger.error(e)
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"Error copying {source_path} to {target_path}: {e}")
+        sys.exit(1)
+
+    logger.debug(f"Copied {source_path} to {target_path}")
@@ -3,9 +3,7 @@ import re
 import sys
 from pathlib import Path
 
-import boto3
-
-from FaaSr_py.config.debug_config import global_config
+from FaaSr_py.helpers.storage_backends import get_storage_backend
 
 logger = logging.getLogger(__name__)
 
@@ -30,55 +28,14 @@ def faasr_delete_file(faasr_payload, remote_file, server_name="", remote_folder=
     # Name of file to delete from S3
     delete_file_path = Path(remote_folder) / remote_file
 
-    if global_config.USE_LOCAL_FILE_SYSTEM:
-        full_local_path = Path(global_config.LOCAL_FILE_SYSTEM_DIR) / delete_file_path
-
-        if not full_local_path.exists():
-            logger.warning(f"File not found in local bucket: {full_local_path}")
-            return
-
-        try:
-            full_local_path.unlink()
-            logger.info(f"Deleted file from local bucket: {full_local_path}")
-        except Exception as e:
-            logger.error(f"Failed to delete file locally: {full_local_path} — {e}")
-            raise
-    else:
-        # Get server name from payload if one isn't provided
-        if server_name == "":
-            server_name = faasr_payload["DefaultDataStore"]
-
-        # Ensure that the server is a valid data store
-        if server_name not in faasr_payload["DataStores"]:
-            logger.error(f"Invalid data server name: {server_name}")
-            sys.exit(1)
-
-        # Get the S3 data store to delete file from
-        target_s3 = faasr_payload["DataStores"][server_name]
-
-        if target_s3.get("Endpoint"):
-            s3_client = boto3.client(
-                "s3",
-                aws_access_key_id=target_s3["AccessKey"],
-                aws_secret_access_key=target_s3["SecretKey"],
-                region_name=target_s3["Region"],
-                endpoint_url=target_s3["Endpoint"],
-            )
-        else:
-            s3_client = boto3.client(
-                "s3",
-                aws_access_key_id=target_s3["AccessKey"],
-                aws_secret_access_key=target_s3["SecretKey"],
-                region_name=target_s3["Region"],
-            )
-
-        # Delete file from S3
-        try:
-            s3_client.delete_object(
-                Bucket=target_s3["Bucket"], Key=str(delete_file_path)
-            )
-        except s3_client.exceptions.ClientError as e:
-            logger.error(f"Error deleting {delete_file_path}: {e}")
-            sys.exit(1)
-
-        logger.debug(f"File {remote_file} deleted")
+    storage = get_storage_backend(faasr_payload, server_name)
+    try:
+        deleted = storage.delete(delete_file_path)
+    except Exception as e:
+        logger.error(f"Error deleting {delete_file_path}: {e}")
+        sys.exit(1)
+
+    if not deleted:
+        logger.warning(f"File not found: {delete_file_path}")
+        return
+    logger.debug(f"File {remote_file} deleted")
@@ -0,0 +1,67 @@
+import logging
+import sys
+
+from FaaSr_py.helpers.s3_helper_functions import clean_remote_path
+from FaaSr_py.helpers.storage_backends import get_storage_backend
+from FaaSr_py.s3_api.copy_file import faasr_copy_file
+from FaaSr_py.s3_api.delete_file import faasr_delete_file
+
+logger = logging.getLogger(__name__)
+
+
+def faasr_move_file(
+    faasr_payload,
+    source_file,
+    target_file,
+    source_server="",
+    target_server="",
+    source_folder="",
+    target_folder="",
+):
+    """
+    Moves (renames) a file between folders or data stores without staging it
+    locally -- a rename within the local file system, otherwise a server-side
+    copy (see faasr_copy_file) followed by a delete
+
+    Arguments:
+        faasr_payload: FaaSr payload dict
+        source_file: str -- name of file to move
+        target_file: str -- new name of the file
+        source_server: str -- name of S3 data store to move from
+        target_server: str -- name of S3 data store to move to
+        source_folder: str -- folder in S3 to move from
+        target_folder: str -- folder in S3 to move to
+    """
+    source_path = clean_remote_path(source_folder, source_file)
+    target_path = clean_remote_path(target_folder, target_file)
+
+    source = get_storage_backend(faasr_payload, source_server)
+    target = get_storage_backend(faasr_payload, target_server)
+    if source is target:
+        if source_path == target_path:
+            return
+        try:
+            source.move(source_path, target_path)
+        except FileNotFoundError as e:
+            logger.error(e)
+            sys.exit(1)
+        except Exception as e:
+            logger.error(f"Error moving {source_path} to {target_path}: {e}")
+            sys.exit(1)
+    else:
+        faasr_copy_file(
+            faasr_payload,
+            source_file,
+            target_file,
+            source_server=source_server,
+            target_server=target_server,
+            source_folder=source_folder,
+            target_folder=target_folder,
+        )
+        faasr_delete_file(
+            faasr_payload,
+            source_file,
+            server_name=source_server,
+            remote_folder=source_folder,
+        )
+    logger.debug(f"Moved {source_path} to {target_path}")
@@ -3,9 +3,7 @@ import re
 import sys
 from pathlib import Path
 
-import boto3
-
-from FaaSr_py.config.debug_config import global_config
+from FaaSr_py.helpers.storage_backends import get_storage_backend
 
 logger = logging.getLogger(__name__)
 
@@ -59,48 +57,11 @@ def faasr_put_file(
     if not local_path.exists():
         raise FileNotFoundError(f"Local file not found: {local_path}")
 
-    if global_config.USE_LOCAL_FILE_SYSTEM:
-        path_to_put = Path(global_config.LOCAL_FILE_SYSTEM_DIR) / remote_path
-        path_to_put.parent.mkdir(parents=True, exist_ok=True)
-        with open(local_path, "r") as rf:
-            with open(path_to_put, "w") as wf:
-                wf.write(rf.read())
-    else:
-        # Get the server name from payload if it is not provided
-        if server_name == "":
-            server_name = faasr_payload["DefaultDataStore"]
-
-        # Ensure that the server name is valid
-        if server_name not in faasr_payload["DataStores"]:
-            logger.error(f"Invalid data server name: {server_name}")
-            sys.exit(1)
-
-        # Get the S3 server to put the file in
-        target_s3 = faasr_payload["DataStores"][server_name]
-
-        if target_s3.get("Endpoint"):
-            s3_client = boto3.client(
-                "s3",
-                aws_access_key_id=target_s3["AccessKey"],
-                aws_secret_access_key=target_s3["SecretKey"],
-                region_name=target_s3["Region"],
-                endpoint_url=target_s3["Endpoint"],
-            )
-        else:
-            s3_client = boto3.client(
-                "s3",
-                aws_access_key_id=target_s3["AccessKey"],
-                aws_secret_access_key=target_s3["SecretKey"],
-                region_name=target_s3["Region"],
-            )
-
-        try:
-            with open(local_path, "rb") as put_data:
-                s3_client.put_object(
-                    Bucket=target_s3["Bucket"], Body=put_data, Key=str(remote_path)
-                )
-        except s3_client.exceptions.ClientError as e:
-            logger.error(f"Error putting file in S3: {e}")
-            sys.exit(1)
+    storage = get_storage_backend(faasr_payload, server_name)
+    try:
+        storage.put_file(local_path, remote_path)
+    except Exception as e:
+        logger.error(f"Error putting file in S3: {e}")
+        sys.exit(1)
 
-        logger.debug(f"File {local_file} successfully uploaded to {remote_path}")
+    logger.debug(f"File {local_file} successfully uploaded to {remote_path}")
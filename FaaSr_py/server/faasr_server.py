@@ -3,28 +3,74 @@ import sys
 
 import requests
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException
+from fastapi import Request as HTTPRequest
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
 from pydantic import BaseModel
 
 from FaaSr_py.config.debug_config import global_config
+from FaaSr_py.helpers import serialization
+from FaaSr_py.helpers.kv_store import KVStore
 from FaaSr_py.helpers.rank import faasr_rank
 from FaaSr_py.helpers.s3_helper_functions import flush_s3_log
-from FaaSr_py.s3_api import (faasr_delete_file, faasr_get_file,
-                             faasr_get_folder_list, faasr_get_s3_creds,
-                             faasr_log, faasr_put_file)
+from FaaSr_py.helpers.tracing import (start_trace_spool, trace_span,
+                                      tracing_enabled)
+from FaaSr_py.s3_api import (faasr_copy_file, faasr_delete_file,
+                             faasr_get_file, faasr_get_folder_list,
+                             faasr_get_s3_creds, faasr_log, faasr_move_file,
+                             faasr_put_file)
 
 logger = logging.getLogger(__name__)
-faasr_api = FastAPI()
 valid_functions = {
     "faasr_get_file",
     "faasr_put_file",
     "faasr_delete_file",
+    "faasr_copy_file",
+    "faasr_move_file",
     "faasr_get_folder_list",
     "faasr_log",
     "faasr_rank",
+    "faasr_kv_put",
+    "faasr_kv_get",
+    "faasr_kv_incr",
 }
 
 
+class FaaSrJSONResponse(JSONResponse):
+    """
+    JSON response encoded with the serialization backend (orjson/msgspec if installed)
+    """
+
+    def render(self, content):
+        return serialization.dumps_bytes(content)
+
+
+class FaaSrHTTPRequest(HTTPRequest):
+    """
+    HTTP request whose JSON body is decoded with the serialization backend
+    """
+
+    async def json(self):
+        if not hasattr(self, "_json"):
+            self._json = serialization.loads(await self.body())
+        return self._json
+
+
+class FaaSrRoute(APIRoute):
+    """
+    Route that parses request models from FaaSrHTTPRequest bodies
+    """
+
+    def get_route_handler(self):
+        route_handler = super().get_route_handler()
+
+        async def faasr_route_handler(request):
+            return await route_handler(FaaSrHTTPRequest(request.scope, request.receive))
+
+        return faasr_route_handler
+
+
 class Request(BaseModel):
     ProcedureID: str
     Arguments: dict | None = None
@@ -51,99 +97,144 @@ class Exit(BaseModel):
     Message: str | None = None
 
 
-def register_request_handler(faasr_payload):
+def register_request_handler(faasr_api, faasr_payload, action_token=None):
     """ "
     Setup FastAPI request handlers for FaaSr functions
 
     Arguments:
+        faasr_api: FastAPI app to add the handlers to
         faasr_payload: FaaSr payload dict
+        action_token: str -- token of the action this server belongs to
     """
     return_val = None
     message = None
     error = False
+    kv_store = KVStore(faasr_payload)
+
+    def check_action_token(request_token):
+        # a function left over from an earlier action on this port (or any
+        # request without the token) must not set this action's result
+        if action_token and request_token != action_token:
+            raise HTTPException(status_code=403, detail="Invalid action token")
+
+    def flush_kv_store():
+        # buffered key-value puts must be written before the action ends
+        nonlocal error, message
+        try:
+            kv_store.flush()
+        except Exception as e:
+            err_msg = f"ERROR -- failed to write key-value store -- {e}"
+            logger.error(err_msg)
+            error = True
+            message = err_msg
 
     @faasr_api.post("/faasr-action")
-    def faasr_request_handler(request: Request):
+    def faasr_request_handler(
+        request: Request, x_faasr_action_token: str | None = Header(default=None)
+    ):
         """
         Handler for FaaSr function requests
         """
         nonlocal error
+        check_action_token(x_faasr_action_token)
         logger.info(f"Processing request: {request.ProcedureID}")
 
         args = request.Arguments or {}
         return_obj = Response(Success=True, Data={})
-        try:
-            match request.ProcedureID:
-                case "faasr_log":
-                    faasr_log(faasr_payload=faasr_payload, **args)
-                case "faasr_put_file":
-                    faasr_put_file(faasr_payload=faasr_payload, **args)
-                case "faasr_get_file":
-                    faasr_get_file(faasr_payload=faasr_payload, **args)
-                case "faasr_delete_file":
-                    faasr_delete_file(faasr_payload=faasr_payload, **args)
-                case "faasr_get_folder_list":
-                    return_obj.Data["folder_list"] = faasr_get_folder_list(
-                        faasr_payload=faasr_payload, **args
-                    )
-                case "faasr_rank":
-                    return_obj.Data = faasr_rank(faasr_payload=faasr_payload)
-                case "faasr_get_s3_creds":
-                    return_obj.Data["s3_creds"] = faasr_get_s3_creds(
-                        faasr_payload=faasr_payload, **args
-                    )
-                case _:
-                    logging.error(
-                        f"{request.ProcedureID} is not a valid FaaSr function call"
-                    )
-                    error = True
-                    sys.exit(1)
-        except Exception as e:
-            err_msg = f"ERROR -- failed to invoke {request.ProcedureID} -- {e}"
-            logger.error(err_msg)
-            error = True
-            sys.exit(1)
+        with trace_span("rpc", procedure=request.ProcedureID):
+            try:
+                match request.ProcedureID:
+                    case "faasr_log":
+                        faasr_log(faasr_payload=faasr_payload, **args)
+                    case "faasr_put_file":
+                        faasr_put_file(faasr_payload=faasr_payload, **args)
+                    case "faasr_get_file":
+                        faasr_get_file(faasr_payload=faasr_payload, **args)
+                    case "faasr_delete_file":
+                        faasr_delete_file(faasr_payload=faasr_payload, **args)
+                    case "faasr_copy_file":
+                        faasr_copy_file(faasr_payload=faasr_payload, **args)
+                    case "faasr_move_file":
+                        faasr_move_file(faasr_payload=faasr_payload, **args)
+                    case "faasr_get_folder_list":
+                        return_obj.Data["folder_list"] = faasr_get_folder_list(
+                            faasr_payload=faasr_payload, **args
+                        )
+                    case "faasr_rank":
+                        return_obj.Data = faasr_rank(faasr_payload=faasr_payload)
+                    case "faasr_get_s3_creds":
+                        return_obj.Data["s3_creds"] = faasr_get_s3_creds(
+                            faasr_payload=faasr_payload, **args
+                        )
+                    case "faasr_kv_put":
+                        kv_store.put(**args)
+                    case "faasr_kv_get":
+                        return_obj.Data["value"] = kv_store.get(**args)
+                    case "faasr_kv_incr":
+                        return_obj.Data["value"] = kv_store.incr(**args)
+                    case _:
+                        logging.error(
+                            f"{request.ProcedureID} is not a valid FaaSr function call"
+                        )
+                        error = True
+                        sys.exit(1)
+            except Exception as e:
+                err_msg = f"ERROR -- failed to invoke {request.ProcedureID} -- {e}"
+                logger.error(err_msg)
+                error = True
+                sys.exit(1)
         # flush log after every function, since we don't know when user function will end
         flush_s3_log()
         return return_obj
 
     @faasr_api.post("/faasr-return")
-    def faasr_return_handler(return_obj: Return):
+    def faasr_return_handler(
+        return_obj: Return, x_faasr_action_token: str | None = Header(default=None)
+    ):
         """
         Handler for FaaSr function return values
         """
         nonlocal return_val
+        check_action_token(x_faasr_action_token)
         return_val = return_obj.FunctionResult
+        flush_kv_store()
         flush_s3_log()
         return Response(Success=True)
 
     @faasr_api.post("/faasr-exit")
-    def faasr_get_exit_handler(exit_obj: Exit):
+    def faasr_get_exit_handler(
+        exit_obj: Exit, x_faasr_action_token: str | None = Header(default=None)
+    ):
         """
         Handler for FaaSr function exit values
         """
         nonlocal error, message
+        check_action_token(x_faasr_action_token)
         if exit_obj.Error:
             error = True
             message = exit_obj.Message
+        flush_kv_store()
         flush_s3_log()
         return Response(Success=True)
 
     @faasr_api.get("/faasr-get-return")
-    def faasr_get_return_handler():
+    def faasr_get_return_handler(
+        x_faasr_action_token: str | None = Header(default=None),
+    ):
         """
         Handler to get the return value from the FaaSr function
         """
+        check_action_token(x_faasr_action_token)
+        flush_kv_store()
         flush_s3_log()
         return Result(FunctionResult=return_val, Error=error, Message=message)
 
-
-@faasr_api.get("/faasr-echo")
-def faasr_echo(message: str):
-    """
-    Echo to poll server
-    """
-    return {"message": message}
+    @faasr_api.get("/faasr-echo")
+    def faasr_echo(message: str):
+        """
+        Echo to poll server
+        """
+        return {"message": message}
 
 
 def wait_for_server_start(port):
@@ -165,18 +256,29 @@ def wait_for_server_start(port):
 
 
 # starts a server listening on localhost
-def run_server(faasr_payload, port, start_time):
+def run_server(faasr_payload, port, start_time, sock=None, action_token=None):
     """
     Starts a FastAPI server to handle FaaSr requests
 
+    Each action gets its own server (and app), so the return value
+    and exit status are tracked per action
+
     Arguments:
         faasr_payload: FaaSr payload dict
         port: int -- port to run the server on
+        sock: socket.socket -- socket already bound to port (optional)
+        action_token: str -- token the action's client stubs send
     """
     # since server runs as a seperate process, we need to re-add the s3 logger handler
     global_config.add_s3_log_handler(faasr_payload, start_time)
 
-    register_request_handler(faasr_payload)
+    # RPC spans are exported by the action process (this one gets terminated)
+    if tracing_enabled():
+        start_trace_spool(faasr_payload)
+
+    faasr_api = FastAPI(default_response_class=FaaSrJSONResponse)
+    faasr_api.router.route_class = FaaSrRoute
+    register_request_handler(faasr_api, faasr_payload, action_token)
     config = uvicorn.Config(faasr_api, host="127.0.0.1", port=port)
     server = uvicorn.Server(config)
-    server.run()
+    server.run(sockets=[sock] if sock else None)
@@ -0,0 +1,100 @@
+import argparse
+import datetime
+import multiprocessing
+import sys
+
+# the action process has imported the entry script before it forks
+# a user function, so it isn't part of the cold start
+import FaaSr_py.client.py_user_func_entry  # noqa: F401
+from FaaSr_py.helpers.fork_server import get_fork_server_context, import_modules
+
+NUM_ACTIONS = 10
+DEFAULT_MODULES = ["decimal", "email.mime.multipart", "asyncio"]
+DEFAULT_EXTRA_MODULES = ["http.server", "unittest"]
+
+
+def run_actions(ctx, modules, num_actions):
+    """
+    Starts num_actions processes that each import modules
+
+    Returns:
+        float: average seconds per action
+    """
+    start_time = datetime.datetime.now()
+    for _ in range(num_actions):
+        proc = ctx.Process(target=import_modules, args=(modules,))
+        proc.start()
+        proc.join()
+    total_time = (datetime.datetime.now() - start_time).total_seconds()
+    return total_time / num_actions
+
+
+def benchmark_action(func_name, modules, num_actions):
+    """
+    Times actions that import modules, forked as Executor forks them
+    without (cold) and with (warm) the fork server
+
+    Returns:
+        dict: cold, fork server startup and warm seconds per action
+    """
+    # cold: the action process forks, and the user function imports its
+    # packages (as multiprocessing.Process does on Linux)
+    cold_avg = run_actions(multiprocessing.get_context("fork"), modules, num_actions)
+
+    # warm: actions fork from a server that has already imported the packages;
+    # the first action starts the fork server (or restarts it, when the
+    # preload set grows)
+    payload = {"PackageImports": {func_name: modules}}
+    warm_ctx = get_fork_server_context(payload, func_name)
+    startup_avg = run_actions(warm_ctx, modules, 1)
+    warm_avg = run_actions(warm_ctx, modules, num_actions)
+
+    return {"cold": cold_avg, "startup": startup_avg, "warm": warm_avg}
+
+
+def print_results(name, modules, results):
+    print(f"\n{name}: {modules}")
+    print(f"Cold start (fork) average: {results['cold']:.3f} seconds")
+    print(f"Fork server startup: {results['startup']:.3f} seconds")
+    print(f"Warm start (forkserver) average: {results['warm']:.3f} seconds")
+    if results["warm"] > 0:
+        print(f"Speedup: {results['cold'] / results['warm']:.2f}x")
+
+
+def benchmark_fork_server(modules, extra_modules, num_actions):
+    # modules already imported here would be inherited by forked actions
+    loaded = [module for module in modules + extra_modules if module in sys.modules]
+    if loaded:
+        print(f"Warning: already imported, so not measured: {loaded}")
+
+    first = benchmark_action("first", modules, num_actions)
+    # a second action on the same (warm) container that needs more modules
+    second_modules = modules + extra_modules
+    second = benchmark_action("second", second_modules, num_actions)
+
+    print("\n--- Benchmark Results ---")
+    print(f"Actions per mode: {num_actions}")
+    print_results("First action", modules, first)
+    print_results("Second action (fork server restarted)", second_modules, second)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare cold and warm (fork server) start of Python actions"
+    )
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument(
+        "-e",
+        "--extra-modules",
+        nargs="+",
+        default=DEFAULT_EXTRA_MODULES,
+        help="modules that only a second action imports",
+    )
+    parser.add_argument("-n", "--num-actions", type=int, default=NUM_ACTIONS)
+    args = parser.parse_args()
+
+    benchmark_fork_server(args.modules, args.extra_modules, args.num_actions)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+
+NUM_RUNS = 10
+NUM_SLOWEST = 10
+# statements an action runs at startup: the bare package, the user function
+# entry point, and the engine used by the entry scripts
+DEFAULT_STATEMENTS = [
+    "import FaaSr_py",
+    "import FaaSr_py.client.py_user_func_entry",
+    "from FaaSr_py import FaaSrPayload, Scheduler, Executor",
+]
+
+# import time:     self [us] | cumulative | imported package
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure_import_time(statement):
+    """
+    Runs statement in a fresh interpreter with -X importtime
+
+    Returns:
+        (float, dict): total import time in ms,
+        module name -> cumulative import time in ms
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"'{statement}' failed:\n{proc.stderr}")
+
+    total = 0
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, module = match.groups()
+        # anything imported before site finishes is interpreter startup,
+        # not the statement
+        if module == "site":
+            total = 0
+            modules = {}
+            continue
+        modules[module] = int(cumulative) / 1000
+        # top-level imports are indented by one space
+        if len(indent) == 1:
+            total += int(cumulative) / 1000
+    return total, modules
+
+
+def benchmark_statement(statement, num_runs, num_slowest):
+    totals = []
+    slowest = {}
+    for _ in range(num_runs):
+        total, modules = measure_import_time(statement)
+        totals.append(total)
+        for module, ms in modules.items():
+            slowest.setdefault(module, []).append(ms)
+
+    print(f"\n{statement}")
+    print(
+        f"  total import time: median {statistics.median(totals):.1f} ms, "
+        f"min {min(totals):.1f} ms, max {max(totals):.1f} ms ({num_runs} runs)"
+    )
+    medians = {module: statistics.median(ms) for module, ms in slowest.items()}
+    third_party = [
+        module
+        for module in medians
+        if "." not in module
+        and not module.startswith(("_", "FaaSr_py"))
+        and module not in sys.stdlib_module_names
+    ]
+    print(f"  third-party packages imported: {', '.join(sorted(third_party))}")
+    print("  slowest imports (cumulative ms):")
+    for module in sorted(medians, key=medians.get, reverse=True)[:num_slowest]:
+        print(f"    {medians[module]:>8.1f}  {module}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure FaaSr_py startup with python -X importtime"
+    )
+    parser.add_argument("statements", nargs="*", default=DEFAULT_STATEMENTS)
+    parser.add_argument("-n", "--num-runs", type=int, default=NUM_RUNS)
+    parser.add_argument("--slowest", type=int, default=NUM_SLOWEST)
+    args = parser.parse_args()
+
+    print("--- Import Time Benchmark ---")
+    print(f"Python: {sys.executable}")
+    for statement in args.statements:
+        benchmark_statement(statement, args.num_runs, args.slowest)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+
+from FaaSr_py.helpers.graph_functions import build_adjacency_graph
+from FaaSr_py.helpers.tracing import TRACE_FOLDER
+
+# span names recorded by FaaSr_py.helpers.tracing, grouped by what they measure
+PHASE_CATEGORIES = {
+    "payload_fetch": "scheduling",
+    "schema_validate": "scheduling",
+    "check_dag": "scheduling",
+    "s3_check": "scheduling",
+    "lock_acquire": "locking",
+    "memo_lookup": "scheduling",
+    "dependency_install": "dependencies",
+    "server_start": "runtime",
+    "user_function": "user_code",
+    "memo_save": "scheduling",
+    "done_write": "scheduling",
+    "trigger": "scheduling",
+}
+
+
+def replace_secrets(payload, secrets):
+    """
+    Replaces filler secrets in the DataStores of a workflow with credentials
+    """
+    for server in payload.get("DataStores", {}).values():
+        for key, value in server.items():
+            if isinstance(value, str) and value in secrets:
+                server[key] = secrets[value]
+
+
+def collect_local(workflow, invocation_id, local_dir):
+    """
+    Collects the files of an invocation from the local file system mode
+
+    Returns:
+        dict: relative path -> (bytes, modified time in seconds)
+    """
+    workflow_dir = Path(local_dir) / workflow["FaaSrLog"] / workflow["WorkflowName"]
+    files = {}
+    for invocation_dir in workflow_dir.glob(f"*/{invocation_id}"):
+        for path in invocation_dir.rglob("*"):
+            if path.is_file():
+                rel_path = str(path.relative_to(invocation_dir))
+                files[rel_path] = (path.read_bytes(), path.stat().st_mtime)
+    return files
+
+
+def collect_s3(workflow, invocation_id):
+    """
+    Collects the files of an invocation from the logging data store
+
+    Returns:
+        dict: relative path -> (bytes, modified time in seconds)
+    """
+    from FaaSr_py.helpers.s3_helper_functions import (
+        get_default_log_boto3_client, get_logging_server)
+
+    workflow.setdefault("LoggingDataStore", None)
+    bucket = workflow["DataStores"][get_logging_server(workflow)]["Bucket"]
+    s3_client = get_default_log_boto3_client(workflow)
+
+    prefix = f"{workflow['FaaSrLog']}/{workflow['WorkflowName']}/"
+    marker = f"/{invocation_id}/"
+    files = {}
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            key = obj["Key"]
+            if marker not in key:
+                continue
+            rel_path = key.split(marker, 1)[1]
+            body = s3_client.get_object(Bucket=bucket, Key=key)["Body"].read()
+            files[rel_path] = (body, obj["LastModified"].timestamp())
+    return files
+
+
+def _get_attribute(span, key):
+    for attribute in span.get("attributes", []):
+        if attribute["key"] == key:
+            return next(iter(attribute["value"].values()))
+    return None
+
+
+def parse_traces(files):
+    """
+    Parses trace files into per-action timings
+
+    Returns:
+        dict: action instance (e.g. "A" or "A.2") -> timing info
+    """
+    actions = {}
+    for rel_path, (body, _) in files.items():
+        if not rel_path.startswith(f"{TRACE_FOLDER}/"):
+            continue
+        instance = Path(rel_path).name.removesuffix(".json")
+        trace = json.loads(body)
+        spans = [
+            span
+            for resource_spans in trace["resourceSpans"]
+            for scope_spans in resource_spans["scopeSpans"]
+            for span in scope_spans["spans"]
+        ]
+        if not spans:
+            continue
+
+        phases = {}
+        triggers = []
+        for span in spans:
+            start = int(span["startTimeUnixNano"]) / 1e9
+            end = int(span["endTimeUnixNano"]) / 1e9
+            name = span["name"]
+            if name == "rpc":
+                name = f"rpc:{_get_attribute(span, 'procedure')}"
+            phases[name] = phases.get(name, 0.0) + (end - start)
+            if span["name"] == "trigger":
+                target = _get_attribute(span, "target")
+                rank = _get_attribute(span, "rank")
+                if rank is not None:
+                    target = f"{target}.{rank}"
+                triggers.append({"target": target, "start": start, "end": end})
+
+        actions[instance] = {
+            "start": min(int(s["startTimeUnixNano"]) for s in spans) / 1e9,
+            "end": max(int(s["endTimeUnixNano"]) for s in spans) / 1e9,
+            "phases": phases,
+            "triggers": triggers,
+            "errors": [
+                s["name"] for s in spans if s.get("status", {}).get("code") == 2
+            ],
+        }
+    return actions
+
+
+def parse_completions(files):
+    """
+    Returns the time each action's .done file was written
+    """
+    completions = {}
+    for rel_path, (_, mtime) in files.items():
+        match = re.fullmatch(r"function_completions/(.+)\.done", rel_path)
+        if match:
+            completions[match.group(1)] = mtime
+    return completions
+
+
+def parse_logs(files):
+    """
+    Returns the line and error count of each action's log
+    """
+    logs = {}
+    for rel_path, (body, _) in files.items():
+        match = re.fullmatch(r"([^/]+?)(?:\((\d+)\))?\.txt", rel_path)
+        if not match:
+            continue
+        instance = match.group(1)
+        if match.group(2):
+            instance += f".{match.group(2)}"
+        lines = body.decode("utf-8", errors="replace").splitlines()
+        logs[instance] = {
+            "lines": len(lines),
+            "errors": sum("[ERROR]" in line or '"ERROR"' in line for line in lines),
+        }
+    return logs
+
+
+def get_instances(workflow):
+    """
+    Expands the DAG so each rank of a ranked action is its own node
+
+    Returns:
+        dict: action instance -> list of predecessor instances
+    """
+    adj_graph, ranks = build_adjacency_graph(workflow)
+
+    def expand(action):
+        if ranks.get(action, 0) > 1:
+            return [f"{action}.{rank}" for rank in range(1, ranks[action] + 1)]
+        return [action]
+
+    predecessors = {
+        instance: [] for action in workflow["ActionList"] for instance in expand(action)
+    }
+    for action, successors in adj_graph.items():
+        for successor in successors:
+            for instance in expand(successor):
+                predecessors[instance].extend(expand(action))
+    return predecessors
+
+
+def analyze(workflow, actions, completions, logs):
+    """
+    Computes the critical path, trigger delays and fan-out/fan-in skew
+
+    Returns:
+        dict: machine-readable summary (times in seconds, relative to the
+        start of the first action)
+    """
+    predecessors = get_instances(workflow)
+    ran = {name: info for name, info in actions.items() if name in predecessors}
+    if not ran:
+        raise RuntimeError("no traces found for this invocation (is USE_TRACING set?)")
+
+    origin = min(info["start"] for info in ran.values())
+
+    def rel(t):
+        return round(t - origin, 4)
+
+    # trigger delay: from the trigger call in the predecessor to the first
+    # span of the successor (includes platform queueing and cold start)
+    edges = []
+    for instance, preds in predecessors.items():
+        if instance not in ran:
+            continue
+        for pred in preds:
+            if pred not in ran:
+                continue
+            trigger_end = ran[pred]["end"]
+            for trigger in ran[pred]["triggers"]:
+                # packed SLURM triggers list all of their targets
+                targets = trigger["target"].split(",")
+                if instance in targets or instance.split(".")[0] in targets:
+                    trigger_end = trigger["end"]
+            edges.append(
+                {
+                    "from": pred,
+                    "to": instance,
+                    "trigger_delay": round(ran[instance]["start"] - trigger_end, 4),
+                }
+            )
+
+    # fan-out skew: spread of successor start times
+    fan_out = {}
+    for pred in ran:
+        starts = [ran[e["to"]]["start"] for e in edges if e["from"] == pred]
+        if len(starts) > 1:
+            fan_out[pred] = round(max(starts) - min(starts), 4)
+
+    # fan-in skew: how long the join waited between its first and last predecessor
+    fan_in = {}
+    for instance, preds in predecessors.items():
+        ends = [ran[p]["end"] for p in preds if p in ran]
+        if len(ends) > 1:
+            fan_in[instance] = round(max(ends) - min(ends), 4)
+
+    # critical path: walk back from the last action to finish through the
+    # predecessor that finished last (the one that gated each start)
+    path = []
+    current = max(ran, key=lambda name: ran[name]["end"])
+    while current:
+        path.append(current)
+        preds = [p for p in predecessors[current] if p in ran]
+        current = max(preds, key=lambda p: ran[p]["end"]) if preds else None
+    path.reverse()
+
+    breakdown = {}
+    critical_path = []
+    for i, instance in enumerate(path):
+        info = ran[instance]
+        wait = 0.0
+        if i > 0:
+            wait = max(info["start"] - ran[path[i - 1]]["end"], 0.0)
+            breakdown["trigger_delay"] = breakdown.get("trigger_delay", 0.0) + wait
+
+        accounted = 0.0
+        for phase, secs in info["phases"].items():
+            if phase in PHASE_CATEGORIES:
+                category = PHASE_CATEGORIES[phase]
+                breakdown[category] = breakdown.get(category, 0.0) + secs
+                accounted += secs
+        duration = info["end"] - info["start"]
+        breakdown["other"] = breakdown.get("other", 0.0) + max(
+            duration - accounted, 0.0
+        )
+
+        critical_path.append(
+            {
+                "action": instance,
+                "start": rel(info["start"]),
+                "end": rel(info["end"]),
+                "duration": round(duration, 4),
+                "wait": round(wait, 4),
+            }
+        )
+
+    breakdown = {k: round(v, 4) for k, v in breakdown.items()}
+    return {
+        "makespan": rel(max(info["end"] for info in ran.values())),
+        "critical_path": critical_path,
+        "breakdown": breakdown,
+        "bottleneck": max(breakdown, key=breakdown.get),
+        "edges": edges,
+        "fan_out_skew": fan_out,
+        "fan_in_skew": fan_in,
+        "actions": {
+            name: {
+                "start": rel(info["start"]),
+                "end": rel(info["end"]),
+                "done": rel(completions[name]) if name in completions else None,
+                "phases": {k: round(v, 4) for k, v in info["phases"].items()},
+                "errors": info["errors"],
+                "log": logs.get(name),
+            }
+            for name, info in sorted(ran.items(), key=lambda item: item[1]["start"])
+        },
+        "missing_traces": sorted(set(predecessors) - set(ran)),
+    }
+
+
+def print_report(summary):
+    print("\n--- Invocation Report ---")
+    print(f"Makespan: {summary['makespan']:.3f} seconds")
+
+    print("\nCritical path:")
+    for step in summary["critical_path"]:
+        print(
+            f"  {step['action']:<30} start {step['start']:>8.3f}s  "
+            f"duration {step['duration']:>8.3f}s  waited {step['wait']:>7.3f}s"
+        )
+
+    print("\nCritical path breakdown:")
+    total = sum(summary["breakdown"].values()) or 1
+    for category, secs in sorted(
+        summary["breakdown"].items(), key=lambda item: -item[1]
+    ):
+        print(f"  {category:<15} {secs:>8.3f}s  ({100 * secs / total:.1f}%)")
+    print(f"Bottleneck: {summary['bottleneck']}")
+
+    if summary["edges"]:
+        print("\nTrigger delays:")
+        for edge in summary["edges"]:
+            print(f"  {edge['from']} -> {edge['to']}: {edge['trigger_delay']:.3f}s")
+    if summary["fan_out_skew"]:
+        print("\nFan-out skew (spread of successor starts):")
+        for action, skew in summary["fan_out_skew"].items():
+            print(f"  {action}: {skew:.3f}s")
+    if summary["fan_in_skew"]:
+        print("\nFan-in skew (spread of predecessor finishes):")
+        for action, skew in summary["fan_in_skew"].items():
+            print(f"  {action}: {skew:.3f}s")
+    if summary["missing_traces"]:
+        print(f"\nNo trace for: {', '.join(summary['missing_traces'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report the critical path and per-stage latency of an invocation"
+    )
+    parser.add_argument("workflow", help="path to the workflow JSON")
+    parser.add_argument("invocation_id")
+    parser.add_argument(
+        "--local-dir", help="LOCAL_FILE_SYSTEM_DIR, if USE_LOCAL_FILE_SYSTEM was used"
+    )
+    parser.add_argument("--secrets", help="JSON file with data store credentials")
+    parser.add_argument("--output", help="write the summary JSON to this file")
+    args = parser.parse_args()
+
+    with open(args.workflow, "r") as f:
+        workflow = json.load(f)
+    if args.secrets:
+        with open(args.secrets, "r") as f:
+            replace_secrets(workflow, json.load(f))
+
+    if args.local_dir:
+        files = collect_local(workflow, args.invocation_id, args.local_dir)
+    else:
+        files = collect_s3(workflow, args.invocation_id)
+    if not files:
+        print(f"No files found for invocation {args.invocation_id}")
+        sys.exit(1)
+
+    summary = analyze(
+        workflow, parse_traces(files), parse_completions(files), parse_logs(files)
+    )
+    summary["invocation_id"] = args.invocation_id
+
+    print_report(summary)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=4)
+        print(f"\nSummary written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import logging
+import multiprocessing
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from FaaSr_py import Executor, S3LogSender, Scheduler, global_config
+from FaaSr_py.helpers.graph_functions import build_adjacency_graph
+from FaaSr_py.helpers.s3_helper_functions import flush_s3_log
+from FaaSr_py.helpers.tracing import export_trace
+
+logger = logging.getLogger("FaaSr_py")
+
+_worker_index = None
+
+
+def _init_worker(worker_counter):
+    """
+    Numbers the worker processes (shown in the output of each action)
+    """
+    global _worker_index
+    with worker_counter.get_lock():
+        _worker_index = worker_counter.value
+        worker_counter.value += 1
+
+
+def _get_instance_name(action, rank):
+    return f"{action}.{rank}" if rank else action
+
+
+def _run_action(faasr_payload, action, rank, start_time):
+    """
+    Runs a single action (or one rank of a ranked action) in a worker
+
+    Returns:
+        (status, result): status is "done" or "aborted"
+    """
+    faasr_payload["FunctionInvoke"] = action
+    if rank:
+        faasr_payload["FunctionRank"] = rank
+        faasr_payload.log_file = f"{action}({rank}).txt"
+    else:
+        faasr_payload.remove("FunctionRank")
+        faasr_payload.log_file = f"{action}.txt"
+
+    log_sender = S3LogSender.get_log_sender()
+    if log_sender:
+        log_sender.faasr_payload = faasr_payload
+
+    name = _get_instance_name(action, rank)
+    print(f"\n{f' {name} (worker {_worker_index}) '.center(80, '-')}\n", flush=True)
+
+    try:
+        if not global_config.SKIP_WF_VALIDATE:
+            faasr_payload.start()
+        function_result = Executor(faasr_payload).run_func(action, start_time)
+    except SystemExit as e:
+        # sys.exit(0) means the action aborted itself (e.g. not the last trigger)
+        if e.code in (0, None):
+            return "aborted", None
+        raise RuntimeError(f"{name} exited with code {e.code}") from None
+    finally:
+        export_trace(faasr_payload)
+        if log_sender:
+            flush_s3_log()
+
+    print(f"FINISHED EXECUTION OF {name} -- RESULT: {function_result}", flush=True)
+    return "done", function_result
+
+
+def _expand(action, ranks):
+    """Returns the (action, rank) instances of an action"""
+    if ranks.get(action, 0) > 1:
+        return [(action, rank) for rank in range(1, ranks[action] + 1)]
+    return [(action, None)]
+
+
+def run_workflow(faasr_payload, start_time, max_workers=None):
+    """
+    Runs every action of a workflow locally. Actions run on a process pool
+    as soon as all of their predecessors have finished, so independent
+    branches and the ranks of a ranked action run concurrently
+
+    Arguments:
+        faasr_payload: FaaSrPayload instance
+        start_time: datetime -- start of the run (for log timestamps)
+        max_workers: int -- number of worker processes (default: CPU count)
+    Returns:
+        dict: action instance -> function result
+    """
+    graph, ranks = build_adjacency_graph(faasr_payload)
+
+    # predecessors of each action instance -- an action runs once all of
+    # them have finished and at least one of them triggered it, which is
+    # what the .done checks in FaaSrPayload.start enforce in deployments
+    pending = {
+        instance: set()
+        for action in faasr_payload["ActionList"]
+        for instance in _expand(action, ranks)
+    }
+    for action, successors in graph.items():
+        for successor in successors:
+            for instance in _expand(successor, ranks):
+                pending[instance].update(_expand(action, ranks))
+
+    start_actions = [instance for instance, pre in pending.items() if not pre]
+    if not start_actions:
+        raise RuntimeError("No start function (no node with zero predecessors)")
+
+    triggered = set(start_actions)
+    started = set()
+    results = {}
+
+    # workers inherit the log handler, so anything buffered must be sent first
+    if S3LogSender.get_log_sender():
+        flush_s3_log()
+
+    worker_counter = multiprocessing.Value("i", 0)
+    with ProcessPoolExecutor(
+        max_workers=max_workers or os.cpu_count(),
+        initializer=_init_worker,
+        initargs=(worker_counter,),
+    ) as pool:
+        running = {}
+
+        def submit_ready():
+            for instance, pre in pending.items():
+                if not pre and instance in triggered and instance not in started:
+                    started.add(instance)
+                    future = pool.submit(
+                        _run_action, faasr_payload.copy(), *instance, start_time
+                    )
+                    running[future] = instance
+
+        submit_ready()
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                action, rank = running.pop(future)
+                status, function_result = future.result()
+                if status == "aborted":
+                    continue
+                results[_get_instance_name(action, rank)] = function_result
+
+                for successor in graph.get(action, []):
+                    for instance in _expand(successor, ranks):
+                        pending[instance].discard((action, rank))
+
+                # conditional branches decide which successors are triggered
+                payload = faasr_payload.copy()
+                payload["FunctionInvoke"] = action
+                next_triggers = Scheduler(payload)._get_next_triggers(function_result)
+                for next_trigger in next_triggers:
+                    triggered.update(_expand(re.split(r"[()]", next_trigger)[0], ranks))
+            submit_ready()
+
+    skipped = [
+        _get_instance_name(*instance) for instance in pending if instance not in started
+    ]
+    if skipped:
+        logger.info(f"Actions not triggered: {', '.join(skipped)}")
+    return results
@@ -0,0 +1,178 @@
+import argparse
+import logging
+import timeit
+import uuid
+
+from FaaSr_py.config.logger_classes import JsonFormatter
+from FaaSr_py.helpers import serialization
+
+NUMBER = 2000
+NUM_ACTIONS = 50
+NUM_SERVERS = 5
+
+
+def make_workflow(num_actions, num_servers):
+    """
+    Returns a workflow shaped like the ones FaaSr runs: a chain of actions
+    with arguments, and compute servers and data stores with credentials
+    """
+    action_list = {}
+    for i in range(num_actions):
+        action_list[f"action_{i}"] = {
+            "FunctionName": f"function_{i}",
+            "FaaSServer": f"server_{i % num_servers}",
+            "Type": "Python",
+            "Arguments": {
+                "folder": "benchmark",
+                "input": f"input_{i}.csv",
+                "output": f"output_{i}.csv",
+            },
+            "InvokeNext": [f"action_{i + 1}"] if i + 1 < num_actions else [],
+        }
+    return {
+        "WorkflowName": "serialization-benchmark",
+        "FunctionInvoke": "action_0",
+        "DefaultDataStore": "store_0",
+        "FaaSrLog": "FaaSrLog",
+        "ActionList": action_list,
+        "ActionContainers": {
+            name: "ghcr.io/faasr/github-actions-python:latest" for name in action_list
+        },
+        "ComputeServers": {
+            f"server_{i}": {
+                "FaaSType": "GitHubActions",
+                "UserName": "faasr",
+                "ActionRepoName": "benchmark-actions",
+                "Branch": "main",
+                "Token": "ghp_" + uuid.uuid4().hex * 2,
+            }
+            for i in range(num_servers)
+        },
+        "DataStores": {
+            f"store_{i}": {
+                "Endpoint": "https://s3.us-east-1.amazonaws.com",
+                "Bucket": f"faasr-benchmark-{i}",
+                "Region": "us-east-1",
+                "Writable": "TRUE",
+                "AccessKey": uuid.uuid4().hex[:20].upper(),
+                "SecretKey": uuid.uuid4().hex + uuid.uuid4().hex[:8],
+            }
+            for i in range(num_servers)
+        },
+    }
+
+
+def make_overwritten(workflow):
+    """
+    Returns the OVERWRITTEN fields a trigger sends when secrets
+    are passed in the payload
+    """
+    return {
+        "FunctionInvoke": "action_1",
+        "InvocationID": str(uuid.uuid4()),
+        "InvocationTimestamp": "2025-01-01T00-00-00",
+        "FunctionResult": True,
+        "ComputeServers": workflow["ComputeServers"],
+        "DataStores": workflow["DataStores"],
+    }
+
+
+def make_log_record():
+    return logging.LogRecord(
+        name="FaaSr_py.engine.executor",
+        level=logging.INFO,
+        pathname="executor.py",
+        lineno=120,
+        msg="Finished running user function %s in %.3f seconds",
+        args=("action_0", 1.234),
+        exc_info=None,
+        func="run_func",
+    )
+
+
+def time_op(op, number):
+    """
+    Returns:
+        float: average microseconds per call
+    """
+    return timeit.timeit(op, number=number) / number * 1e6
+
+
+def run_benchmarks(number, num_actions, num_servers):
+    workflow = make_workflow(num_actions, num_servers)
+    workflow_json = serialization.dumps(workflow).encode()
+    overwritten = make_overwritten(workflow)
+    trigger_body = {
+        "OVERWRITTEN": overwritten,
+        "PAYLOAD_URL": "faasr/benchmark/main/wf.json",
+    }
+    rpc_request = serialization.dumps_bytes(
+        {
+            "ProcedureID": "faasr_put_file",
+            "Arguments": {
+                "local_file": "output.csv",
+                "remote_file": "output.csv",
+                "local_folder": ".",
+                "remote_folder": "benchmark",
+            },
+        }
+    )
+    rpc_response = {
+        "Success": True,
+        "Data": {"folder_list": [f"f{i}.csv" for i in range(100)]},
+    }
+    formatter = JsonFormatter()
+    record = make_log_record()
+
+    benchmarks = {
+        "log record (JsonFormatter.format)": lambda: formatter.format(record),
+        "trigger (OVERWRITTEN dumps)": lambda: serialization.dumps(overwritten),
+        "trigger (OpenWhisk body dumps)": lambda: serialization.dumps(trigger_body),
+        f"workflow loads ({len(workflow_json) // 1024} KiB)": (
+            lambda: serialization.loads(workflow_json)
+        ),
+        "RPC request loads": lambda: serialization.loads(rpc_request),
+        "RPC response dumps": lambda: serialization.dumps_bytes(rpc_response),
+    }
+
+    backends = serialization.available_backends()
+    default_backend = serialization.get_backend()
+    results = {}
+    try:
+        for backend in backends:
+            serialization.set_backend(backend)
+            results[backend] = {
+                name: time_op(op, number) for name, op in benchmarks.items()
+            }
+    finally:
+        serialization.set_backend(default_backend)
+
+    print("\n--- Benchmark Results (microseconds per operation) ---")
+    print(f"Backends: {', '.join(backends)} (default: {default_backend})")
+    header = f"{'operation':<40}" + "".join(f"{b:>12}" for b in backends)
+    print(header)
+    for name in benchmarks:
+        row = f"{name:<40}"
+        for backend in backends:
+            row += f"{results[backend][name]:>12.2f}"
+        # speedup of the fastest backend over the stdlib
+        fastest = min(results[backend][name] for backend in backends)
+        row += f"  ({results['json'][name] / fastest:.1f}x)"
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare JSON backends on FaaSr payloads, RPC bodies "
+        "and log records"
+    )
+    parser.add_argument("-n", "--number", type=int, default=NUMBER)
+    parser.add_argument("--actions", type=int, default=NUM_ACTIONS)
+    parser.add_argument("--servers", type=int, default=NUM_SERVERS)
+    args = parser.parse_args()
+
+    run_benchmarks(args.number, args.actions, args.servers)
+
+
+if __name__ == "__main__":
+    main()
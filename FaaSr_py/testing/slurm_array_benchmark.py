@@ -0,0 +1,158 @@
+import argparse
+import base64
+import datetime
+import json
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from FaaSr_py import FaaSrPayload, Scheduler, global_config
+
+NUM_RANKS = 100
+API_VERSION = "v0.0.37"
+
+
+class MockSlurmrestd(BaseHTTPRequestHandler):
+    """
+    Accepts job submissions like slurmrestd and counts them
+    """
+
+    latency = 0.0
+    lock = threading.Lock()
+    submissions = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(MockSlurmrestd.latency)
+        with MockSlurmrestd.lock:
+            MockSlurmrestd.submissions.append(body)
+            job_id = len(MockSlurmrestd.submissions)
+
+        response = json.dumps({"job_id": job_id}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_token():
+    """
+    Returns an unsigned JWT that passes validate_jwt_token
+    """
+    claims = {"exp": int(time.time()) + 3600}
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).decode()
+    return f"eyJhbGciOiJub25lIn0.{payload.rstrip('=')}.bench"
+
+
+def make_workflow(endpoint, num_ranks):
+    return {
+        "WorkflowName": "slurm-array-bench",
+        "InvocationID": str(uuid.uuid4()),
+        "FunctionInvoke": "start",
+        "ActionList": {
+            "start": {
+                "FunctionName": "start",
+                "FaaSServer": "slurm",
+                "Type": "Python",
+                "InvokeNext": [f"ranked({num_ranks})"],
+            },
+            "ranked": {
+                "FunctionName": "ranked",
+                "FaaSServer": "slurm",
+                "Type": "Python",
+                "InvokeNext": [],
+            },
+        },
+        "ComputeServers": {
+            "slurm": {
+                "FaaSType": "SLURM",
+                "Endpoint": endpoint,
+                "APIVersion": API_VERSION,
+                "Partition": "faasr",
+                "UserName": "bench",
+                "Token": make_token(),
+                "UseSecretStore": True,
+            }
+        },
+        "DataStores": {},
+    }
+
+
+def submit(num_ranks, use_job_arrays):
+    """
+    Triggers a ranked action on the mock server
+
+    Returns:
+        (float, int): seconds taken, number of REST calls
+    """
+    faasr_payload = FaaSrPayload(
+        "bench/workflow/main/workflow.json", overwritten={}, token=None
+    )
+    faasr_payload["ComputeServers"]["slurm"]["UseJobArrays"] = use_job_arrays
+
+    MockSlurmrestd.submissions.clear()
+    start_time = datetime.datetime.now()
+    Scheduler(faasr_payload).trigger_func("", f"ranked({num_ranks})")
+    total_time = (datetime.datetime.now() - start_time).total_seconds()
+    return total_time, len(MockSlurmrestd.submissions)
+
+
+def benchmark_slurm_arrays(num_ranks, latency):
+    MockSlurmrestd.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockSlurmrestd)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}"
+
+    with tempfile.TemporaryDirectory() as source_dir:
+        # serve the workflow from the local source backend
+        workflow_file = Path(source_dir, "bench", "workflow", "workflow.json")
+        workflow_file.parent.mkdir(parents=True)
+        workflow_file.write_text(json.dumps(make_workflow(endpoint, num_ranks)))
+
+        try:
+            global_config.SOURCE_BACKEND = "local"
+            global_config.LOCAL_SOURCE_DIR = source_dir
+            global_config.SKIP_SCHEMA_VALIDATE = True
+            global_config.SKIP_REAL_TRIGGERS = False
+
+            per_rank_time, per_rank_calls = submit(num_ranks, False)
+            array_time, array_calls = submit(num_ranks, True)
+        finally:
+            global_config.restore()
+            server.shutdown()
+
+    print("\n--- Benchmark Results ---")
+    print(f"Ranks: {num_ranks}")
+    print(f"Simulated slurmrestd latency: {latency * 1000:.1f} ms")
+    print(f"One job per rank: {per_rank_calls} requests in {per_rank_time:.3f} seconds")
+    print(f"Job array: {array_calls} requests in {array_time:.3f} seconds")
+    if array_time > 0:
+        print(f"Speedup: {per_rank_time / array_time:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare per-rank SLURM job submission with job arrays "
+        "against a mock slurmrestd"
+    )
+    parser.add_argument("-n", "--num-ranks", type=int, default=NUM_RANKS)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="seconds the mock server waits before accepting each job",
+    )
+    args = parser.parse_args()
+
+    benchmark_slurm_arrays(args.num_ranks, args.latency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+import argparse
+import logging
+import multiprocessing
+import os
+import random
+import socket
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from FaaSr_py.config.debug_config import global_config
+from FaaSr_py.helpers.faasr_lock import faasr_acquire, faasr_release
+from FaaSr_py.helpers.s3_helper_functions import flush_s3_log
+from FaaSr_py.helpers.storage_backends import InMemoryStorageBackend
+from FaaSr_py.s3_api import faasr_get_file, faasr_put_file
+
+# named explicitly, since FaaSr's log handlers only take FaaSr_py loggers
+# (and this runs as __main__)
+logger = logging.getLogger("FaaSr_py.testing.storage_benchmark")
+
+NUM_ITERATIONS = 20
+LATENCIES_MS = [0, 10, 50]
+FILE_SIZE_KB = 64
+
+
+class BenchmarkPayload(dict):
+    """
+    Stands in for FaaSrPayload, with the fields the storage API,
+    lock and RPC server read
+    """
+
+    log_file = "storage-benchmark.txt"
+
+
+def make_payload():
+    return BenchmarkPayload(
+        {
+            "FaaSrLog": "FaaSrLog",
+            "WorkflowName": "storage-benchmark",
+            "InvocationTimestamp": datetime.now().strftime("%Y-%m-%d-%H-%M-%S"),
+            "InvocationID": str(uuid.uuid4()),
+            "FunctionInvoke": "benchmark",
+            "LoggingDataStore": None,
+            "DefaultDataStore": "memory",
+            "DataStores": {"memory": {"Bucket": "benchmark"}},
+            "ActionList": {"benchmark": {"FunctionName": "benchmark"}},
+        }
+    )
+
+
+def make_latency_model(latency, jitter):
+    """
+    Returns the latency (seconds) of a request: latency plus up to jitter
+    """
+    if not jitter:
+        return latency
+    return lambda operation, size: latency + random.uniform(0, jitter)
+
+
+def time_phase(store, num_iterations, op):
+    """
+    Runs op num_iterations times
+
+    Returns:
+        (float, float): wall and simulated store seconds per iteration
+    """
+    store.reset_stats()
+    start = time.perf_counter()
+    for i in range(num_iterations):
+        op(i)
+    wall = time.perf_counter() - start
+    return wall / num_iterations, store.stats["simulated_time"] / num_iterations
+
+
+def start_rpc_server(faasr_payload, start_time):
+    """
+    Starts the RPC server the way an action does, in a forked process
+    (so it shares the in-memory store's contents and latency model)
+
+    Returns:
+        multiprocessing.Process: the server process
+    """
+    from FaaSr_py.server.faasr_server import run_server, wait_for_server_start
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    action_token = uuid.uuid4().hex
+
+    server = multiprocessing.get_context("fork").Process(
+        target=run_server, args=(faasr_payload, port, start_time, sock, action_token)
+    )
+    server.start()
+    sock.close()
+    wait_for_server_start(port)
+
+    # the client stubs find the server through these
+    os.environ["FAASR_SERVER_PORT"] = str(port)
+    os.environ["FAASR_ACTION_TOKEN"] = action_token
+    return server
+
+
+def benchmark_latency(faasr_payload, local_dir, args, latency_ms):
+    """
+    Measures each phase against an in-memory store with latency_ms per request
+
+    Returns:
+        dict: phase name -> (wall ms, store ms, overhead ms) per operation
+    """
+    from FaaSr_py.client import py_client_stubs as stubs
+
+    store = InMemoryStorageBackend(
+        latency=make_latency_model(latency_ms / 1000, args.jitter / 1000),
+        bandwidth=args.bandwidth * 1024 * 1024 if args.bandwidth else None,
+    )
+    InMemoryStorageBackend.set_shared(store)
+
+    local_file = Path(local_dir) / "input.bin"
+    local_file.write_bytes(os.urandom(args.size * 1024))
+
+    def storage_op(i):
+        store.write_bytes(f"raw/{i}", local_file.read_bytes())
+        store.read_bytes(f"raw/{i}")
+
+    def api_op(i):
+        faasr_put_file(faasr_payload, str(local_file), f"api/{i}.bin")
+        faasr_get_file(faasr_payload, "output.bin", f"api/{i}.bin", local_dir, ".")
+
+    def log_op(i):
+        logger.info(f"storage benchmark log message {i}")
+        flush_s3_log()
+
+    def lock_op(i):
+        faasr_acquire(faasr_payload)
+        faasr_release(faasr_payload)
+
+    def rpc_op(i):
+        stubs.faasr_put_file(str(local_file), f"rpc/{i}.bin")
+        stubs.faasr_get_file("output.bin", f"rpc/{i}.bin", local_folder=local_dir)
+
+    results = {}
+    n = args.num_iterations
+    for name, op in [
+        ("storage", storage_op),
+        ("api", api_op),
+        ("logging", log_op),
+        ("locking", lock_op),
+    ]:
+        wall, simulated = time_phase(store, n, op)
+        results[name] = (wall, simulated, wall - simulated)
+    flush_s3_log()
+
+    # the server's store is a copy in another process, so the store time
+    # of a request is taken to be that of the same call made directly
+    # (which the server follows with a log flush)
+    server = start_rpc_server(faasr_payload, datetime.now())
+    try:
+        wall, _ = time_phase(store, n, rpc_op)
+    finally:
+        server.terminate()
+        server.join()
+    direct = results["api"][0] + 2 * results["logging"][0]
+    results["rpc"] = (wall, direct, wall - direct)
+
+    # per-operation figures (two requests per iteration for storage, api and rpc)
+    per_op = {"storage": 2, "api": 2, "logging": 1, "locking": 1, "rpc": 2}
+    return {
+        name: tuple(value * 1000 / per_op[name] for value in values)
+        for name, values in results.items()
+    }
+
+
+def print_results(all_results, args):
+    print("\n--- Benchmark Results ---")
+    print(f"Iterations per phase: {args.num_iterations}")
+    print(f"File size: {args.size} KB")
+    if args.bandwidth:
+        print(f"Bandwidth: {args.bandwidth} MB/s")
+    if args.jitter:
+        print(f"Jitter: up to {args.jitter} ms")
+    print(
+        f"\n{'latency':>8} {'phase':>8} {'wall ms':>10} {'store ms':>10} "
+        f"{'overhead ms':>12}"
+    )
+    for latency_ms, results in all_results.items():
+        for name, (wall, simulated, overhead) in results.items():
+            print(
+                f"{latency_ms:>8} {name:>8} {wall:>10.3f} {simulated:>10.3f} "
+                f"{overhead:>12.3f}"
+            )
+    print(
+        "\nstore ms is time spent waiting on the modeled store, and overhead is "
+        "FaaSr's own time per operation. For rpc, store ms is the time of the "
+        "same call made directly plus the server's log flush"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure FaaSr's storage API, RPC, logging and locking "
+        "overhead against an in-memory store with modeled latency"
+    )
+    parser.add_argument(
+        "-l",
+        "--latency",
+        type=float,
+        nargs="+",
+        default=LATENCIES_MS,
+        help="store latency per request, in ms (one run per value)",
+    )
+    parser.add_argument(
+        "-j", "--jitter", type=float, default=0, help="random extra latency, in ms"
+    )
+    parser.add_argument(
+        "-b", "--bandwidth", type=float, default=None, help="store bandwidth, MB/s"
+    )
+    parser.add_argument(
+        "-s", "--size", type=int, default=FILE_SIZE_KB, help="file size, in KB"
+    )
+    parser.add_argument("-n", "--num-iterations", type=int, default=NUM_ITERATIONS)
+    args = parser.parse_args()
+
+    faasr_payload = make_payload()
+    # printing every log line would dominate the measurements
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.StreamHandler):
+            handler.setLevel(logging.WARNING)
+    global_config.USE_LOCAL_FILE_SYSTEM = False
+    global_config.STORAGE_BACKEND = "memory"
+    global_config.add_s3_log_handler(faasr_payload, datetime.now())
+    try:
+        with tempfile.TemporaryDirectory() as local_dir:
+            all_results = {
+                latency_ms: benchmark_latency(
+                    faasr_payload, local_dir, args, latency_ms
+                )
+                for latency_ms in args.latency
+            }
+    finally:
+        global_config.restore()
+    print_results(all_results, args)
+
+
+if __name__ == "__main__":
+    main()
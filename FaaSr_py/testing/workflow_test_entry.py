@@ -5,10 +5,9 @@ import os
 import uuid
 from datetime import datetime
 from pathlib import Path
-from time import sleep
 
-from FaaSr_py import Executor, FaaSrPayload, S3LogSender, global_config
-from FaaSr_py.helpers.graph_functions import build_adjacency_graph
+from FaaSr_py import FaaSrPayload, S3LogSender, global_config
+from FaaSr_py.testing.local_runner import run_workflow
 
 logger = logging.getLogger("FaaSr_py")
 
@@ -133,6 +132,21 @@ def edit_config(selection):
 
             print("\nEnabled USE_LOCAL_FILE_SYSTEM")
 
+        case "SOURCE_BACKEND":
+            global_config.SOURCE_BACKEND = "local"
+
+            print(
+                "\nEnter the directory containing your repos (as username/repo folders)"
+            )
+            source_dir = Path(input("Enter dir: "))
+            while not source_dir.is_dir():
+                print("Invalid directory")
+                source_dir = Path(input("Enter dir: "))
+
+            global_config.LOCAL_SOURCE_DIR = str(source_dir)
+
+            print("\nEnabled local SOURCE_BACKEND")
+
 
 def prompt_configs():
     print("\nWould you like to edit the test configs? (yes or no)")
@@ -148,14 +162,15 @@ def prompt_configs():
                 "[3] SKIP_USER_FUNCTION -- skip calling invoke user function\n"
                 "[4] USE_LOCAL_USER_FUNC -- run a user function from your local filesystem\n"
                 "[5] USE_LOCAL_FILE_SYSTEM -- use local directory rather than S3\n"
+                "[6] SOURCE_BACKEND -- fetch workflow and functions from local repos\n"
                 "[exit]\n"
             )
             selection = input("Enter one of the above options: ")
 
             while (
-                selection not in {f"{i}" for i in range(1, 6)} and selection != "exit"
+                selection not in {f"{i}" for i in range(1, 7)} and selection != "exit"
             ):
-                selection = input("Invalid input (1-5 or exit): ")
+                selection = input("Invalid input (1-6 or exit): ")
 
             if selection == "exit":
                 break
@@ -166,6 +181,7 @@ def prompt_configs():
                 "3": "SKIP_USER_FUNCTION",
                 "4": "USE_LOCAL_USER_FUNC",
                 "5": "USE_LOCAL_FILE_SYSTEM",
+                "6": "SOURCE_BACKEND",
             }
 
             edit_config(config_map[selection])
@@ -181,7 +197,7 @@ def main():
     Process payload
     Validate DAG, ensure datastores are accesible
     Initialize log and InvocationID if needed
-    Run user functions using BFS
+    Run user functions concurrently (MAX_WORKERS processes)
     """
     try:
         prompt_configs()
@@ -199,89 +215,13 @@ def main():
 
         faasr_payload["InvocationID"] = str(uuid.uuid4())
 
-        graph, ranks = build_adjacency_graph(faasr_payload)
-
-        for func in graph:
-            if ranks[func] == 0:
-                first_func = func
-                break
-        else:
-            raise RuntimeError("No start function (no node with zero predecessors)")
-
-        function_executor = Executor(faasr_payload)
-
-        # track function results for conditional branches
-        results = dict()
-
-        # queue for bfs traversal
-        func_q = [first_func]
-
-        dash_ct = max(len(action) for action in faasr_payload["ActionList"]) + 70
-
-        # trigger all functions in workflow using bfs
-        while func_q:
-            new_q = []
-            for func in func_q:
-                if ranks[func] == 1 or ranks[func] == 0:
-                    rank = 1
-                else:
-                    rank = ranks[func]
-
-                for i in range(1, rank + 1):
-                    sleep(0.5)
-                    if rank > 1:
-                        faasr_payload["FunctionRank"] = i
-                        func_with_rank = f"{func}.{i}"
-                        norm_dash_ct = dash_ct - len(func_with_rank)
-                        print(
-                            f"\n{func_with_rank.center(norm_dash_ct, '-')}\n",
-                            flush=True,
-                        )
-                    else:
-                        faasr_payload.remove("FunctionRank")
-                        norm_dash_ct = dash_ct - len(func)
-                        print(f"\n{func.center(norm_dash_ct, '-')}\n", flush=True)
-
-                    faasr_payload["FunctionInvoke"] = func
-
-                    # execute function
-                    try:
-                        faasr_payload.start()
-                    except SystemExit:  # to-do: custom exception classes
-                        continue
-
-                    function_executor.faasr = faasr_payload
-
-                    function_result = function_executor.run_func(func, start_time)
-                    print(f"FUNCTION RESULT: {function_result}")
-                    results[func] = function_result
-                    logger.debug(
-                        f"Finished execution of {func} with result {function_result}"
-                    )
-
-                    # add triggers to bfs queue
-                    for next_invoke in faasr_payload["ActionList"][func]["InvokeNext"]:
-                        # handle conditional branches
-                        if isinstance(next_invoke, dict):
-                            if results[func] is True:
-                                next_invoke = next_invoke["True"]
-                            elif results[func] is False:
-                                next_invoke = next_invoke["False"]
-                            else:
-                                raise RuntimeError(
-                                    f"Function {func} does not return a value but defines conditional branches"  # noqa E501
-                                )
-
-                        if isinstance(next_invoke, list):
-                            for f in next_invoke:
-                                f = f.split("(")[0]
-                                new_q.append(f)
-                        else:
-                            new_q.append(next_invoke.split("(")[0])
-
-                    print(f"FINISHED EXECUTION OF {func}")
-
-            func_q = new_q
+        # run actions concurrently as their predecessors finish
+        max_workers = os.getenv("MAX_WORKERS")
+        results = run_workflow(
+            faasr_payload, start_time, int(max_workers) if max_workers else None
+        )
+        for action, function_result in results.items():
+            print(f"FUNCTION RESULT: {action} -- {function_result}")
 
         log_sender = S3LogSender.get_log_sender()
         log_sender.flush_log()
@@ -9,4 +9,5 @@ setup(
     packages=find_packages(),
     include_package_data=True,
     install_requires=requirements,
+    extras_require={"fast-json": ["orjson"]},
 )